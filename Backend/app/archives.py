@@ -0,0 +1,131 @@
+import os
+import zlib
+import tarfile
+import zipfile
+import logging
+from dataclasses import dataclass, field
+from typing import BinaryIO, Callable, Collection, Dict, Iterator, List, Optional, Tuple
+
+from dotenv import load_dotenv
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+load_dotenv()
+
+# Most files accepted from one archive of resumes
+ARCHIVE_MAX_ENTRIES = int(os.getenv("ARCHIVE_MAX_ENTRIES", 500))
+# Limit on the uploaded archive and, separately, on the total size of the files read from it
+ARCHIVE_MAX_SIZE_MB = int(os.getenv("ARCHIVE_MAX_SIZE_MB", 200))
+
+# Entries added by archivers and file managers rather than by the recruiter
+_METADATA_NAMES = {".DS_Store", "Thumbs.db", "desktop.ini"}
+
+# Content types of archive entries by extension; mimetypes depends on the host's tables and often lacks .docx
+RESUME_CONTENT_TYPES = {
+    ".pdf": "application/pdf",
+    ".docx": "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+    ".txt": "text/plain",
+    ".doc": "application/msword",
+}
+
+class ArchiveError(ValueError):
+    """The archive or one of its entries cannot be accepted."""
+
+class ArchiveTooLarge(ArchiveError):
+    """The archive as a whole exceeds its size limit."""
+
+@dataclass
+class ResumeArchive:
+    """Resumes read from an archive as (filename, bytes, content type), and the entries skipped with the reason."""
+    files: List[Tuple[str, bytes, str]] = field(default_factory=list)
+    skipped: List[Dict[str, str]] = field(default_factory=list)
+
+def entry_content_type(filename: str) -> Optional[str]:
+    return RESUME_CONTENT_TYPES.get(os.path.splitext(filename)[1].lower())
+
+def _is_metadata(name: str) -> bool:
+    basename = os.path.basename(name)
+    return name.startswith("__MACOSX/") or basename.startswith("._") or basename in _METADATA_NAMES
+
+def _iter_zip(fileobj: BinaryIO) -> Iterator[Tuple[str, int, Callable[[], BinaryIO]]]:
+    with zipfile.ZipFile(fileobj) as archive:
+        for info in archive.infolist():
+            if not info.is_dir():
+                yield info.filename, info.file_size, lambda info=info: archive.open(info)
+
+def _iter_tar(fileobj: BinaryIO) -> Iterator[Tuple[str, int, Callable[[], BinaryIO]]]:
+    # Stream mode reads members in one pass, so compressed tars are not decompressed again for every entry
+    with tarfile.open(fileobj=fileobj, mode="r|*") as archive:
+        for member in archive:
+            # Links and devices are skipped along with directories
+            if member.isfile():
+                yield member.name, member.size, lambda member=member: archive.extractfile(member)
+
+def iter_archive_entries(fileobj: BinaryIO) -> Iterator[Tuple[str, int, Callable[[], BinaryIO]]]:
+    """
+    Yields (name, declared size, open) for the regular files of a ZIP or tar archive
+    (optionally gzip/bz2/xz compressed). Entries are opened from the archive stream one
+    at a time; nothing is extracted to disk. ``open`` is only valid until the next entry.
+    """
+    fileobj.seek(0)
+    is_zip = zipfile.is_zipfile(fileobj)
+    fileobj.seek(0)
+    try:
+        entries = _iter_zip(fileobj) if is_zip else _iter_tar(fileobj)
+        for name, size, open_entry in entries:
+            if not _is_metadata(name):
+                yield name, size, open_entry
+    except (zipfile.BadZipFile, tarfile.TarError, EOFError, zlib.error) as e:
+        raise ArchiveError(f"Could not read the archive: {e}")
+
+def read_resume_archive(
+    fileobj: BinaryIO,
+    allowed_content_types: Collection[str],
+    max_file_size: int,
+    max_entries: int = ARCHIVE_MAX_ENTRIES,
+    max_total_size: int = ARCHIVE_MAX_SIZE_MB * 1024 * 1024
+) -> ResumeArchive:
+    """
+    Reads the resumes in an archive, applying the checks of individual uploads to every entry.
+    Entries failing them are skipped and reported; only limits on the archive as a whole raise.
+    Sizes are enforced on the bytes actually read, not only on the sizes the archive declares,
+    so a crafted archive cannot decompress past the limits.
+    """
+    archive = ResumeArchive()
+    entries = total_size = 0
+    for name, size, open_entry in iter_archive_entries(fileobj):
+        filename = os.path.basename(name)
+        if entries == max_entries:
+            raise ArchiveError(f"The archive contains more than {max_entries} files")
+        entries += 1
+
+        content_type = entry_content_type(filename)
+        if content_type not in allowed_content_types:
+            archive.skipped.append({"filename": name, "detail": "Unsupported file type"})
+            continue
+        if size > max_file_size:
+            archive.skipped.append({"filename": name, "detail": f"File exceeds size limit of {max_file_size // (1024 * 1024)}MB"})
+            continue
+
+        try:
+            with open_entry() as entry:
+                data = entry.read(max_file_size + 1)
+        except (RuntimeError, NotImplementedError, zipfile.BadZipFile, tarfile.TarError, EOFError, zlib.error) as e:
+            # Encrypted entries, unsupported compression methods and corrupt data
+            logger.error(f"Could not read {name} from archive: {e}")
+            archive.skipped.append({"filename": name, "detail": "Could not read the file from the archive"})
+            continue
+        if len(data) > max_file_size:
+            archive.skipped.append({"filename": name, "detail": f"File exceeds size limit of {max_file_size // (1024 * 1024)}MB"})
+            continue
+
+        total_size += len(data)
+        if total_size > max_total_size:
+            raise ArchiveTooLarge(f"The files in the archive exceed {max_total_size // (1024 * 1024)}MB in total")
+        archive.files.append((filename, data, content_type))
+
+    if not entries:
+        raise ArchiveError("The archive does not contain any resumes")
+    return archive
@@ -2,11 +2,23 @@ from fastapi import Depends, HTTPException, status, Request
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from app.database import get_supabase
 from supabase import Client
-from app import schemas
+from app import schemas, metrics
 import os
+import time
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
 from datetime import datetime, timedelta
-from jose import jwt
-from typing import Optional
+import httpx
+from dotenv import load_dotenv
+from jose import jwt, JWTError, ExpiredSignatureError
+from jose.exceptions import JWTClaimsError
+from typing import Any, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+load_dotenv()
 
 # Security scheme for token authentication
 security = HTTPBearer()
@@ -16,6 +28,22 @@ SECRET_KEY = os.getenv("SECRET_KEY")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
 
+# Local verification of Supabase access tokens: the project's JWT secret for HS256 tokens and/or
+# its JWKS for asymmetrically signed ones. Tokens neither can verify are checked with Supabase Auth.
+SUPABASE_JWT_SECRET = os.getenv("SUPABASE_JWT_SECRET")
+SUPABASE_JWKS_URL = os.getenv(
+    "SUPABASE_JWKS_URL",
+    f"{os.getenv('SUPABASE_URL').rstrip('/')}/auth/v1/.well-known/jwks.json" if os.getenv("SUPABASE_URL") else ""
+)
+SUPABASE_JWT_AUDIENCE = os.getenv("SUPABASE_JWT_AUDIENCE", "authenticated")
+# How long fetched signing keys are trusted before the JWKS is fetched again
+AUTH_JWKS_TTL_SECONDS = float(os.getenv("AUTH_JWKS_TTL_SECONDS", 600))
+# Verified tokens are cached until they expire, but for no longer than this
+AUTH_TOKEN_CACHE_TTL_SECONDS = float(os.getenv("AUTH_TOKEN_CACHE_TTL_SECONDS", 300))
+AUTH_TOKEN_CACHE_SIZE = int(os.getenv("AUTH_TOKEN_CACHE_SIZE", 10000))
+
+_ASYMMETRIC_ALGORITHMS = {"RS256", "ES256"}
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     """Create a JWT access token (for compatibility with existing frontend)"""
     to_encode = data.copy()
@@ -55,8 +83,115 @@ def get_current_user_from_token(credentials: HTTPAuthorizationCredentials = Depe
             headers={"WWW-Authenticate": "Bearer"},
         )
 
+class TokenCache:
+    """Bounded LRU map of token hash to the user it authenticates, with entries expiring with the token."""
+
+    def __init__(self, max_entries: int = AUTH_TOKEN_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, Tuple[schemas.User, float]]" = OrderedDict()
+
+    @staticmethod
+    def _key(token: str) -> str:
+        # Raw tokens are credentials: only their hashes are kept in memory
+        return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+    def get(self, token: str) -> Optional[schemas.User]:
+        key = self._key(token)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[1] <= time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[0]
+
+    def put(self, token: str, user: schemas.User, expires_at: float) -> None:
+        expires_at = min(expires_at, time.time() + AUTH_TOKEN_CACHE_TTL_SECONDS)
+        if expires_at <= time.time():
+            return
+        with self._lock:
+            self._entries[self._key(token)] = (user, expires_at)
+            self._entries.move_to_end(self._key(token))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+class JWKSCache:
+    """Signing keys of the Supabase project by key ID, refetched after a TTL or when an unknown key ID shows up."""
+
+    def __init__(self, url: str, ttl_seconds: float = AUTH_JWKS_TTL_SECONDS):
+        self.url = url
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._keys: Dict[str, Dict[str, Any]] = {}
+        self._fetched_at: Optional[float] = None
+
+    def _fetch(self) -> None:
+        # Failed fetches count too, so an unreachable JWKS endpoint is not hit on every request
+        self._fetched_at = time.monotonic()
+        response = httpx.get(self.url, timeout=10)
+        response.raise_for_status()
+        self._keys = {key["kid"]: key for key in response.json().get("keys", []) if "kid" in key}
+
+    def get(self, kid: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            age = time.monotonic() - self._fetched_at if self._fetched_at is not None else None
+            # A new key ID triggers a refetch (key rotation), but at most once a second
+            if age is None or age >= self.ttl_seconds or (kid not in self._keys and age >= 1):
+                self._fetch()
+            return self._keys.get(kid)
+
+_token_cache = TokenCache()
+_jwks_cache: Optional[JWKSCache] = JWKSCache(SUPABASE_JWKS_URL) if SUPABASE_JWKS_URL else None
+
+def _user_from_claims(claims: Dict[str, Any]) -> schemas.User:
+    # Supabase stores user data in a different structure.
+    # We need to adapt it to our Pydantic schema.
+    user_data = claims.get("user_metadata") or {}
+    return schemas.User(
+        id=claims["sub"], # Supabase uses UUIDs for user IDs
+        username=user_data.get("username", user_data.get("user_name", "")) or claims.get("email"),
+        email=claims.get("email"),
+        role=user_data.get("role", "recruiter"), # Assumes you have a 'role' in user_metadata
+        is_active=True # Supabase users are active by default
+    )
+
+def verify_token_locally(token: str) -> Optional[Dict[str, Any]]:
+    """
+    Verifies a Supabase access token's signature and claims without calling Supabase Auth.
+    Returns the claims, or None when the token cannot be verified locally (no key configured,
+    unknown key, JWKS unavailable, bad signature) or is not a user's access token: the project's
+    anon and service_role keys are signed with the same secret but carry no user. Raises
+    ExpiredSignatureError for expired tokens.
+    """
+    try:
+        header = jwt.get_unverified_header(token)
+        algorithm = header.get("alg")
+        if algorithm == "HS256" and SUPABASE_JWT_SECRET:
+            key = SUPABASE_JWT_SECRET
+        elif algorithm in _ASYMMETRIC_ALGORITHMS and _jwks_cache is not None:
+            key = _jwks_cache.get(header.get("kid"))
+            if key is None:
+                return None
+        else:
+            return None
+        claims = jwt.decode(
+            token, key, algorithms=[algorithm], audience=SUPABASE_JWT_AUDIENCE,
+            options={"require_aud": True, "require_sub": True, "require_exp": True}
+        )
+        if claims.get("role") != "authenticated":
+            raise JWTClaimsError(f"Token role is {claims.get('role')!r}, not 'authenticated'")
+        return claims
+    except ExpiredSignatureError:
+        raise
+    except (JWTError, httpx.HTTPError, ValueError) as e:
+        logger.warning(f"Could not verify access token locally, checking it with Supabase Auth: {e}")
+        return None
+
 def get_current_user(request: Request, supabase: Client = Depends(get_supabase)) -> schemas.User:
-    """Get current user from Supabase Auth token"""
+    """Get current user from Supabase Auth token, verified locally when possible"""
     auth_header = request.headers.get("Authorization")
     if not auth_header:
         raise HTTPException(
@@ -78,27 +213,43 @@ def get_current_user(request: Request, supabase: Client = Depends(get_supabase))
             headers={"WWW-Authenticate": "Bearer"},
         )
 
+    user = _token_cache.get(token)
+    if user is not None:
+        metrics.increment("auth.token_cache_hits")
+        return user
+
     try:
-        user_response = supabase.auth.get_user(token)
-        user_data = user_response.user.user_metadata or {}
-        print(f"User metadata from Supabase: {user_data}")  # Debug log
-        # Supabase stores user data in a different structure.
-        # We need to adapt it to our Pydantic schema.
-        user = schemas.User(
-            id=user_response.user.id, # Supabase uses UUIDs for user IDs
-            username=user_data.get("username", user_data.get("user_name", "")) or user_response.user.email,
-            email=user_response.user.email,
-            role=user_data.get("role", "recruiter"), # Assumes you have a 'role' in user_metadata
-            is_active=True # Supabase users are active by default
+        claims = verify_token_locally(token)
+    except ExpiredSignatureError:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials: token has expired",
+            headers={"WWW-Authenticate": "Bearer"},
         )
-        print(f"User object created: {user}")  # Debug log
+    if claims is not None:
+        metrics.increment("auth.local_verifications")
+        user = _user_from_claims(claims)
+        _token_cache.put(token, user, claims["exp"])
         return user
+
+    try:
+        metrics.increment("auth.remote_verifications")
+        user_response = supabase.auth.get_user(token)
+        user = _user_from_claims({
+            "sub": user_response.user.id,
+            "email": user_response.user.email,
+            "user_metadata": user_response.user.user_metadata
+        })
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail=f"Could not validate credentials: {e}",
             headers={"WWW-Authenticate": "Bearer"},
         )
+    # Supabase Auth accepted the token, so its (unverified) expiry can be trusted
+    expires_at = jwt.get_unverified_claims(token).get("exp") or time.time()
+    _token_cache.put(token, user, expires_at)
+    return user
 
 def get_current_admin_user(current_user: schemas.User = Depends(get_current_user)):
     if current_user.role != "admin":
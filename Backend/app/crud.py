@@ -1,35 +1,20 @@
 import json
-import hashlib
+import base64
 import logging
-import os
-from typing import Optional, List, Dict, Any
-from supabase import Client
-from supabase import create_client
-from . import schemas
-from .database import get_supabase
+from datetime import datetime
+from dataclasses import dataclass
+from typing import Optional, List, Dict, Any, Tuple
+from supabase import Client, AsyncClient
+from . import metrics, schemas
+from .database import get_supabase, get_admin_supabase
+from .user_directory import USER_DIRECTORY_PAGE_SIZE, get_user_directory
+from .jd_index import JD_INDEX_WARM_SIZE, get_jd_index
 from .parsing import to_bool
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-def _create_jd_content_hash(jd: schemas.JDModel) -> str:
-    """
-    Creates a SHA256 hash of the core, identifying content of the JD.
-    This provides a unique fingerprint for the job description itself.
-    """
-    # Use key fields that define the job. 
-    # Using .dict() ensures a consistent order for fields.
-    # We might exclude fields that are less likely to be core identifiers 
-    # or might vary (like datePosted if it's not part of the core posting)
-    # For simplicity, we'll hash the whole JD dict, excluding database-specific fields.
-    # A more refined approach could select specific fields.
-    jd_dict_for_hashing = jd.dict(exclude_unset=True) 
-    # Ensure consistent string representation for hashing
-    content_str = json.dumps(jd_dict_for_hashing, sort_keys=True, separators=(',', ':'))
-    content_hash = hashlib.sha256(content_str.encode('utf-8')).hexdigest()
-    return content_hash
-
 def ensure_complete_skill_presence(skill_presence: dict, skill_categories: dict) -> dict:
     """Ensure all skills from categories are present in skill_presence with boolean values"""
     if not skill_presence:
@@ -45,31 +30,94 @@ def ensure_complete_skill_presence(skill_presence: dict, skill_categories: dict)
     
     return skill_presence
 
+# Pagination
+@dataclass
+class Page:
+    items: list
+    # Opaque cursor for the next page, None on the last one
+    next_cursor: Optional[str] = None
+    # Total number of matching rows, when requested
+    total: Optional[int] = None
+
+def encode_cursor(created_at: str, row_id: int) -> str:
+    return base64.urlsafe_b64encode(json.dumps([created_at, row_id]).encode("utf-8")).decode("ascii")
+
+def decode_cursor(cursor: str) -> Tuple[str, int]:
+    """
+    Returns the (created_at, id) keyset position of a cursor. Raises ValueError for malformed cursors.
+    The timestamp is parsed and re-serialized, so only a well-formed ISO timestamp reaches the query filter.
+    """
+    try:
+        created_at, row_id = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        if not isinstance(created_at, str) or not isinstance(row_id, int) or isinstance(row_id, bool):
+            raise ValueError("unexpected cursor values")
+        created_at = datetime.fromisoformat(created_at).isoformat()
+    except Exception as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+    return created_at, row_id
+
+def _paginate(query, skip: int, limit: int, after: Optional[Tuple[str, int]]):
+    """
+    Orders a select newest first by (created_at, id). With ``after`` (a decoded cursor) the page
+    starts right after that row, which stays cheap at any depth; otherwise ``skip`` rows are skipped.
+    """
+    query = query.order("created_at", desc=True).order("id", desc=True)
+    if after is None:
+        return query.range(skip, skip + limit - 1)
+    created_at, row_id = after
+    return query.or_(f'created_at.lt."{created_at}",and(created_at.eq."{created_at}",id.lt.{row_id})').limit(limit)
+
+def _page(response, limit: int, convert) -> Page:
+    rows = response.data or []
+    next_cursor = encode_cursor(rows[-1]["created_at"], rows[-1]["id"]) if len(rows) == limit else None
+    return Page(items=[convert(row) for row in rows], next_cursor=next_cursor, total=response.count)
+
 # User CRUD operations
+def _auth_user_to_schema(user_data) -> schemas.User:
+    """Convert a Supabase Auth user to the User schema"""
+    return schemas.User(
+        id=user_data.id,
+        username=user_data.user_metadata.get("username", user_data.email.split('@')[0]),
+        email=user_data.email,
+        role=user_data.user_metadata.get("role", "recruiter"),
+        is_active=True, # Supabase users are active by default
+        created_at=user_data.created_at
+    )
+
+def _user_from_response(response):
+    """Extract the user from a Supabase Auth response, whose format varies between client versions"""
+    if hasattr(response, 'user'):
+        return response.user
+    elif isinstance(response, dict) and 'user' in response:
+        return response['user']
+    elif hasattr(response, 'data'):
+        return response.data
+    elif isinstance(response, dict) and 'data' in response:
+        return response['data']
+    return None
+
 def get_user(supabase: Client, user_id: str):
-    """Get user by ID from Supabase Auth"""
+    """Get user by ID from the user directory, falling back to Supabase Auth"""
+    directory = get_user_directory()
+    if directory.is_fresh() and directory.get(user_id):
+        return directory.get(user_id)
     try:
-        response = supabase.auth.admin.get_user_by_id(user_id)
-        # Handle different response formats
-        user_data = None
-        if hasattr(response, 'user'):
-            user_data = response.user
-        elif isinstance(response, dict) and 'user' in response:
-            user_data = response['user']
-        elif hasattr(response, 'data'):
-            user_data = response.data
-        elif isinstance(response, dict) and 'data' in response:
-            user_data = response['data']
-        
+        user_data = _user_from_response(supabase.auth.admin.get_user_by_id(user_id))
         if user_data:
-            return schemas.User(
-                id=user_data.id,
-                username=user_data.user_metadata.get("username", user_data.email.split('@')[0]),
-                email=user_data.email,
-                role=user_data.user_metadata.get("role", "recruiter"),
-                is_active=True,
-                created_at=user_data.created_at
-            )
+            return _auth_user_to_schema(user_data)
+    except Exception as e:
+        logger.error(f"Error getting user by ID: {e}")
+    return None
+
+async def aget_user(supabase: AsyncClient, user_id: str):
+    """Async version of get_user"""
+    directory = get_user_directory()
+    if directory.is_fresh() and directory.get(user_id):
+        return directory.get(user_id)
+    try:
+        user_data = _user_from_response(await supabase.auth.admin.get_user_by_id(user_id))
+        if user_data:
+            return _auth_user_to_schema(user_data)
     except Exception as e:
         logger.error(f"Error getting user by ID: {e}")
     return None
@@ -93,59 +141,85 @@ def get_user_by_email(supabase: Client, email: str):
         logger.error(f"Error getting user by email: {e}")
     return None
 
+async def aget_user_by_email(supabase: AsyncClient, email: str):
+    """Async version of get_user_by_email"""
+    try:
+        response = await supabase.auth.sign_in_with_otp({"email": email})
+        if response:
+            return schemas.User(
+                id="temp_id",
+                username=email.split('@')[0],
+                email=email,
+                role="recruiter",
+                is_active=True
+            )
+    except Exception as e:
+        logger.error(f"Error getting user by email: {e}")
+    return None
+
+def _users_from_response(response) -> list:
+    """Extract the user list from a Supabase Auth response, whose format varies between client versions"""
+    users = []
+    if hasattr(response, 'users'):
+        users = response.users
+    elif isinstance(response, dict) and 'users' in response:
+        users = response['users']
+    elif isinstance(response, list):
+        users = response
+    elif hasattr(response, 'data'):
+        data = response.data
+        if isinstance(data, list):
+            users = data
+        elif isinstance(data, dict) and 'users' in data:
+            users = data['users']
+    elif isinstance(response, dict) and 'data' in response:
+        data = response['data']
+        if isinstance(data, list):
+            users = data
+        elif isinstance(data, dict) and 'users' in data:
+            users = data['users']
+    return users
+
+def _list_all_users(supabase: Client) -> List[schemas.User]:
+    """Lists every Supabase Auth user, following the admin API's pagination"""
+    users, page = [], 1
+    while True:
+        batch = _users_from_response(supabase.auth.admin.list_users(page=page, per_page=USER_DIRECTORY_PAGE_SIZE))
+        users.extend(_auth_user_to_schema(u) for u in batch)
+        if len(batch) < USER_DIRECTORY_PAGE_SIZE:
+            return users
+        page += 1
+
+async def _alist_all_users(supabase: AsyncClient) -> List[schemas.User]:
+    users, page = [], 1
+    while True:
+        batch = _users_from_response(await supabase.auth.admin.list_users(page=page, per_page=USER_DIRECTORY_PAGE_SIZE))
+        users.extend(_auth_user_to_schema(u) for u in batch)
+        if len(batch) < USER_DIRECTORY_PAGE_SIZE:
+            return users
+        page += 1
+
 def get_users(supabase: Client, skip: int = 0, limit: int = 100, username: str = None):
-    """Get users from Supabase Auth"""
+    """Get users from the cached user directory, reloading it from Supabase Auth when it is stale"""
     try:
-        # For admin operations, create a fresh client to ensure proper auth context
-        # This can help avoid initialization timing issues
-        url: str = os.environ.get("SUPABASE_URL")
-        key: str = os.environ.get("SUPABASE_KEY")
-        
-        if url and key:
-            # Create a fresh client for admin operations
-            admin_supabase: Client = create_client(url, key)
-            response = admin_supabase.auth.admin.list_users()
-        else:
-            # Fallback to the provided client
-            response = supabase.auth.admin.list_users()
-        
-        # Handle different response formats from Supabase client
-        users = []
-        if hasattr(response, 'users'):
-            users = response.users
-        elif isinstance(response, dict) and 'users' in response:
-            users = response['users']
-        elif isinstance(response, list):
-            users = response
-        elif hasattr(response, 'data'):
-            data = response.data
-            if isinstance(data, list):
-                users = data
-            elif isinstance(data, dict) and 'users' in data:
-                users = data['users']
-        elif isinstance(response, dict) and 'data' in response:
-            data = response['data']
-            if isinstance(data, list):
-                users = data
-            elif isinstance(data, dict) and 'users' in data:
-                users = data['users']
-        
-        # Convert Supabase User objects to your User schema
-        schema_users = [
-            schemas.User(
-                id=u.id,
-                username=u.user_metadata.get("username", u.email.split('@')[0]),
-                email=u.email,
-                role=u.user_metadata.get("role", "recruiter"),
-                is_active=True, # Supabase users are active by default
-                created_at=u.created_at
-            ) for u in users
-        ]
-        
-        if username:
-            schema_users = [u for u in schema_users if u.username == username]
-            
-        return schema_users[skip : skip + limit]
+        directory = get_user_directory()
+        if not directory.is_fresh():
+            generation = directory.generation
+            # Logins sign in on the shared client, so admin calls go through one that never holds a user session
+            directory.load(_list_all_users(get_admin_supabase()), generation)
+        return directory.list(skip, limit, username)
+    except Exception as e:
+        logger.error(f"Error getting users: {e}", exc_info=True)
+        return []
+
+async def aget_users(supabase: AsyncClient, skip: int = 0, limit: int = 100, username: str = None):
+    """Async version of get_users; the shared async client never holds a user session"""
+    try:
+        directory = get_user_directory()
+        if not directory.is_fresh():
+            generation = directory.generation
+            directory.load(await _alist_all_users(supabase), generation)
+        return directory.list(skip, limit, username)
     except Exception as e:
         logger.error(f"Error getting users: {e}", exc_info=True)
         return []
@@ -158,6 +232,7 @@ def create_user(supabase: Client, user: schemas.UserCreate):
             "password": user.password
         })
         if response.user:
+            get_user_directory().invalidate()
             user_data = response.user
             return schemas.User(
                 id=user_data.id,
@@ -170,10 +245,42 @@ def create_user(supabase: Client, user: schemas.UserCreate):
         logger.error(f"Error creating user: {e}")
     return None
 
+async def acreate_user(supabase: AsyncClient, user: schemas.UserCreate):
+    """Async version of create_user. Uses the admin API: signing up on the shared client would attach the new user's session to it."""
+    try:
+        response = await supabase.auth.admin.create_user({
+            "email": user.email,
+            "password": user.password,
+            "user_metadata": {"username": user.username, "role": user.role}
+        })
+        if response.user:
+            get_user_directory().invalidate()
+            return schemas.User(
+                id=response.user.id,
+                username=user.username,
+                email=response.user.email,
+                role=user.role,
+                is_active=True
+            )
+    except Exception as e:
+        logger.error(f"Error creating user: {e}")
+    return None
+
 def delete_user(supabase: Client, user_id: str):
     """Delete user from Supabase Auth"""
     try:
         response = supabase.auth.admin.delete_user(user_id)
+        get_user_directory().invalidate()
+        return response
+    except Exception as e:
+        logger.error(f"Error deleting user: {e}")
+    return None
+
+async def adelete_user(supabase: AsyncClient, user_id: str):
+    """Async version of delete_user"""
+    try:
+        response = await supabase.auth.admin.delete_user(user_id)
+        get_user_directory().invalidate()
         return response
     except Exception as e:
         logger.error(f"Error deleting user: {e}")
@@ -185,25 +292,50 @@ def get_jd(supabase: Client, jd_id: int):
     try:
         response = supabase.table("job_descriptions").select("*").eq("id", jd_id).execute()
         if response.data:
-            data = response.data[0]
-            return schemas.JobDescription(
-                id=data["id"],
-                job_id_str=data.get("job_id_str"),
-                content_hash=data["content_hash"],
-                job_title=data["job_title"],
-                company_name=data.get("company_name"),
-                location=data.get("location"),
-                ctc=data.get("ctc"),
-                status=data.get("status", "Active"),
-                details=data.get("details", {}),
-                created_at=data.get("created_at")
-            )
+            return _convert_to_schema(response.data[0])
     except Exception as e:
         logger.error(f"Error getting job description: {e}")
     return None
 
+async def aget_jd(supabase: AsyncClient, jd_id: int):
+    """Async version of get_jd"""
+    try:
+        response = await supabase.table("job_descriptions").select("*").eq("id", jd_id).execute()
+        if response.data:
+            return _convert_to_schema(response.data[0])
+    except Exception as e:
+        logger.error(f"Error getting job description: {e}")
+    return None
+
+def _find_indexed_jd(jd: schemas.JDModel, content_hash: str) -> Optional[schemas.JobDescription]:
+    """Resolves a JD from the in-memory index the same way the database lookups below would"""
+    index = get_jd_index()
+    if jd.jobId:
+        db_jd = index.get_by_job_id(jd.jobId)
+        if db_jd is not None:
+            return db_jd
+    db_jd = index.get_by_hash(content_hash)
+    # A row found by hash that is missing the jobId gets it written by the database path;
+    # one carrying a different jobId means the jobId has to be looked up in the database
+    if db_jd is not None and (not jd.jobId or db_jd.job_id_str == jd.jobId):
+        return db_jd
+    return None
+
 def get_or_create_job_description(supabase: Client, jd: schemas.JDModel):
     """Get or create job description in Supabase"""
+    content_hash = jd.content_hash()
+    db_jd = _find_indexed_jd(jd, content_hash)
+    if db_jd is not None:
+        metrics.increment("jd_index.hits")
+        return db_jd
+    metrics.increment("jd_index.misses")
+    generation = get_jd_index().generation
+    db_jd = _get_or_create_job_description(supabase, jd, content_hash)
+    if db_jd is not None:
+        get_jd_index().add(db_jd, generation)
+    return db_jd
+
+def _get_or_create_job_description(supabase: Client, jd: schemas.JDModel, content_hash: str):
     try:
         # First, try to find by the LLM-provided jobId (if it exists and is not empty)
         db_jd_by_job_id = None
@@ -215,7 +347,6 @@ def get_or_create_job_description(supabase: Client, jd: schemas.JDModel):
                 return _convert_to_schema(db_jd_by_job_id)
 
         # If not found by jobId, or jobId was missing/empty, use content hash
-        content_hash = _create_jd_content_hash(jd)
         response = supabase.table("job_descriptions").select("*").eq("content_hash", content_hash).execute()
         
         if response.data:
@@ -233,35 +364,95 @@ def get_or_create_job_description(supabase: Client, jd: schemas.JDModel):
 
         # If not found by either method, create a new one
         logger.info(f"Creating new JD with content hash '{content_hash}'")
-        location_str = f"{jd.location.city}, {jd.location.state}" if jd.location else None
-        ctc_str = jd.compensationAndBenefits.salaryRange if jd.compensationAndBenefits else None
-
-        insert_data = {
-            "job_id_str": jd.jobId,
-            "content_hash": content_hash,
-            "job_title": jd.jobTitle,
-            "company_name": jd.companyProfile.companyName,
-            "location": location_str,
-            "ctc": ctc_str,
-            "details": jd.dict()
-        }
-        
-        response = supabase.table("job_descriptions").insert(insert_data).execute()
+        response = supabase.table("job_descriptions").insert(_jd_insert_row(jd, content_hash)).execute()
         if response.data:
             return _convert_to_schema(response.data[0])
     except Exception as e:
         logger.error(f"Error getting or creating job description: {e}")
     return None
 
-def get_jds(supabase: Client, skip: int = 0, limit: int = 100):
-    """Get job descriptions from Supabase"""
+async def aget_or_create_job_description(supabase: AsyncClient, jd: schemas.JDModel):
+    """Async version of get_or_create_job_description"""
+    content_hash = jd.content_hash()
+    db_jd = _find_indexed_jd(jd, content_hash)
+    if db_jd is not None:
+        metrics.increment("jd_index.hits")
+        return db_jd
+    metrics.increment("jd_index.misses")
+    generation = get_jd_index().generation
+    db_jd = await _aget_or_create_job_description(supabase, jd, content_hash)
+    if db_jd is not None:
+        get_jd_index().add(db_jd, generation)
+    return db_jd
+
+async def _aget_or_create_job_description(supabase: AsyncClient, jd: schemas.JDModel, content_hash: str):
     try:
-        response = supabase.table("job_descriptions").select("*").range(skip, skip + limit - 1).execute()
+        if jd.jobId:
+            response = await supabase.table("job_descriptions").select("*").eq("job_id_str", jd.jobId).execute()
+            if response.data:
+                logger.info(f"Found existing JD by jobId '{jd.jobId}' (ID: {response.data[0]['id']})")
+                return _convert_to_schema(response.data[0])
+
+        response = await supabase.table("job_descriptions").select("*").eq("content_hash", content_hash).execute()
+        if response.data:
+            db_jd_by_hash = response.data[0]
+            logger.info(f"Found existing JD by content hash '{content_hash}' (ID: {db_jd_by_hash['id']})")
+            if not db_jd_by_hash.get("job_id_str") and jd.jobId:
+                logger.info(f"Updating existing JD (ID: {db_jd_by_hash['id']}) with jobId: {jd.jobId}")
+                update_response = await supabase.table("job_descriptions").update({
+                    "job_id_str": jd.jobId
+                }).eq("id", db_jd_by_hash["id"]).execute()
+                if update_response.data:
+                    db_jd_by_hash = update_response.data[0]
+            return _convert_to_schema(db_jd_by_hash)
+
+        logger.info(f"Creating new JD with content hash '{content_hash}'")
+        response = await supabase.table("job_descriptions").insert(_jd_insert_row(jd, content_hash)).execute()
         if response.data:
-            return [_convert_to_schema(item) for item in response.data]
+            return _convert_to_schema(response.data[0])
+    except Exception as e:
+        logger.error(f"Error getting or creating job description: {e}")
+    return None
+
+async def awarm_jd_index(supabase: AsyncClient, limit: int = JD_INDEX_WARM_SIZE) -> int:
+    """Loads the most recent job descriptions into the JD index. Returns how many were loaded."""
+    generation = get_jd_index().generation
+    try:
+        response = await supabase.table("job_descriptions").select("*").order("created_at", desc=True).limit(limit).execute()
+        jds = [_convert_to_schema(row) for row in response.data or []]
+        if get_jd_index().load(jds, generation):
+            return len(jds)
+    except Exception as e:
+        logger.error(f"Error warming the job description index: {e}")
+    return 0
+
+# The details JSON is by far the largest column; lists only include it on request
+_JD_LIST_COLUMNS = "id, job_id_str, content_hash, job_title, company_name, location, ctc, status, created_at"
+
+def _jds_query(supabase, skip: int, limit: int, after: Optional[Tuple[str, int]], include_details: bool, include_total: bool):
+    columns = f"{_JD_LIST_COLUMNS}, details" if include_details else _JD_LIST_COLUMNS
+    query = supabase.table("job_descriptions").select(columns, count="exact" if include_total else None)
+    return _paginate(query, skip, limit, after)
+
+def get_jds(supabase: Client, skip: int = 0, limit: int = 100, after: Optional[Tuple[str, int]] = None,
+            include_details: bool = False, include_total: bool = False) -> Page:
+    """Get a page of job descriptions from Supabase, newest first"""
+    try:
+        response = _jds_query(supabase, skip, limit, after, include_details, include_total).execute()
+        return _page(response, limit, _convert_to_schema)
     except Exception as e:
         logger.error(f"Error getting job descriptions: {e}")
-    return []
+    return Page(items=[])
+
+async def aget_jds(supabase: AsyncClient, skip: int = 0, limit: int = 100, after: Optional[Tuple[str, int]] = None,
+                   include_details: bool = False, include_total: bool = False) -> Page:
+    """Async version of get_jds"""
+    try:
+        response = await _jds_query(supabase, skip, limit, after, include_details, include_total).execute()
+        return _page(response, limit, _convert_to_schema)
+    except Exception as e:
+        logger.error(f"Error getting job descriptions: {e}")
+    return Page(items=[])
 
 def update_jd(supabase: Client, jd_id: int, jd_update: schemas.JobDescriptionUpdate):
     """Update job description in Supabase"""
@@ -270,6 +461,20 @@ def update_jd(supabase: Client, jd_id: int, jd_update: schemas.JobDescriptionUpd
         if update_data:
             response = supabase.table("job_descriptions").update(update_data).eq("id", jd_id).execute()
             if response.data:
+                get_jd_index().invalidate(jd_id)
+                return _convert_to_schema(response.data[0])
+    except Exception as e:
+        logger.error(f"Error updating job description: {e}")
+    return None
+
+async def aupdate_jd(supabase: AsyncClient, jd_id: int, jd_update: schemas.JobDescriptionUpdate):
+    """Async version of update_jd"""
+    try:
+        update_data = jd_update.dict(exclude_unset=True)
+        if update_data:
+            response = await supabase.table("job_descriptions").update(update_data).eq("id", jd_id).execute()
+            if response.data:
+                get_jd_index().invalidate(jd_id)
                 return _convert_to_schema(response.data[0])
     except Exception as e:
         logger.error(f"Error updating job description: {e}")
@@ -278,90 +483,76 @@ def update_jd(supabase: Client, jd_id: int, jd_update: schemas.JobDescriptionUpd
 def update_jd_details(supabase: Client, jd_id: int, jd_update: schemas.JobDescriptionDetailUpdate):
     """Update job description details in Supabase"""
     try:
-        jd_model = jd_update.details
-        # Recalculate content_hash based on the new full details
-        new_content_hash = _create_jd_content_hash(jd_model)
-        
-        update_data = {
-            "details": jd_model.dict(),
-            "job_title": jd_model.jobTitle,
-            "company_name": jd_model.companyProfile.companyName,
-            "location": f"{jd_model.location.city}, {jd_model.location.state}" if jd_model.location else None,
-            "ctc": jd_model.compensationAndBenefits.salaryRange if jd_model.compensationAndBenefits else None,
-            "content_hash": new_content_hash
-        }
-        
-        response = supabase.table("job_descriptions").update(update_data).eq("id", jd_id).execute()
+        response = supabase.table("job_descriptions").update(_jd_details_row(jd_update.details)).eq("id", jd_id).execute()
         if response.data:
+            get_jd_index().invalidate(jd_id)
             return _convert_to_schema(response.data[0])
     except Exception as e:
         logger.error(f"Error updating job description details: {e}")
     return None
 
-def get_jd_results(supabase: Client, jd_id: int):
-    """Get job description results from Supabase"""
+async def aupdate_jd_details(supabase: AsyncClient, jd_id: int, jd_update: schemas.JobDescriptionDetailUpdate):
+    """Async version of update_jd_details"""
     try:
-        response = supabase.table("analysis_results").select("""
-            *,
-            job_description:job_descriptions(*),
-            candidate:candidates(*)
-        """).eq("job_description_id", jd_id).execute()
+        response = await supabase.table("job_descriptions").update(_jd_details_row(jd_update.details)).eq("id", jd_id).execute()
         if response.data:
-            results = []
-            for item in response.data:
-                # Convert to schema (simplified)
-                results.append(schemas.AnalysisResult(
-                    id=item["id"],
-                    score=item["score"],
-                    match_level=item["match_level"],
-                    details=item.get("details", {}),
-                    candidate=schemas.Candidate(
-                        id=item["candidate"]["id"],
-                        name=item["candidate"]["name"],
-                        email=item["candidate"]["email"]
-                    ) if item.get("candidate") else None
-                ))
-            return results
+            get_jd_index().invalidate(jd_id)
+            return _convert_to_schema(response.data[0])
+    except Exception as e:
+        logger.error(f"Error updating job description details: {e}")
+    return None
+
+# Only the candidate columns the API returns; the JD is not part of the response at all
+_ANALYSIS_LIST_COLUMNS = (
+    "id, score, match_level, created_at, "
+    "candidate:candidates(id, name, email, phone, assessment_result, recruiter_id, uploaded_at)"
+)
+
+def _analyses_query(supabase, column: str, value, skip: int, limit: int, after: Optional[Tuple[str, int]],
+                    include_details: bool, include_total: bool):
+    columns = f"{_ANALYSIS_LIST_COLUMNS}, details" if include_details else _ANALYSIS_LIST_COLUMNS
+    query = supabase.table("analysis_results").select(columns, count="exact" if include_total else None).eq(column, value)
+    return _paginate(query, skip, limit, after)
+
+def get_jd_results(supabase: Client, jd_id: int, skip: int = 0, limit: int = 100, after: Optional[Tuple[str, int]] = None,
+                   include_details: bool = False, include_total: bool = False) -> Page:
+    """Get a page of a job description's analysis results from Supabase, newest first"""
+    try:
+        query = _analyses_query(supabase, "job_description_id", jd_id, skip, limit, after, include_details, include_total)
+        return _page(query.execute(), limit, _convert_analysis_with_candidate)
     except Exception as e:
         logger.error(f"Error getting job description results: {e}")
-    return []
+    return Page(items=[])
 
-def get_user_analyses(supabase: Client, user_id: str):
-    """Get user analyses from Supabase"""
+async def aget_jd_results(supabase: AsyncClient, jd_id: int, skip: int = 0, limit: int = 100, after: Optional[Tuple[str, int]] = None,
+                          include_details: bool = False, include_total: bool = False) -> Page:
+    """Async version of get_jd_results"""
     try:
-        response = supabase.table("analysis_results").select("""
-            *,
-            job_description:job_descriptions(*),
-            candidate:candidates(*)
-        """).eq("user_id", user_id).execute()
-        if response.data:
-            results = []
-            for item in response.data:
-                # Convert to schema (simplified)
-                candidate_data = item.get("candidate")
-                candidate = None
-                if candidate_data:
-                    candidate = schemas.Candidate(
-                        id=candidate_data["id"],
-                        name=candidate_data["name"],
-                        email=candidate_data["email"],
-                        phone=candidate_data.get("phone"),
-                        assessment_result=candidate_data.get("assessment_result"),
-                        recruiter_id=candidate_data.get("recruiter_id"),
-                        uploaded_at=candidate_data.get("uploaded_at")
-                    )
-                
-                results.append(schemas.AnalysisResult(
-                    id=item["id"],
-                    score=item["score"],
-                    match_level=item["match_level"],
-                    details=item.get("details", {}),
-                    candidate=candidate
-                ))
-            return results
+        query = _analyses_query(supabase, "job_description_id", jd_id, skip, limit, after, include_details, include_total)
+        return _page(await query.execute(), limit, _convert_analysis_with_candidate)
+    except Exception as e:
+        logger.error(f"Error getting job description results: {e}")
+    return Page(items=[])
+
+def get_user_analyses(supabase: Client, user_id: str, skip: int = 0, limit: int = 100, after: Optional[Tuple[str, int]] = None,
+                      include_details: bool = False, include_total: bool = False) -> Page:
+    """Get a page of a user's analyses from Supabase, newest first"""
+    try:
+        query = _analyses_query(supabase, "user_id", user_id, skip, limit, after, include_details, include_total)
+        return _page(query.execute(), limit, _convert_analysis_with_candidate)
     except Exception as e:
         logger.error(f"Error getting user analyses: {e}")
-    return []
+    return Page(items=[])
+
+async def aget_user_analyses(supabase: AsyncClient, user_id: str, skip: int = 0, limit: int = 100, after: Optional[Tuple[str, int]] = None,
+                             include_details: bool = False, include_total: bool = False) -> Page:
+    """Async version of get_user_analyses"""
+    try:
+        query = _analyses_query(supabase, "user_id", user_id, skip, limit, after, include_details, include_total)
+        return _page(await query.execute(), limit, _convert_analysis_with_candidate)
+    except Exception as e:
+        logger.error(f"Error getting user analyses: {e}")
+    return Page(items=[])
 
 # Candidate CRUD operations
 def get_or_create_candidate(supabase: Client, cv: schemas.CVModel, recruiter_id: str, assessment_result: str = None):
@@ -397,18 +588,121 @@ def get_or_create_candidate(supabase: Client, cv: schemas.CVModel, recruiter_id:
         logger.error(f"Error getting or creating candidate: {e}")
     return None
 
+async def aget_or_create_candidate(supabase: AsyncClient, cv: schemas.CVModel, recruiter_id: str, assessment_result: str = None):
+    """Async version of get_or_create_candidate"""
+    try:
+        row = _candidate_row(cv, recruiter_id, assessment_result)
+        response = await supabase.table("candidates").select("*").eq("email", row["email"]).execute()
+        if response.data:
+            update_data = {key: value for key, value in row.items() if key != "email"}
+            update_response = await supabase.table("candidates").update(update_data).eq("id", response.data[0]["id"]).execute()
+            if update_response.data:
+                return _convert_candidate_to_schema(update_response.data[0])
+
+        response = await supabase.table("candidates").insert(row).execute()
+        if response.data:
+            return _convert_candidate_to_schema(response.data[0])
+    except Exception as e:
+        logger.error(f"Error getting or creating candidate: {e}")
+    return None
+
+def _candidate_row(cv: schemas.CVModel, recruiter_id: str, assessment_result: str = None) -> Dict[str, Any]:
+    return {
+        "name": f"{cv.Personal_Data.firstName or ''} {cv.Personal_Data.lastName or ''}".strip(),
+        "email": cv.Personal_Data.email,
+        "phone": cv.Personal_Data.phone,
+        "recruiter_id": recruiter_id,
+        "assessment_result": assessment_result
+    }
+
+def get_or_create_candidates(supabase: Client, cvs: List[schemas.CVModel], recruiter_id: str, assessment_result: str = None) -> List[Optional[schemas.Candidate]]:
+    """
+    Bulk version of get_or_create_candidate. Resolves all emails with one query and
+    upserts new and changed candidates in one call; CVs without an email cannot be
+    matched to a stored candidate and are inserted in one more call. Returns the
+    candidates in the order of ``cvs``.
+    """
+    try:
+        rows = [_candidate_row(cv, recruiter_id, assessment_result) for cv in cvs]
+        # Later CVs with the same email win, as they would when saved one by one
+        rows_by_email = {row["email"]: row for row in rows if row["email"]}
+        candidates_by_email: Dict[str, schemas.Candidate] = {}
+
+        if rows_by_email:
+            response = supabase.table("candidates").select("*").in_("email", list(rows_by_email)).execute()
+            changed = _split_unchanged_candidates(rows_by_email, response.data, candidates_by_email)
+            if changed:
+                # candidates.email is unique, so one upsert both inserts and updates
+                response = supabase.table("candidates").upsert(changed, on_conflict="email").execute()
+                for item in response.data or []:
+                    candidates_by_email[item["email"]] = _convert_candidate_to_schema(item)
+
+        without_email = [row for row in rows if not row["email"]]
+        inserted = []
+        if without_email:
+            response = supabase.table("candidates").insert(without_email).execute()
+            inserted = response.data or []
+        return _candidates_in_order(rows, candidates_by_email, inserted)
+    except Exception as e:
+        logger.error(f"Error getting or creating candidates: {e}")
+    return [None] * len(cvs)
+
+async def aget_or_create_candidates(supabase: AsyncClient, cvs: List[schemas.CVModel], recruiter_id: str, assessment_result: str = None) -> List[Optional[schemas.Candidate]]:
+    """Async version of get_or_create_candidates"""
+    try:
+        rows = [_candidate_row(cv, recruiter_id, assessment_result) for cv in cvs]
+        rows_by_email = {row["email"]: row for row in rows if row["email"]}
+        candidates_by_email: Dict[str, schemas.Candidate] = {}
+
+        if rows_by_email:
+            response = await supabase.table("candidates").select("*").in_("email", list(rows_by_email)).execute()
+            changed = _split_unchanged_candidates(rows_by_email, response.data, candidates_by_email)
+            if changed:
+                response = await supabase.table("candidates").upsert(changed, on_conflict="email").execute()
+                for item in response.data or []:
+                    candidates_by_email[item["email"]] = _convert_candidate_to_schema(item)
+
+        without_email = [row for row in rows if not row["email"]]
+        inserted = []
+        if without_email:
+            response = await supabase.table("candidates").insert(without_email).execute()
+            inserted = response.data or []
+        return _candidates_in_order(rows, candidates_by_email, inserted)
+    except Exception as e:
+        logger.error(f"Error getting or creating candidates: {e}")
+    return [None] * len(cvs)
+
+def _candidates_in_order(rows: List[Dict[str, Any]], candidates_by_email: Dict[str, schemas.Candidate],
+                         inserted_without_email: list) -> List[Optional[schemas.Candidate]]:
+    """Lines candidates up with ``rows``; rows without an email take the inserted rows in insert order"""
+    inserted = iter(inserted_without_email)
+    candidates = []
+    for row in rows:
+        if row["email"]:
+            candidates.append(candidates_by_email.get(row["email"]))
+        else:
+            item = next(inserted, None)
+            candidates.append(_convert_candidate_to_schema(item) if item else None)
+    return candidates
+
+def _split_unchanged_candidates(rows_by_email: Dict[str, Dict[str, Any]], existing_rows: Optional[list],
+                                candidates_by_email: Dict[str, schemas.Candidate]) -> List[Dict[str, Any]]:
+    """Adds stored candidates whose row would not change to ``candidates_by_email`` and returns the rows to upsert"""
+    existing = {item["email"]: item for item in existing_rows or []}
+    changed = []
+    for email, row in rows_by_email.items():
+        current = existing.get(email)
+        if current and all(current.get(key) == value for key, value in row.items()):
+            candidates_by_email[email] = _convert_candidate_to_schema(current)
+        else:
+            changed.append(row)
+    return changed
+
 # AnalysisResult CRUD operations
 def create_analysis_result(supabase: Client, jd_db_id: int, candidate_db_id: int, user_id: str, result: dict):
     """Create analysis result in Supabase"""
     try:
-        insert_data = {
-            "job_description_id": jd_db_id,
-            "candidate_id": candidate_db_id,
-            "user_id": user_id,
-            "score": result["match_score"],
-            "match_level": result["match_level"],
-            "details": result["match_details"]
-        }
+        insert_data = _analysis_result_row(jd_db_id, candidate_db_id, user_id, result)
         response = supabase.table("analysis_results").insert(insert_data).execute()
         if response.data:
             return _convert_analysis_result_to_schema(response.data[0])
@@ -416,7 +710,74 @@ def create_analysis_result(supabase: Client, jd_db_id: int, candidate_db_id: int
         logger.error(f"Error creating analysis result: {e}")
     return None
 
+async def acreate_analysis_result(supabase: AsyncClient, jd_db_id: int, candidate_db_id: int, user_id: str, result: dict):
+    """Async version of create_analysis_result"""
+    try:
+        insert_data = _analysis_result_row(jd_db_id, candidate_db_id, user_id, result)
+        response = await supabase.table("analysis_results").insert(insert_data).execute()
+        if response.data:
+            return _convert_analysis_result_to_schema(response.data[0])
+    except Exception as e:
+        logger.error(f"Error creating analysis result: {e}")
+    return None
+
+def create_analysis_results(supabase: Client, jd_db_id: int, user_id: str, results: List[Tuple[int, dict]]) -> List[schemas.AnalysisResult]:
+    """Bulk version of create_analysis_result; ``results`` holds (candidate_db_id, result) pairs"""
+    if not results:
+        return []
+    try:
+        insert_data = [_analysis_result_row(jd_db_id, candidate_db_id, user_id, result) for candidate_db_id, result in results]
+        response = supabase.table("analysis_results").insert(insert_data).execute()
+        return [_convert_analysis_result_to_schema(item) for item in response.data or []]
+    except Exception as e:
+        logger.error(f"Error creating analysis results: {e}")
+    return []
+
+async def acreate_analysis_results(supabase: AsyncClient, jd_db_id: int, user_id: str, results: List[Tuple[int, dict]]) -> List[schemas.AnalysisResult]:
+    """Async version of create_analysis_results"""
+    if not results:
+        return []
+    try:
+        insert_data = [_analysis_result_row(jd_db_id, candidate_db_id, user_id, result) for candidate_db_id, result in results]
+        response = await supabase.table("analysis_results").insert(insert_data).execute()
+        return [_convert_analysis_result_to_schema(item) for item in response.data or []]
+    except Exception as e:
+        logger.error(f"Error creating analysis results: {e}")
+    return []
+
 # Helper functions
+def _jd_insert_row(jd: schemas.JDModel, content_hash: str) -> Dict[str, Any]:
+    return {
+        "job_id_str": jd.jobId,
+        "content_hash": content_hash,
+        "job_title": jd.jobTitle,
+        "company_name": jd.companyProfile.companyName,
+        "location": f"{jd.location.city}, {jd.location.state}" if jd.location else None,
+        "ctc": jd.compensationAndBenefits.salaryRange if jd.compensationAndBenefits else None,
+        "details": jd.details_payload()
+    }
+
+def _jd_details_row(jd_model: schemas.JDModel) -> Dict[str, Any]:
+    return {
+        "details": jd_model.details_payload(),
+        "job_title": jd_model.jobTitle,
+        "company_name": jd_model.companyProfile.companyName,
+        "location": f"{jd_model.location.city}, {jd_model.location.state}" if jd_model.location else None,
+        "ctc": jd_model.compensationAndBenefits.salaryRange if jd_model.compensationAndBenefits else None,
+        # Recalculate content_hash based on the new full details
+        "content_hash": jd_model.content_hash()
+    }
+
+def _analysis_result_row(jd_db_id: int, candidate_db_id: int, user_id: str, result: dict) -> Dict[str, Any]:
+    return {
+        "job_description_id": jd_db_id,
+        "candidate_id": candidate_db_id,
+        "user_id": user_id,
+        "score": result["match_score"],
+        "match_level": result["match_level"],
+        "details": result["match_details"]
+    }
+
 def _convert_to_schema(data: Dict[str, Any]) -> schemas.JobDescription:
     """Convert database data to JobDescription schema"""
     return schemas.JobDescription(
@@ -428,7 +789,7 @@ def _convert_to_schema(data: Dict[str, Any]) -> schemas.JobDescription:
         location=data.get("location"),
         ctc=data.get("ctc"),
         status=data.get("status", "Active"),
-        details=data.get("details", {}),
+        details=data.get("details"),
         created_at=data.get("created_at")
     )
 
@@ -444,6 +805,18 @@ def _convert_candidate_to_schema(data: Dict[str, Any]) -> schemas.Candidate:
         uploaded_at=data.get("uploaded_at")
     )
 
+def _convert_analysis_with_candidate(item: Dict[str, Any]) -> schemas.AnalysisResult:
+    """Convert an analysis result selected with its candidate to the AnalysisResult schema"""
+    candidate_data = item.get("candidate")
+    return schemas.AnalysisResult(
+        id=item["id"],
+        score=item["score"],
+        match_level=item["match_level"],
+        details=item.get("details"),
+        created_at=item.get("created_at"),
+        candidate=_convert_candidate_to_schema(candidate_data) if candidate_data else None
+    )
+
 def _convert_analysis_result_to_schema(data: Dict[str, Any]) -> schemas.AnalysisResult:
     """Convert database data to AnalysisResult schema"""
     return schemas.AnalysisResult(
@@ -1,5 +1,9 @@
 import os
-from supabase import create_client, Client
+import asyncio
+from typing import Optional
+
+import httpx
+from supabase import create_client, Client, acreate_client, AsyncClient, AsyncClientOptions
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -10,7 +14,68 @@ key: str = os.environ.get("SUPABASE_KEY")
 if not url or not key:
     raise ValueError("Supabase URL and Key must be set in the environment variables.")
 
+# Connection pool shared by every request on the async client
+SUPABASE_HTTP2 = os.getenv("SUPABASE_HTTP2", "true").lower() == "true"
+SUPABASE_MAX_CONNECTIONS = int(os.getenv("SUPABASE_MAX_CONNECTIONS", 100))
+SUPABASE_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("SUPABASE_MAX_KEEPALIVE_CONNECTIONS", 20))
+SUPABASE_KEEPALIVE_EXPIRY_SECONDS = float(os.getenv("SUPABASE_KEEPALIVE_EXPIRY_SECONDS", 30))
+SUPABASE_TIMEOUT_SECONDS = float(os.getenv("SUPABASE_TIMEOUT_SECONDS", 30))
+
 supabase: Client = create_client(url, key)
 
 def get_supabase() -> Client:
-    return supabase
\ No newline at end of file
+    return supabase
+
+_admin_supabase: Optional[Client] = None
+
+def get_admin_supabase() -> Client:
+    """
+    Sync client reserved for Auth admin calls. Logins sign in on the shared client,
+    which replaces its service key with the user's token; this one never holds a session.
+    """
+    global _admin_supabase
+    if _admin_supabase is None:
+        _admin_supabase = create_client(url, key)
+    return _admin_supabase
+
+_async_supabase: Optional[AsyncClient] = None
+_async_supabase_lock: Optional[asyncio.Lock] = None
+
+def create_http_client() -> httpx.AsyncClient:
+    """HTTP client whose keep-alive (HTTP/2 when available) connections are reused across requests"""
+    return httpx.AsyncClient(
+        http2=SUPABASE_HTTP2,
+        limits=httpx.Limits(
+            max_connections=SUPABASE_MAX_CONNECTIONS,
+            max_keepalive_connections=SUPABASE_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=SUPABASE_KEEPALIVE_EXPIRY_SECONDS
+        ),
+        timeout=httpx.Timeout(SUPABASE_TIMEOUT_SECONDS),
+        follow_redirects=True
+    )
+
+async def get_async_supabase() -> AsyncClient:
+    """
+    Async client for request handlers. It is created on first use and bound to the
+    server's event loop; code running in worker threads (background jobs, the
+    write-behind queue) keeps using the sync client from get_supabase().
+    """
+    global _async_supabase, _async_supabase_lock
+    if _async_supabase is None:
+        if _async_supabase_lock is None:
+            _async_supabase_lock = asyncio.Lock()
+        async with _async_supabase_lock:
+            if _async_supabase is None:
+                # The client acts with the service key only: no user sessions are stored on it
+                _async_supabase = await acreate_client(url, key, options=AsyncClientOptions(
+                    httpx_client=create_http_client(),
+                    auto_refresh_token=False,
+                    persist_session=False
+                ))
+    return _async_supabase
+
+async def close_async_supabase() -> None:
+    global _async_supabase
+    if _async_supabase is not None:
+        await _async_supabase.options.httpx_client.aclose()
+        _async_supabase = None
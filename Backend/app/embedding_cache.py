@@ -0,0 +1,135 @@
+import os
+import re
+import hashlib
+import threading
+import unicodedata
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from dotenv import load_dotenv
+
+from .sqlite_cache import SQLiteCache, open_sqlite_cache
+
+load_dotenv()
+
+# On-disk embedding store; an empty string keeps embeddings in the in-process LRU only
+EMBEDDING_CACHE_PATH = os.getenv("EMBEDDING_CACHE_PATH", os.path.join(".cache", "embeddings.sqlite3"))
+# Number of embeddings kept in the in-process LRU in front of the on-disk store
+EMBEDDING_CACHE_SIZE = int(os.getenv("EMBEDDING_CACHE_SIZE", 20000))
+# Least recently used embeddings are evicted once the on-disk store holds more than this many
+EMBEDDING_STORE_MAX_ENTRIES = int(os.getenv("EMBEDDING_STORE_MAX_ENTRIES", 200000))
+
+def normalize_text(text: str) -> str:
+    """Normalizes text so trivially different spellings share one cache entry."""
+    text = unicodedata.normalize("NFC", text)
+    return re.sub(r"\s+", " ", text).strip()
+
+def embedding_key(model_name: str, text: str) -> str:
+    """Content address of an embedding: SHA256 of the model name and normalized text."""
+    return hashlib.sha256(f"{model_name}\0{text}".encode("utf-8")).hexdigest()
+
+class EmbeddingStore(SQLiteCache):
+    """Embeddings as float32 vectors, shared by every worker and reused across restarts."""
+
+    def __init__(self, path: str, max_entries: int = EMBEDDING_STORE_MAX_ENTRIES):
+        super().__init__("embedding_cache", path, max_entries=max_entries)
+
+    def encode_value(self, value: np.ndarray) -> bytes:
+        return np.asarray(value, dtype=np.float32).tobytes()
+
+    def decode_value(self, value: bytes) -> np.ndarray:
+        return np.frombuffer(value, dtype=np.float32)
+
+class CachedEncoder:
+    """
+    Wraps a SentenceTransformer so ``encode`` results are cached by content hash.
+    Lookups go through an in-process LRU first, then the shared on-disk store, and
+    only the remaining misses are sent to the model in one batched call.
+    """
+
+    def __init__(self, model, model_name: str, store: Optional[EmbeddingStore] = None, max_size: int = EMBEDDING_CACHE_SIZE):
+        self.model = model
+        self.model_name = model_name
+        self.store = store
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._lru: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __getattr__(self, name):
+        # Anything other than encode (device, tokenizer, ...) comes from the wrapped model
+        if name == "model":
+            raise AttributeError(name)
+        return getattr(self.model, name)
+
+    def _lru_get(self, key: str) -> Optional[np.ndarray]:
+        with self._lock:
+            vector = self._lru.get(key)
+            if vector is not None:
+                self._lru.move_to_end(key)
+            return vector
+
+    def _lru_put(self, key: str, vector: np.ndarray) -> None:
+        with self._lock:
+            self._lru[key] = vector
+            self._lru.move_to_end(key)
+            while len(self._lru) > self.max_size:
+                self._lru.popitem(last=False)
+
+    def _lookup_store(self, keys: List[str]) -> Dict[str, np.ndarray]:
+        return self.store.get_many(keys) if self.store and keys else {}
+
+    def _save_store(self, items: List[Tuple[str, np.ndarray]]) -> None:
+        if self.store:
+            self.store.put_many(items)
+
+    def encode(self, sentences, convert_to_tensor: bool = False, **kwargs):
+        # Options that change the output (normalization, precision, ...) bypass the cache
+        if kwargs:
+            return self.model.encode(sentences, convert_to_tensor=convert_to_tensor, **kwargs)
+
+        single = isinstance(sentences, str)
+        texts = [normalize_text(t) for t in ([sentences] if single else sentences)]
+        if not texts:
+            return self.model.encode(texts, convert_to_tensor=convert_to_tensor)
+
+        keys = [embedding_key(self.model_name, text) for text in texts]
+        vectors: Dict[str, np.ndarray] = {}
+        for key in keys:
+            vector = self._lru_get(key)
+            if vector is not None:
+                vectors[key] = vector
+
+        pending = list(dict.fromkeys(k for k in keys if k not in vectors))
+        for key, vector in self._lookup_store(pending).items():
+            vectors[key] = vector
+            self._lru_put(key, vector)
+
+        missing = {}
+        for key, text in zip(keys, texts):
+            if key not in vectors:
+                missing.setdefault(key, text)
+        self.hits += sum(1 for key in keys if key not in missing)
+        self.misses += len(missing)
+
+        if missing:
+            encoded = np.asarray(self.model.encode(list(missing.values())), dtype=np.float32)
+            new_items = list(zip(missing.keys(), encoded))
+            for key, vector in new_items:
+                vectors[key] = vector
+                self._lru_put(key, vector)
+            self._save_store(new_items)
+
+        embeddings = np.stack([vectors[key] for key in keys])
+        if single:
+            embeddings = embeddings[0]
+        if convert_to_tensor:
+            import torch
+            return torch.from_numpy(embeddings)
+        return embeddings
+
+def open_embedding_store(path: str = EMBEDDING_CACHE_PATH) -> Optional[EmbeddingStore]:
+    """Opens the on-disk store, or returns None when it is disabled or unavailable."""
+    return open_sqlite_cache(EmbeddingStore, path, memory_fallback=False)
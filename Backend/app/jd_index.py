@@ -0,0 +1,113 @@
+import os
+import time
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional, Tuple
+
+from dotenv import load_dotenv
+
+from . import metrics, schemas
+
+load_dotenv()
+
+# Entries older than this are resolved against the database again, which bounds how long
+# an update made by another server process can go unnoticed
+JD_INDEX_TTL_SECONDS = float(os.getenv("JD_INDEX_TTL_SECONDS", 300))
+JD_INDEX_MAX_ENTRIES = int(os.getenv("JD_INDEX_MAX_ENTRIES", 10000))
+# Most recent job descriptions loaded into the index at startup
+JD_INDEX_WARM_SIZE = int(os.getenv("JD_INDEX_WARM_SIZE", 1000))
+
+class JDIndex:
+    """
+    In-memory map of job description rows by job_id_str and content_hash, so that
+    get_or_create_job_description resolves known JDs without a database round-trip.
+    Misses always fall back to the database. ``invalidate`` drops a JD after it is
+    updated; rows read before an invalidation are not added afterwards, so a lookup
+    racing an update cannot put the old row back.
+    """
+
+    def __init__(self, ttl_seconds: float = JD_INDEX_TTL_SECONDS, max_entries: int = JD_INDEX_MAX_ENTRIES):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._generation = 0
+        self._entries: "OrderedDict[int, Tuple[schemas.JobDescription, float]]" = OrderedDict()
+        self._by_job_id: Dict[str, int] = {}
+        self._by_hash: Dict[str, int] = {}
+
+    @property
+    def generation(self) -> int:
+        return self._generation
+
+    def _remove(self, jd_id: int) -> None:
+        entry = self._entries.pop(jd_id, None)
+        if entry is None:
+            return
+        jd = entry[0]
+        if jd.job_id_str and self._by_job_id.get(jd.job_id_str) == jd_id:
+            del self._by_job_id[jd.job_id_str]
+        if self._by_hash.get(jd.content_hash) == jd_id:
+            del self._by_hash[jd.content_hash]
+
+    def _put(self, jd: schemas.JobDescription, now: float) -> None:
+        self._remove(jd.id)
+        self._entries[jd.id] = (jd, now)
+        if jd.job_id_str:
+            self._by_job_id[jd.job_id_str] = jd.id
+        self._by_hash[jd.content_hash] = jd.id
+        while len(self._entries) > self.max_entries:
+            self._remove(next(iter(self._entries)))
+
+    def add(self, jd: schemas.JobDescription, generation: int) -> bool:
+        """Adds or replaces ``jd`` unless the index was invalidated after ``generation`` was read."""
+        with self._lock:
+            if generation != self._generation:
+                return False
+            self._put(jd, time.monotonic())
+        return True
+
+    def load(self, jds: Iterable[schemas.JobDescription], generation: int) -> bool:
+        """Adds ``jds`` without replacing entries that are already indexed, which may be newer."""
+        with self._lock:
+            if generation != self._generation:
+                return False
+            now = time.monotonic()
+            for jd in jds:
+                if jd.id not in self._entries:
+                    self._put(jd, now)
+        metrics.increment("jd_index.loads")
+        return True
+
+    def invalidate(self, jd_id: int) -> None:
+        with self._lock:
+            self._generation += 1
+            self._remove(jd_id)
+
+    def _get(self, jd_id: Optional[int]) -> Optional[schemas.JobDescription]:
+        with self._lock:
+            entry = self._entries.get(jd_id)
+            if entry is None:
+                return None
+            if time.monotonic() - entry[1] >= self.ttl_seconds:
+                self._remove(jd_id)
+                return None
+            self._entries.move_to_end(jd_id)
+            return entry[0]
+
+    def get_by_job_id(self, job_id_str: str) -> Optional[schemas.JobDescription]:
+        return self._get(self._by_job_id.get(job_id_str))
+
+    def get_by_hash(self, content_hash: str) -> Optional[schemas.JobDescription]:
+        return self._get(self._by_hash.get(content_hash))
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+_jd_index: Optional[JDIndex] = None
+
+def get_jd_index() -> JDIndex:
+    global _jd_index
+    if _jd_index is None:
+        _jd_index = JDIndex()
+        metrics.register_collector("jd_index", lambda: {"entries": len(_jd_index)})
+    return _jd_index
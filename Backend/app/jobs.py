@@ -0,0 +1,196 @@
+import os
+import time
+import uuid
+import logging
+import threading
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field, replace
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+from dotenv import load_dotenv
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+load_dotenv()
+
+# Which backend stores job state. Only the in-process "memory" backend ships today.
+JOB_BACKEND = os.getenv("JOB_BACKEND", "memory")
+# Number of jobs processed at the same time
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", 2))
+# How long finished jobs (and their results) are kept for polling
+JOB_TTL_SECONDS = int(os.getenv("JOB_TTL_SECONDS", 24 * 60 * 60))
+
+QUEUED = "queued"
+RUNNING = "running"
+COMPLETED = "completed"
+FAILED = "failed"
+
+@dataclass
+class Job:
+    id: str
+    kind: str
+    owner_id: str
+    total: int
+    status: str = QUEUED
+    results: List[Dict[str, Any]] = field(default_factory=list)
+    errors: List[Dict[str, Any]] = field(default_factory=list)
+    error: Optional[str] = None
+    # Set by the work function's return value once the job completes
+    summary: Optional[Dict[str, Any]] = None
+    created_at: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+    updated_at: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+
+    @property
+    def completed(self) -> int:
+        return len(self.results) + len(self.errors)
+
+class JobBackend(ABC):
+    """
+    Storage for job state and partial results. Implementations must be safe to use
+    from several worker threads; a Redis or SQLite backend can replace the
+    in-memory one without touching the endpoints or the workers.
+    """
+
+    @abstractmethod
+    def create_job(self, kind: str, owner_id: str, total: int) -> Job: ...
+
+    @abstractmethod
+    def get_job(self, job_id: str) -> Optional[Job]: ...
+
+    @abstractmethod
+    def set_status(self, job_id: str, status: str, error: Optional[str] = None,
+                   summary: Optional[Dict[str, Any]] = None) -> None: ...
+
+    @abstractmethod
+    def append_result(self, job_id: str, result: Dict[str, Any]) -> None: ...
+
+    @abstractmethod
+    def append_error(self, job_id: str, error: Dict[str, Any]) -> None: ...
+
+class InMemoryJobBackend(JobBackend):
+    """Keeps jobs in a dict of the current process. Finished jobs expire after ``ttl_seconds``."""
+
+    def __init__(self, ttl_seconds: int = JOB_TTL_SECONDS):
+        self.ttl_seconds = ttl_seconds
+        self._jobs: Dict[str, Job] = {}
+        self._finished_at: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def _prune(self) -> None:
+        cutoff = time.monotonic() - self.ttl_seconds
+        for job_id in [job_id for job_id, finished in self._finished_at.items() if finished < cutoff]:
+            self._jobs.pop(job_id, None)
+            self._finished_at.pop(job_id, None)
+
+    def create_job(self, kind: str, owner_id: str, total: int) -> Job:
+        job = Job(id=uuid.uuid4().hex, kind=kind, owner_id=owner_id, total=total)
+        with self._lock:
+            self._prune()
+            self._jobs[job.id] = job
+        return replace(job)
+
+    def get_job(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            self._prune()
+            job = self._jobs.get(job_id)
+            # Hand out a snapshot so callers never see a list that is being appended to
+            return replace(job, results=list(job.results), errors=list(job.errors)) if job else None
+
+    def _update(self, job_id: str, update: Callable[[Job], None]) -> None:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return
+            update(job)
+            job.updated_at = datetime.now(timezone.utc)
+            if job.status in (COMPLETED, FAILED):
+                self._finished_at[job_id] = time.monotonic()
+
+    def set_status(self, job_id: str, status: str, error: Optional[str] = None,
+                   summary: Optional[Dict[str, Any]] = None) -> None:
+        def update(job: Job):
+            job.status = status
+            job.error = error
+            job.summary = summary
+        self._update(job_id, update)
+
+    def append_result(self, job_id: str, result: Dict[str, Any]) -> None:
+        self._update(job_id, lambda job: job.results.append(result))
+
+    def append_error(self, job_id: str, error: Dict[str, Any]) -> None:
+        self._update(job_id, lambda job: job.errors.append(error))
+
+class JobHandle:
+    """Passed to a job's work function to report partial results as they are produced."""
+
+    def __init__(self, backend: JobBackend, job_id: str):
+        self.backend = backend
+        self.job_id = job_id
+
+    def add_result(self, result: Dict[str, Any]) -> None:
+        self.backend.append_result(self.job_id, result)
+
+    def add_error(self, error: Dict[str, Any]) -> None:
+        self.backend.append_error(self.job_id, error)
+
+class JobQueue:
+    """
+    Runs submitted jobs on a pool of in-process worker threads. A job's work
+    function reports partial results through its JobHandle and may return a
+    summary dict that is stored when the job completes.
+    """
+
+    def __init__(self, backend: JobBackend, max_workers: int = JOB_WORKERS):
+        self.backend = backend
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="job-worker")
+
+    def submit(self, kind: str, owner_id: str, total: int, work: Callable[[JobHandle], Optional[Dict[str, Any]]]) -> Job:
+        job = self.backend.create_job(kind, owner_id, total)
+        self._executor.submit(self._run, job.id, work)
+        return job
+
+    def _run(self, job_id: str, work: Callable[[JobHandle], Optional[Dict[str, Any]]]) -> None:
+        self.backend.set_status(job_id, RUNNING)
+        try:
+            summary = work(JobHandle(self.backend, job_id))
+        except Exception as e:
+            logger.error(f"Job {job_id} failed: {e}", exc_info=True)
+            self.backend.set_status(job_id, FAILED, error=str(e))
+        else:
+            self.backend.set_status(job_id, COMPLETED, summary=summary)
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self.backend.get_job(job_id)
+
+    def shutdown(self, wait: bool = False) -> None:
+        self._executor.shutdown(wait=wait, cancel_futures=not wait)
+
+_BACKENDS: Dict[str, Callable[[], JobBackend]] = {
+    "memory": InMemoryJobBackend,
+}
+
+def register_job_backend(name: str, factory: Callable[[], JobBackend]) -> None:
+    _BACKENDS[name] = factory
+
+_job_queue: Optional[JobQueue] = None
+_job_queue_lock = threading.Lock()
+
+def get_job_queue() -> JobQueue:
+    global _job_queue
+    if _job_queue is None:
+        with _job_queue_lock:
+            if _job_queue is None:
+                if JOB_BACKEND not in _BACKENDS:
+                    raise ValueError(f"Unknown JOB_BACKEND '{JOB_BACKEND}'. Available backends: {', '.join(_BACKENDS)}")
+                _job_queue = JobQueue(_BACKENDS[JOB_BACKEND]())
+    return _job_queue
+
+def shutdown_job_queue() -> None:
+    global _job_queue
+    if _job_queue is not None:
+        _job_queue.shutdown()
+        _job_queue = None
@@ -2,19 +2,33 @@ import os
 import json
 import re
 import groq
+import asyncio
+import hashlib
+import weakref
 import threading
-from typing import Optional, Dict, List
+from contextlib import contextmanager
+from typing import Any, Optional, Dict, List
 from dotenv import load_dotenv
 from groq import APIError
 
 from .parsing import preprocess_resume_text, clean_json_response
 from .schemas import JDModel, CVModel
+from .llm_cache import LLMResultCache, llm_cache_key, open_llm_cache
 
 load_dotenv()
 
 LLM_MODEL_NAME = os.getenv("LLM_MODEL_NAME", "gemma2-9b-it")
 
+# Part of the result cache key: bump when a prompt changes so results of the old prompt are not reused
+RESUME_PROMPT_VERSION = "1"
+JD_PROMPT_VERSION = "1"
+SKILLS_PROMPT_VERSION = "1"
+QUESTIONS_PROMPT_VERSION = "1"
+
 client = None
+# One async client per event loop (see get_async_groq_client)
+async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Any]" = weakref.WeakKeyDictionary()
+_llm_cache = None
 _client_lock = threading.Lock()
 
 def get_groq_client():
@@ -30,6 +44,45 @@ def get_groq_client():
             client = groq.Groq(api_key=GROK_API_KEY)
     return client
 
+def get_async_groq_client():
+    """
+    The async client of the running event loop. Its httpx connection pool is bound to the
+    loop that opened the connections, so background jobs running their own loop get their own client.
+    """
+    loop = asyncio.get_running_loop()
+    local_client = async_clients.get(loop)
+    if local_client is not None:
+        return local_client
+
+    with _client_lock:
+        local_client = async_clients.get(loop)
+        if local_client is None:
+            GROK_API_KEY = os.getenv('GROK_API_KEY')
+            if not GROK_API_KEY:
+                raise ValueError("GROK_API_KEY environment variable is not set. Please set it in your .env file or environment.")
+            local_client = async_clients[loop] = groq.AsyncGroq(api_key=GROK_API_KEY)
+    return local_client
+
+async def aclose_async_groq_client() -> None:
+    """Closes the running event loop's client; called before a job's own loop finishes."""
+    local_client = async_clients.pop(asyncio.get_running_loop(), None)
+    if local_client is not None:
+        await local_client.close()
+
+def get_llm_cache() -> LLMResultCache:
+    global _llm_cache
+    if _llm_cache is None:
+        with _client_lock:
+            if _llm_cache is None:
+                _llm_cache = open_llm_cache()
+    return _llm_cache
+
+def _resume_cache_key(resume_text: str, jd_skill_categories: Optional[Dict[str, List[str]]] = None) -> str:
+    return llm_cache_key("resume", preprocess_resume_text(resume_text), LLM_MODEL_NAME, RESUME_PROMPT_VERSION, jd_skill_categories)
+
+def _jd_cache_key(jd_text: str) -> str:
+    return llm_cache_key("jd", re.sub(r"\s+", " ", jd_text).strip(), LLM_MODEL_NAME, JD_PROMPT_VERSION)
+
 class LLMJsonError(Exception):
     """Custom exception for errors related to LLM JSON processing."""
     pass
@@ -200,14 +253,12 @@ RESUME_SCHEMA_JSON = '''{
     }
 }'''
 
-def convert_resume_to_json(resume_text: str, jd_skill_categories: Optional[Dict[str, List[str]]] = None) -> dict:
-    local_client = get_groq_client()
-    try:
-        schema = RESUME_SCHEMA_JSON
-        cleaned_text = preprocess_resume_text(resume_text)
-        skill_presence_instruction = ""
-        if jd_skill_categories:
-            skill_presence_instruction = f"""
+def _build_resume_messages(resume_text: str, jd_skill_categories: Optional[Dict[str, List[str]]] = None) -> list:
+    schema = RESUME_SCHEMA_JSON
+    cleaned_text = preprocess_resume_text(resume_text)
+    skill_presence_instruction = ""
+    if jd_skill_categories:
+        skill_presence_instruction = f"""
 - For the 'skill_presence' field, create a dictionary where each skill from the provided categories (critical, important, extra) is a key with a boolean value.
 - Set the value to 'true' if the skill is present in the resume, 'false' if it is not found.
 - Check all skills in the provided categories and assign boolean values accordingly.
@@ -215,7 +266,7 @@ def convert_resume_to_json(resume_text: str, jd_skill_categories: Optional[Dict[
 - Use the provided skill categories for this check:
 {json.dumps(jd_skill_categories, indent=2)}
 """
-        prompt = f"""
+    prompt = f"""
 You are a JSON extraction engine. Convert the following resume text into precisely the JSON schema specified below.
 IMPORTANT INSTRUCTIONS:
 - Extract only information that is clearly present in the text
@@ -243,41 +294,137 @@ Resume Text:
 {cleaned_text}
 NOTE: Output only valid JSON matching the exact schema structure.
 """
-        response = local_client.chat.completions.create(
+    return [
+        {"role": "system", "content": "You are a precise JSON extraction expert. Only extract information that is explicitly stated in the text. Return valid JSON only."},
+        {"role": "user", "content": prompt}
+    ]
+
+def _parse_resume_content(content: str) -> dict:
+    cleaned_content = clean_json_response(content)
+    try:
+        result = json.loads(cleaned_content)
+        if "Analytics" not in result:
+            result["Analytics"] = {}
+        if "keyword_analysis" not in result["Analytics"]:
+            result["Analytics"]["keyword_analysis"] = {}
+
+        # Ensure skill_presence is properly initialized
+        if "skill_presence" not in result:
+            result["skill_presence"] = {}
+        elif not isinstance(result["skill_presence"], dict):
+            result["skill_presence"] = {}
+
+        return result
+    except json.JSONDecodeError:
+        raise LLMJsonError("Could not parse the response from the AI service as JSON.")
+
+def _resume_completion_args(resume_text: str, jd_skill_categories: Optional[Dict[str, List[str]]] = None) -> dict:
+    return {
+        "model": LLM_MODEL_NAME,
+        "messages": _build_resume_messages(resume_text, jd_skill_categories),
+        "temperature": 0.05,
+        "max_tokens": 6000
+    }
+
+@contextmanager
+def _resume_llm_errors():
+    try:
+        yield
+    except APIError as e:
+        # Explicitly catch and re-raise APIError as LLMJsonError for consistent error handling by the caller
+        raise LLMJsonError(f"The AI service returned an error: {e.message}") from e
+    except Exception as e:
+        # Catch any other unexpected errors (e.g., network issues, Groq library errors) and wrap them
+        raise LLMJsonError(f"An unexpected error occurred while processing the resume: {e}") from e
+
+async def _aget_cached(cache_key: str) -> Optional[Any]:
+    # The result cache is SQLite, so async callers read and write it off the event loop
+    return await asyncio.to_thread(lambda: get_llm_cache().get(cache_key))
+
+async def _aput_cached(cache_key: str, value: Any) -> None:
+    await asyncio.to_thread(lambda: get_llm_cache().put(cache_key, value))
+
+def convert_resume_to_json(resume_text: str, jd_skill_categories: Optional[Dict[str, List[str]]] = None) -> dict:
+    # The same resume is often uploaded against several JDs; repeats are served from the cache
+    cache_key = _resume_cache_key(resume_text, jd_skill_categories)
+    cached = get_llm_cache().get(cache_key)
+    if cached is not None:
+        return cached
+
+    with _resume_llm_errors():
+        response = get_groq_client().chat.completions.create(**_resume_completion_args(resume_text, jd_skill_categories))
+        result = _parse_resume_content(response.choices[0].message.content.strip())
+    get_llm_cache().put(cache_key, result)
+    return result
+
+async def aconvert_resume_to_json(resume_text: str, jd_skill_categories: Optional[Dict[str, List[str]]] = None) -> dict:
+    """Async variant of convert_resume_to_json, so many resumes can be converted concurrently."""
+    cache_key = _resume_cache_key(resume_text, jd_skill_categories)
+    cached = await _aget_cached(cache_key)
+    if cached is not None:
+        return cached
+
+    with _resume_llm_errors():
+        response = await get_async_groq_client().chat.completions.create(**_resume_completion_args(resume_text, jd_skill_categories))
+        result = _parse_resume_content(response.choices[0].message.content.strip())
+    await _aput_cached(cache_key, result)
+    return result
+
+async def acheck_skill_presence(resume_summary: str, skills: List[str]) -> Dict[str, bool]:
+    """
+    Fallback for skills the local matcher in app.skills cannot decide. Returns a
+    boolean for every skill in ``skills``; skills missing from the answer are absent.
+    """
+    skills = sorted(set(skills))
+    cache_key = llm_cache_key("skills", resume_summary, LLM_MODEL_NAME, SKILLS_PROMPT_VERSION, {"skills": skills})
+    cached = await _aget_cached(cache_key)
+    if cached is not None:
+        return cached
+
+    local_client = get_async_groq_client()
+    prompt = f"""
+Decide for each skill below whether the candidate described by the resume excerpt has it.
+Count a skill as present when the resume states it directly or describes work that clearly requires it.
+Output only a JSON object mapping every skill name exactly as given to true or false.
+
+Skills:
+{json.dumps(skills)}
+
+Resume:
+{resume_summary}
+"""
+    try:
+        response = await local_client.chat.completions.create(
             model=LLM_MODEL_NAME,
             messages=[
-                {"role": "system", "content": "You are a precise JSON extraction expert. Only extract information that is explicitly stated in the text. Return valid JSON only."},
+                {"role": "system", "content": "You are a precise resume screening assistant. Return valid JSON only."},
                 {"role": "user", "content": prompt}
             ],
-            temperature=0.05,
-            max_tokens=6000
+            temperature=0.0,
+            max_tokens=1024
         )
         content = response.choices[0].message.content.strip()
-        cleaned_content = clean_json_response(content)
-        try:
-            result = json.loads(cleaned_content)
-            if "Analytics" not in result:
-                result["Analytics"] = {}
-            if "keyword_analysis" not in result["Analytics"]:
-                result["Analytics"]["keyword_analysis"] = {}
-            
-            # Ensure skill_presence is properly initialized
-            if "skill_presence" not in result:
-                result["skill_presence"] = {}
-            elif not isinstance(result["skill_presence"], dict):
-                result["skill_presence"] = {}
-            
-            return result
-        except json.JSONDecodeError:
-            raise LLMJsonError("Could not parse the response from the AI service as JSON.")
-    except APIError as e:
-        # Explicitly catch and re-raise APIError as LLMJsonError for consistent error handling by the caller
-        raise LLMJsonError(f"The AI service returned an error: {e.message}") from e
+        answer = json.loads(clean_json_response(content))
+        if not isinstance(answer, dict):
+            raise LLMJsonError("The AI service did not return a JSON object for skill presence.")
+    except LLMJsonError:
+        raise
+    except (APIError, json.JSONDecodeError) as e:
+        raise LLMJsonError(f"Could not check skill presence: {e}") from e
     except Exception as e:
-        # Catch any other unexpected errors (e.g., network issues, Groq library errors) and wrap them
-        raise LLMJsonError(f"An unexpected error occurred while processing the resume: {e}") from e
+        raise LLMJsonError(f"An unexpected error occurred while checking skill presence: {e}") from e
+
+    result = {skill: answer.get(skill) is True or str(answer.get(skill)).lower() == "true" for skill in skills}
+    await _aput_cached(cache_key, result)
+    return result
 
 def convert_jd_to_json(jd_text: str) -> dict:
+    # The same JD file is often re-uploaded through /extract_jd and /jds/upload
+    cache_key = _jd_cache_key(jd_text)
+    cached = get_llm_cache().get(cache_key)
+    if cached is not None:
+        return cached
+
     local_client = get_groq_client()
     try:
         schema = JD_SCHEMA_JSON
@@ -330,6 +477,7 @@ NOTE: Please output only a valid JSON matching the EXACT schema.
                 result["requiredSkills"] = []
             if "educationRequired" not in result:
                 result["educationRequired"] = []
+            get_llm_cache().put(cache_key, result)
             return result
         except json.JSONDecodeError:
             raise LLMJsonError("Could not parse the response from the AI service as JSON.")
@@ -340,7 +488,23 @@ NOTE: Please output only a valid JSON matching the EXACT schema.
         # Catch any other unexpected errors (e.g., network issues, Groq library errors) and wrap them
         raise LLMJsonError(f"An unexpected error occurred while processing the job description: {e}") from e
 
+def _content_hash(model) -> str:
+    return hashlib.sha256(model.model_dump_json().encode("utf-8")).hexdigest()
+
+def _interview_questions_cache_key(jd: JDModel, cv: CVModel) -> str:
+    # The JD hash is memoized on the model, so keying every CV of a batch does not reserialize the JD
+    return llm_cache_key("questions", f"{jd.content_hash()}:{_content_hash(cv)}", LLM_MODEL_NAME, QUESTIONS_PROMPT_VERSION)
+
+def get_cached_interview_questions(jd: JDModel, cv: CVModel) -> Optional[list]:
+    """Returns previously generated questions for this (JD, CV) pair without calling the LLM."""
+    return get_llm_cache().get(_interview_questions_cache_key(jd, cv))
+
 def generate_interview_questions(jd: JDModel, cv: CVModel) -> list:
+    cache_key = _interview_questions_cache_key(jd, cv)
+    cached = get_llm_cache().get(cache_key)
+    if cached is not None:
+        return cached
+
     local_client = get_groq_client()
     prompt = f"""
 Given the following job description and candidate resume, generate 3-5 specific interview questions that would help assess the candidate's fit for this role. Focus on their experience, skills, and any gaps or strengths.
@@ -373,7 +537,9 @@ Output only a JSON array of questions.
         content = response.choices[0].message.content.strip()
         questions = json.loads(clean_json_response(content))
         if isinstance(questions, list):
-            return [str(q) for q in questions if isinstance(q, str)]
+            questions = [str(q) for q in questions if isinstance(q, str)]
+            get_llm_cache().put(cache_key, questions)
+            return questions
     except (APIError, json.JSONDecodeError) as e:
         # Catch API errors and JSON parsing errors, re-raise as LLMJsonError
         raise LLMJsonError(f"Could not generate interview questions: {e}") from e
@@ -0,0 +1,43 @@
+import os
+import json
+import hashlib
+from typing import Any, Dict, List, Optional
+
+from dotenv import load_dotenv
+
+from .sqlite_cache import SQLiteCache, open_sqlite_cache
+
+load_dotenv()
+
+# On-disk cache of LLM extraction results; an empty string keeps it in memory only
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", os.path.join(".cache", "llm.sqlite3"))
+# Entries older than this are treated as misses and removed
+LLM_CACHE_TTL_SECONDS = int(os.getenv("LLM_CACHE_TTL_SECONDS", 30 * 24 * 60 * 60))
+# Least recently used entries are evicted once the cache holds more than this many results
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", 10000))
+
+def llm_cache_key(
+    kind: str,
+    text: str,
+    model_name: str,
+    prompt_version: str,
+    skill_categories: Optional[Dict[str, List[str]]] = None
+) -> str:
+    """SHA256 of everything that determines an extraction result."""
+    payload = json.dumps([kind, text, model_name, prompt_version, skill_categories], sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+class LLMResultCache(SQLiteCache):
+    """Parsed LLM results, stored as JSON, with TTL and size-based eviction. The LLM is always the fallback."""
+
+    def __init__(self, path: str = ":memory:", ttl_seconds: int = LLM_CACHE_TTL_SECONDS, max_entries: int = LLM_CACHE_MAX_ENTRIES):
+        super().__init__("llm_cache", path, max_entries=max_entries, ttl_seconds=ttl_seconds)
+
+    def encode_value(self, value: Any) -> bytes:
+        return json.dumps(value).encode("utf-8")
+
+    def decode_value(self, value: bytes) -> Any:
+        return json.loads(value)
+
+def open_llm_cache(path: str = LLM_CACHE_PATH) -> LLMResultCache:
+    return open_sqlite_cache(LLMResultCache, path)
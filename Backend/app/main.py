@@ -1,27 +1,40 @@
-from fastapi import FastAPI, UploadFile, File, Form, Body, Depends, HTTPException, status
-from fastapi.responses import JSONResponse
+from fastapi import FastAPI, UploadFile, File, Form, Body, Depends, HTTPException, status, Response, Query
+from fastapi.responses import JSONResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.security import OAuth2PasswordRequestForm
-import tempfile
-import shutil
+import asyncio
 import os
 import json
 import secrets
 import logging
-from typing import List
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import List, Optional
 from datetime import timedelta
 import pydantic
 
 from app import crud, schemas, auth, llm
-from app.database import get_supabase
+from app.database import get_supabase, get_async_supabase, close_async_supabase
+from app.repository import Repository, get_repository
 from app.schemas import JDModel, CVModel
-from app.parsing import extract_text_from_file, clean_resume_json, to_bool
-from app.llm import convert_jd_to_json, convert_resume_to_json, generate_interview_questions
-from app.matching import compute_similarity, get_match_level
+from app.parsing import clean_resume_json, to_bool
+from app.text_cache import extract_text_cached
+from app.llm import convert_jd_to_json, generate_interview_questions
+from app.matching import compute_similarity_batch, get_match_level
+from app.pipeline import LLM_MAX_CONCURRENCY, extract_resume_batch, iter_resume_extractions, shutdown_process_pool
+from app.jobs import Job, get_job_queue, shutdown_job_queue
+from app.skills import detect_skill_presence
+from app.user_directory import get_user_directory
+from app.persistence import AnalysisWrite, save_analysis_results, drain_persistence_queue
+from app import metrics
+from app.archives import ARCHIVE_MAX_SIZE_MB, ArchiveError, ArchiveTooLarge, read_resume_archive
 
 logging.basicConfig(level=logging.INFO)
 
 MAX_FILE_SIZE = 10 * 1024 * 1024  # 10 MB
+# Interview questions are generated in the background for this many top-ranked candidates per match
+INTERVIEW_QUESTIONS_TOP_K = int(os.getenv("INTERVIEW_QUESTIONS_TOP_K", 5))
+# /match/stream scores and emits candidates in chunks of this many, so the first results arrive before the batch is scored
+MATCH_STREAM_CHUNK_SIZE = int(os.getenv("MATCH_STREAM_CHUNK_SIZE", 8))
 ALLOWED_CONTENT_TYPES = [
     "application/pdf",
     "application/vnd.openxmlformats-officedocument.wordprocessingml.document", # .docx
@@ -32,7 +45,7 @@ ALLOWED_CONTENT_TYPES = [
 app = FastAPI()
 
 @app.on_event("startup")
-def startup_event():
+async def startup_event():
     # Skip startup event during testing
     import os
     if os.getenv("TESTING") == "1":
@@ -40,8 +53,17 @@ def startup_event():
     
     logging.info("Running startup tasks...")
     # download_nltk_data()
+    await get_repository().warm_up()
     logging.info("Startup tasks completed.")
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    shutdown_job_queue()
+    # Match results still buffered for the database are written before exiting
+    await asyncio.to_thread(drain_persistence_queue)
+    shutdown_process_pool()
+    await close_async_supabase()
+
 # Configure CORS to allow requests from Vercel
 app.add_middleware(
     CORSMiddleware,
@@ -49,6 +71,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "X-Total-Count"],
 )
 
 # Token endpoint for Supabase authentication
@@ -59,8 +82,9 @@ async def login_for_access_token(
 ):
     """Authenticate user with Supabase and return access token"""
     try:
-        # Try normal sign in first
-        response = supabase.auth.sign_in_with_password({
+        # Try normal sign in first. Signing in attaches the session to the client, so this stays
+        # on the sync client (in a worker thread) rather than the shared async one.
+        response = await asyncio.to_thread(supabase.auth.sign_in_with_password, {
             "email": form_data.username,
             "password": form_data.password
         })
@@ -89,12 +113,11 @@ async def login_for_access_token(
 
 @app.get("/users/me", response_model=schemas.User)
 async def read_users_me(current_user: schemas.User = Depends(auth.get_current_user)):
-    print(f"Current user data being returned: {current_user}")  # Debug log
     return current_user
 
 # User routes
 @app.post("/users/", response_model=schemas.User)
-def create_user(user: schemas.UserCreate, supabase = Depends(get_supabase), current_user: schemas.User = Depends(auth.get_current_admin_user)):
+async def create_user(user: schemas.UserCreate, supabase = Depends(get_async_supabase), current_user: schemas.User = Depends(auth.get_current_admin_user)):
     # Only admins can create new users
     logging.info(f"Attempting to create user: {user.email} with role: {user.role}")
     try:
@@ -104,7 +127,7 @@ def create_user(user: schemas.UserCreate, supabase = Depends(get_supabase), curr
         logging.info(f"Using Supabase URL: {supabase_url}, Key length: {len(supabase_key) if supabase_key != 'NOT SET' else 'N/A'}")
         
         # Create the user in Supabase Auth
-        response = supabase.auth.admin.create_user({
+        response = await supabase.auth.admin.create_user({
             "email": user.email,
             "password": user.password,
             "email_confirm": True,  # Set to False if you don't want email confirmation
@@ -117,6 +140,7 @@ def create_user(user: schemas.UserCreate, supabase = Depends(get_supabase), curr
         new_user = response.user
         if new_user:
             logging.info(f"Successfully created user: {new_user.email}")
+            get_user_directory().invalidate()
             return schemas.User(
                 id=new_user.id,
                 username=new_user.user_metadata.get("username", new_user.email),
@@ -140,20 +164,20 @@ def create_user(user: schemas.UserCreate, supabase = Depends(get_supabase), curr
         raise HTTPException(status_code=400, detail=f"Error creating user: {error_msg}")
 
 @app.get("/users/", response_model=List[schemas.User])
-def read_users(skip: int = 0, limit: int = 100, username: str = None, supabase = Depends(get_supabase), current_user: schemas.User = Depends(auth.get_current_admin_user)):
-    users = crud.get_users(supabase, skip=skip, limit=limit, username=username)
+async def read_users(skip: int = 0, limit: int = 100, username: str = None, supabase = Depends(get_async_supabase), current_user: schemas.User = Depends(auth.get_current_admin_user)):
+    users = await crud.aget_users(supabase, skip=skip, limit=limit, username=username)
     return users
 
 @app.get("/users/{user_id}", response_model=schemas.User)
-def read_user(user_id: str, supabase = Depends(get_supabase), current_user: schemas.User = Depends(auth.get_current_admin_user)):
-    db_user = crud.get_user(supabase, user_id=user_id)
+async def read_user(user_id: str, supabase = Depends(get_async_supabase), current_user: schemas.User = Depends(auth.get_current_admin_user)):
+    db_user = await crud.aget_user(supabase, user_id=user_id)
     if db_user is None:
         raise HTTPException(status_code=404, detail="User not found")
     return db_user
 
 @app.delete("/users/{user_id}", response_model=schemas.User)
-def delete_user(user_id: str, supabase = Depends(get_supabase), current_user: schemas.User = Depends(auth.get_current_admin_user)):
-    db_user = crud.delete_user(supabase, user_id=user_id)
+async def delete_user(user_id: str, supabase = Depends(get_async_supabase), current_user: schemas.User = Depends(auth.get_current_admin_user)):
+    db_user = await crud.adelete_user(supabase, user_id=user_id)
     if db_user is None:
         raise HTTPException(status_code=404, detail="User not found")
     return db_user
@@ -177,28 +201,23 @@ async def extract_jd(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="You do not have permission for this action."
         )
-    with tempfile.TemporaryDirectory() as tmpdir:
-        sanitized_filename = os.path.basename(jd_file.filename)
-        jd_path = os.path.join(tmpdir, sanitized_filename)
-        with open(jd_path, "wb") as f:
-            shutil.copyfileobj(jd_file.file, f)
-        
-        jd_text = extract_text_from_file(jd_path)
-        if not jd_text:
-            raise HTTPException(status_code=400, detail=f"Failed to extract text from {jd_file.filename}")
-        
-        try:
-            jd_json = convert_jd_to_json(jd_text)
-        except llm.LLMJsonError as e:
-            logging.error(f"Failed to process JD from file {jd_file.filename}: {e}", exc_info=True)
-            raise HTTPException(status_code=502, detail=f"Failed to process job description: The AI service encountered an error.")
-        
-        return jd_json
+    # Read straight from the upload's spooled file, or from the text cache when the same file was seen before
+    jd_text = await asyncio.to_thread(extract_text_cached, jd_file.file, os.path.basename(jd_file.filename), jd_file.content_type)
+    if not jd_text:
+        raise HTTPException(status_code=400, detail=f"Failed to extract text from {jd_file.filename}")
+    
+    try:
+        jd_json = convert_jd_to_json(jd_text)
+    except llm.LLMJsonError as e:
+        logging.error(f"Failed to process JD from file {jd_file.filename}: {e}", exc_info=True)
+        raise HTTPException(status_code=502, detail=f"Failed to process job description: The AI service encountered an error.")
+    
+    return jd_json
 
 @app.post("/save_jd", response_model=schemas.JobDescription)
 async def save_jd(
     jd_json: dict = Body(...),
-    supabase = Depends(get_supabase),
+    repository: Repository = Depends(get_repository),
     current_user: schemas.User = Depends(auth.get_current_user)
 ):
     if current_user.role not in ["admin", "backend_team"]:
@@ -223,7 +242,7 @@ async def save_jd(
             detail=f"Invalid JD data provided. Validation errors: {e.errors()}"
         )
     
-    db_jd = crud.get_or_create_job_description(supabase=supabase, jd=jd_obj)
+    db_jd = await repository.aget_or_create_job_description(jd_obj)
     
     return db_jd
 
@@ -242,12 +261,25 @@ def ensure_complete_skill_presence(skill_presence: dict, skill_categories: dict)
     
     return skill_presence
 
-@app.post("/extract_resumes", response_model=List[schemas.ExtractedCVResponse])
-async def extract_resumes(
-    resume_files: list[UploadFile] = File(...),
-    jd_json: str = Form(...),
-    current_user: schemas.User = Depends(auth.get_current_user)
-):
+def build_extracted_cv(resume_json: dict, skill_categories: dict = None) -> dict:
+    """Cleans an LLM-extracted resume into the ExtractedCVResponse shape"""
+    resume_json = clean_resume_json(resume_json)
+    # Ensure skill_presence is complete if JD skill categories were provided
+    # This guarantees a consistent structure for downstream processing.
+    if skill_categories:
+        resume_json["skill_presence"] = ensure_complete_skill_presence(
+            resume_json.get("skill_presence", {}), 
+            skill_categories
+        )
+    else:
+        # If no categories were provided, ensure skill_presence is at least a dict
+        resume_json["skill_presence"] = resume_json.get("skill_presence", {})
+    return {
+        "cv_json": resume_json,
+        "skill_presence": resume_json["skill_presence"] # Use the (now complete) skill_presence from resume_json
+    }
+
+def validate_resume_uploads(resume_files: List[UploadFile]):
     for resume_file in resume_files:
         if resume_file.content_type not in ALLOWED_CONTENT_TYPES:
             raise HTTPException(status_code=400, detail=f"Unsupported file type for {resume_file.filename}: {resume_file.content_type}.")
@@ -258,57 +290,123 @@ async def extract_resumes(
         if file_size > MAX_FILE_SIZE:
             raise HTTPException(status_code=413, detail=f"File {resume_file.filename} exceeds size limit of 10MB")
 
-    jd_json = json.loads(jd_json)
+def get_skill_categories(jd_json: dict):
     required_skills = jd_json.get("requiredSkills", [])
-    skill_categories = None
-    if isinstance(required_skills, dict):
-        skill_categories = required_skills
-    
+    return required_skills if isinstance(required_skills, dict) else None
+
+@app.post("/extract_resumes", response_model=List[schemas.ExtractedCVResponse])
+async def extract_resumes(
+    resume_files: list[UploadFile] = File(...),
+    jd_json: str = Form(...),
+    current_user: schemas.User = Depends(auth.get_current_user)
+):
+    validate_resume_uploads(resume_files)
+    skill_categories = get_skill_categories(json.loads(jd_json))
+    files = [
+        (os.path.basename(resume_file.filename), await resume_file.read(), resume_file.content_type)
+        for resume_file in resume_files
+    ]
+
+    # Text extraction runs in the process pool and LLM calls run concurrently; results come back in input order
     results = []
-    with tempfile.TemporaryDirectory() as tmpdir:
-        for resume_file in resume_files:
-            sanitized_filename = os.path.basename(resume_file.filename)
-            resume_path = os.path.join(tmpdir, sanitized_filename)
-            with open(resume_path, "wb") as f:
-                shutil.copyfileobj(resume_file.file, f)
-                resume_file.file.seek(0) # Reset file pointer after reading
-
-            resume_text = extract_text_from_file(resume_path)
-            if not resume_text:
-                logging.warning(f"Could not extract text from {resume_file.filename}, skipping.")
-                continue
-            try:
-                resume_json = convert_resume_to_json(resume_text, skill_categories)
-            except llm.LLMJsonError as e:
-                logging.error(f"Could not process resume {resume_file.filename}: {e}")
-                # Continue processing other resumes, but the result will be missing for this one
-                continue
-            resume_json = clean_resume_json(resume_json)
-            # Ensure skill_presence is complete if JD skill categories were provided
-            # This guarantees a consistent structure for downstream processing.
-            if skill_categories:
-                resume_json["skill_presence"] = ensure_complete_skill_presence(
-                    resume_json.get("skill_presence", {}), 
-                    skill_categories
-                )
-            else:
-                # If no categories were provided, ensure skill_presence is at least a dict
-                resume_json["skill_presence"] = resume_json.get("skill_presence", {})
-            results.append({
-                "cv_json": resume_json,
-                "skill_presence": resume_json["skill_presence"] # Use the (now complete) skill_presence from resume_json
-            })
+    for extraction in await extract_resume_batch(files, skill_categories):
+        # Failed resumes are skipped, the rest of the batch is still returned
+        if extraction.resume_json is not None:
+            results.append(build_extracted_cv(extraction.resume_json, skill_categories))
     return results
 
-@app.post("/match", response_model=schemas.MatchResponse)
-async def match(
-    jd_json: dict = Body(...),
-    cvs: list = Body(...),
-    supabase = Depends(get_supabase),
-    current_user: schemas.User = Depends(auth.get_current_user) 
+@app.post("/extract_resumes/archive", response_model=schemas.ArchiveExtractionResponse)
+async def extract_resumes_from_archive(
+    archive_file: UploadFile = File(...),
+    jd_json: str = Form(...),
+    current_user: schemas.User = Depends(auth.get_current_user)
 ):
-    recruiter_id = current_user.id
-    
+    """
+    Variant of /extract_resumes taking one ZIP or tar archive of resumes. Every file in it
+    is checked like an individual upload; files failing the checks or extraction are reported
+    in `errors` without failing the archive. Folders and OS metadata files are ignored.
+    """
+    archive_file.file.seek(0, 2)
+    archive_size = archive_file.file.tell()
+    archive_file.file.seek(0)
+    if archive_size > ARCHIVE_MAX_SIZE_MB * 1024 * 1024:
+        raise HTTPException(status_code=413, detail=f"Archive exceeds size limit of {ARCHIVE_MAX_SIZE_MB}MB")
+
+    skill_categories = get_skill_categories(json.loads(jd_json))
+    try:
+        # Entries are decompressed from the upload's spooled file one at a time, off the event loop
+        archive = await asyncio.to_thread(read_resume_archive, archive_file.file, ALLOWED_CONTENT_TYPES, MAX_FILE_SIZE)
+    except ArchiveTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except ArchiveError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    results, errors = [], list(archive.skipped)
+    for extraction in await extract_resume_batch(archive.files, skill_categories):
+        if extraction.resume_json is None:
+            errors.append({"filename": extraction.filename, "detail": extraction.error})
+        else:
+            results.append(build_extracted_cv(extraction.resume_json, skill_categories))
+    return {"results": results, "errors": errors}
+
+def sse_event(event: str, data) -> str:
+    """Formats one Server-Sent Event. ``data`` is either a JSON string or a JSON-serializable object."""
+    payload = data if isinstance(data, str) else json.dumps(data)
+    return f"event: {event}\ndata: {payload}\n\n"
+
+def event_stream_response(events) -> StreamingResponse:
+    return StreamingResponse(
+        events,
+        media_type="text/event-stream",
+        # Disable proxy buffering so each event reaches the browser as soon as it is sent
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.post("/extract_resumes/stream")
+async def extract_resumes_stream(
+    resume_files: list[UploadFile] = File(...),
+    jd_json: str = Form(...),
+    current_user: schemas.User = Depends(auth.get_current_user)
+):
+    """
+    Streaming variant of /extract_resumes. Emits a `result` (ExtractedCVResponse) or
+    `error` event per resume as soon as it finishes, a `progress` event after each
+    one, and a final `done` event.
+    """
+    validate_resume_uploads(resume_files)
+    skill_categories = get_skill_categories(json.loads(jd_json))
+    files = [
+        (os.path.basename(resume_file.filename), await resume_file.read(), resume_file.content_type)
+        for resume_file in resume_files
+    ]
+
+    async def events():
+        total = len(files)
+        completed = failed = 0
+        async for extraction in iter_resume_extractions(files, skill_categories):
+            completed += 1
+            if extraction.resume_json is None:
+                failed += 1
+                yield sse_event("error", {"index": extraction.index, "filename": extraction.filename, "detail": extraction.error})
+            else:
+                try:
+                    extracted = schemas.ExtractedCVResponse.model_validate(build_extracted_cv(extraction.resume_json, skill_categories))
+                    yield sse_event("result", {
+                        "index": extraction.index,
+                        "filename": extraction.filename,
+                        "data": extracted.model_dump(mode="json", by_alias=True)
+                    })
+                except pydantic.ValidationError as e:
+                    failed += 1
+                    logging.error(f"Extracted resume {extraction.filename} failed validation: {e}")
+                    yield sse_event("error", {"index": extraction.index, "filename": extraction.filename, "detail": "Extracted resume failed validation"})
+            yield sse_event("progress", {"completed": completed, "total": total, "filename": extraction.filename})
+        yield sse_event("done", {"completed": completed, "failed": failed, "total": total})
+
+    return event_stream_response(events())
+
+def parse_match_jd(jd_json: dict):
+    """Returns the JD model together with its flat skill list and skill categories (if categorized)"""
     required_skills = jd_json.get("requiredSkills", [])
     skill_categories = None
     if isinstance(required_skills, dict):
@@ -319,145 +417,456 @@ async def match(
         flat_skills = required_skills
         jd_json_flat = jd_json
 
-    jd_obj = JDModel.parse_obj(jd_json_flat)
-    
-    # Save JD to DB
-    db_jd = crud.get_or_create_job_description(supabase=supabase, jd=jd_obj)
+    return JDModel.parse_obj(jd_json_flat), flat_skills, skill_categories
 
-    results = []
-    for cv_entry in cvs:
-        cv_json = cv_entry["cv_json"]
-        skill_presence = cv_entry.get("skill_presence", {})
-        cv_obj = CVModel.parse_obj(cv_json)
+def get_skill_presence(cv_entry: dict, flat_skills: list) -> dict:
+    """Skill presence sent with the CV, completed by the local matcher for JD skills it does not cover"""
+    skill_presence = dict(cv_entry.get("skill_presence") or {})
+    missing = [s for s in flat_skills if s not in skill_presence]
+    if missing:
+        # The resume may have been extracted for another JD; no LLM call is needed to check it against this one
+        detected, _ = detect_skill_presence(cv_entry["cv_json"], missing)
+        skill_presence.update(detected)
+    return skill_presence
 
-        # Save candidate to DB
-        db_candidate = crud.get_or_create_candidate(supabase=supabase, cv=cv_obj, recruiter_id=recruiter_id)
+def build_match_result(cv_obj: CVModel, skill_presence: dict, score: float, details: dict,
+                       flat_skills: list, skill_categories: dict, interview_questions: list) -> dict:
+    # Filtering, matching, etc. (existing logic)
+    filter_status = {"passed": True, "reason": ""}
+    # ... (rest of the filtering logic)
+
+    # This part reconstructs all the details needed by the frontend
+    present = [s for s in flat_skills if skill_presence.get(s, False)]
+    absent = [s for s in flat_skills if not skill_presence.get(s, False)]
+    critical_skills = skill_categories.get("critical", []) if skill_categories else []
+    if not critical_skills:
+        critical_skill_status = "Not Applicable"
+        critical_present = []
+        critical_absent = []
+    else:
+        critical_present = [s for s in critical_skills if skill_presence.get(s, False)]
+        critical_absent = [s for s in critical_skills if not skill_presence.get(s, False)]
+    
+        if len(critical_absent) == 0 and len(critical_present) > 0:
+            critical_skill_status = "All Present"
+        elif len(critical_present) == 0 and len(critical_absent) > 0:
+            critical_skill_status = "All Absent"
+        else:
+            critical_skill_status = "Partial Present"
+    
+    disclaimer = "Disclaimer: None of the critical required skills are present in this CV." if critical_skill_status == "All Absent" else None
 
-        # Filtering, matching, etc. (existing logic)
-        filter_status = {"passed": True, "reason": ""}
-        # ... (rest of the filtering logic)
+    return {
+        "candidate_id": cv_obj.UUID,
+        "candidate_name": f"{cv_obj.Personal_Data.firstName or ''} {cv_obj.Personal_Data.lastName or ''}".strip(),
+        "match_score": round(score * 100, 2),
+        "match_level": get_match_level(score),
+        "match_details": details,
+        "critical_skill_status": critical_skill_status,
+        "critical_present": critical_present,
+        "critical_absent": critical_absent,
+        "present_skills": present,
+        "absent_skills": absent,
+        "disclaimer": disclaimer,
+        "job_stability": cv_obj.Analytics.job_stability,
+        "education_gap": cv_obj.Analytics.education_gap,
+        "suggested_role": cv_obj.Analytics.suggested_role,
+        "interview_questions": interview_questions,
+        "skill_presence": skill_presence,
+        "filter_status": filter_status
+    }
 
-        score, details = compute_similarity(jd_obj, cv_obj)
-        
-        # This part reconstructs all the details needed by the frontend
-        present = [s for s in flat_skills if skill_presence.get(s, False)]
-        absent = [s for s in flat_skills if not skill_presence.get(s, False)]
-        critical_skills = skill_categories.get("critical", []) if skill_categories else []
-        if not critical_skills:
-            critical_skill_status = "Not Applicable"
-            critical_present = []
-            critical_absent = []
-        else:
-            critical_present = [s for s in critical_skills if skill_presence.get(s, False)]
-            critical_absent = [s for s in critical_skills if not skill_presence.get(s, False)]
-        
-            if len(critical_absent) == 0 and len(critical_present) > 0:
-                critical_skill_status = "All Present"
-            elif len(critical_present) == 0 and len(critical_absent) > 0:
-                critical_skill_status = "All Absent"
-            else:
-                critical_skill_status = "Partial Present"
-        
-        disclaimer = "Disclaimer: None of the critical required skills are present in this CV." if critical_skill_status == "All Absent" else None
-
-        result_data = {
-            "candidate_id": cv_obj.UUID,
-            "candidate_name": f"{cv_obj.Personal_Data.firstName or ''} {cv_obj.Personal_Data.lastName or ''}".strip(),
-            "match_score": round(score * 100, 2),
-            "match_level": get_match_level(score),
-            "match_details": details,
-            "critical_skill_status": critical_skill_status,
-            "critical_present": critical_present,
-            "critical_absent": critical_absent,
-            "present_skills": present,
-            "absent_skills": absent,
-            "disclaimer": disclaimer,
-            "job_stability": cv_obj.Analytics.job_stability,
-            "education_gap": cv_obj.Analytics.education_gap,
-            "suggested_role": cv_obj.Analytics.suggested_role,
-            "interview_questions": generate_interview_questions(jd_obj, cv_obj),
-            "skill_presence": skill_presence,
-            "filter_status": filter_status
-        }
-        results.append(result_data)
-
-        # Save analysis result to DB, ensuring details are stored
-        if db_jd and db_candidate:
-            crud.create_analysis_result(
-                supabase=supabase,
-                jd_db_id=db_jd.id,
-                candidate_db_id=db_candidate.id,
-                user_id=current_user.id,
-                result={
-                    "match_score": result_data["match_score"],
-                    "match_level": result_data["match_level"],
-                    "match_details": result_data["match_details"]
-                }
-            )
+def build_match_results(jd_obj: JDModel, cvs: list, cv_objs: List[CVModel], scores: list,
+                        flat_skills: list, skill_categories: dict) -> list:
+    """Builds the MatchResult dicts for a scored batch, in input order"""
+    # Only questions generated earlier are included; new ones come from prefetch_interview_questions
+    return [
+        build_match_result(
+            cv_obj, get_skill_presence(cv_entry, flat_skills), score, details,
+            flat_skills, skill_categories, llm.get_cached_interview_questions(jd_obj, cv_obj) or []
+        )
+        for cv_entry, cv_obj, (score, details) in zip(cvs, cv_objs, scores)
+    ]
+
+def save_match_results(db_jd, cv_objs: List[CVModel], results: list, current_user: schemas.User):
+    """Hands the candidates and their analysis results to the write-behind queue, which saves them with bulk writes"""
+    # The queue writes from its own thread, so it uses the sync repository methods
+    save_analysis_results(
+        get_repository(),
+        db_jd.id if db_jd else None,
+        current_user.id,
+        [
+            AnalysisWrite(cv=cv_obj, result={
+                "match_score": result_data["match_score"],
+                "match_level": result_data["match_level"],
+                "match_details": result_data["match_details"]
+            })
+            for cv_obj, result_data in zip(cv_objs, results)
+        ]
+    )
+
+def rank_cvs(cv_objs: List[CVModel], scores: list) -> List[CVModel]:
+    order = sorted(range(len(cv_objs)), key=lambda i: scores[i][0], reverse=True)
+    return [cv_objs[i] for i in order]
+
+def prefetch_interview_questions(jd_obj: JDModel, ranked_cv_objs: List[CVModel], owner_id: str):
+    """
+    Generates interview questions for the top-ranked candidates in a background job
+    and returns its ID, or None when all of them are already cached. Results are
+    cached by (JD, CV), so later matches and /interview_questions reuse them.
+    """
+    pending = [
+        cv_obj for cv_obj in ranked_cv_objs[:INTERVIEW_QUESTIONS_TOP_K]
+        if llm.get_cached_interview_questions(jd_obj, cv_obj) is None
+    ]
+    if not pending:
+        return None
+
+    def work(handle):
+        with ThreadPoolExecutor(max_workers=LLM_MAX_CONCURRENCY) as executor:
+            futures = {executor.submit(generate_interview_questions, jd_obj, cv_obj): cv_obj for cv_obj in pending}
+            for future in as_completed(futures):
+                cv_obj = futures[future]
+                try:
+                    handle.add_result({"candidate_id": cv_obj.UUID, "interview_questions": future.result() or []})
+                except Exception as e:
+                    logging.error(f"Could not generate interview questions for candidate {cv_obj.UUID}: {e}")
+                    handle.add_error({"candidate_id": cv_obj.UUID, "detail": "Could not generate interview questions"})
+
+    return get_job_queue().submit("interview_questions", owner_id, len(pending), work).id
+
+def build_matching_metadata(jd_obj: JDModel, results: list) -> dict:
+    return {
+        "job_title": jd_obj.jobTitle,
+        "candidates_evaluated": len(results),
+        "top_match_score": max((r["match_score"] for r in results), default=0),
+        "average_match_score": round(sum(r["match_score"] for r in results) / len(results), 2) if results else 0
+    }
+
+@app.post("/match", response_model=schemas.MatchResponse)
+async def match(
+    jd_json: dict = Body(...),
+    cvs: list = Body(...),
+    repository: Repository = Depends(get_repository),
+    current_user: schemas.User = Depends(auth.get_current_user) 
+):
+    jd_obj, flat_skills, skill_categories = parse_match_jd(jd_json)
+    
+    # Save JD to DB
+    db_jd = await repository.aget_or_create_job_description(jd_obj)
+
+    cv_objs = [CVModel.parse_obj(cv_entry["cv_json"]) for cv_entry in cvs]
+    # Score the whole batch as matrix operations against a JD prepared once. Encoding and the
+    # interview question cache reads block, so they run off the event loop.
+    scores = await asyncio.to_thread(compute_similarity_batch, jd_obj, cv_objs)
+    results = await asyncio.to_thread(build_match_results, jd_obj, cvs, cv_objs, scores, flat_skills, skill_categories)
+    # Interview questions are not on the critical path: the top candidates get them in the background.
+    # Started after the results are built, so these only ever carry questions cached before this request.
+    questions_job_id = await asyncio.to_thread(prefetch_interview_questions, jd_obj, rank_cvs(cv_objs, scores), current_user.id)
+    # Inline writes (full buffer or PERSIST_WRITE_BEHIND=false) retry with sleeps, so they run off the event loop
+    await asyncio.to_thread(save_match_results, db_jd, cv_objs, results, current_user)
 
     results = sorted(results, key=lambda x: x["match_score"], reverse=True)
     return {
         "results": results,
-        "matching_metadata": {
-            "job_title": jd_obj.jobTitle,
-            "candidates_evaluated": len(results),
-            "top_match_score": results[0]["match_score"] if results else 0,
-            "average_match_score": round(sum(r["match_score"] for r in results) / len(results), 2) if results else 0
+        "matching_metadata": build_matching_metadata(jd_obj, results),
+        "interview_questions_job_id": questions_job_id
+    }
+
+@app.post("/match/stream")
+async def match_stream(
+    jd_json: dict = Body(...),
+    cvs: list = Body(...),
+    repository: Repository = Depends(get_repository),
+    current_user: schemas.User = Depends(auth.get_current_user)
+):
+    """
+    Streaming variant of /match. Candidates are scored in chunks of MATCH_STREAM_CHUNK_SIZE;
+    a `result` event (MatchResult) and a `progress` event are emitted per candidate as soon
+    as its chunk is scored, and a final `done` event carries the matching metadata and the
+    interview questions job ID once the results are queued for saving. A failure ends the
+    stream with an `error` event instead.
+    """
+    jd_obj, flat_skills, skill_categories = parse_match_jd(jd_json)
+    cv_objs = [CVModel.parse_obj(cv_entry["cv_json"]) for cv_entry in cvs]
+
+    async def events():
+        scores, results = [], []
+        try:
+            db_jd = await repository.aget_or_create_job_description(jd_obj)
+            for start in range(0, len(cv_objs), max(1, MATCH_STREAM_CHUNK_SIZE)):
+                chunk = slice(start, start + max(1, MATCH_STREAM_CHUNK_SIZE))
+                chunk_scores = await asyncio.to_thread(compute_similarity_batch, jd_obj, cv_objs[chunk])
+                chunk_results = await asyncio.to_thread(
+                    build_match_results, jd_obj, cvs[chunk], cv_objs[chunk], chunk_scores, flat_skills, skill_categories
+                )
+                for result_data in chunk_results:
+                    yield sse_event("result", {
+                        "index": len(results),
+                        "data": schemas.MatchResult.model_validate(result_data).model_dump(mode="json")
+                    })
+                    results.append(result_data)
+                    yield sse_event("progress", {"completed": len(results), "total": len(cv_objs)})
+                scores.extend(chunk_scores)
+
+            questions_job_id = await asyncio.to_thread(prefetch_interview_questions, jd_obj, rank_cvs(cv_objs, scores), current_user.id)
+            # One bulk write for the whole batch once every result has been sent; inline only when the write buffer is full
+            await asyncio.to_thread(save_match_results, db_jd, cv_objs, results, current_user)
+        except Exception as e:
+            logging.error(f"Match stream failed after {len(results)} of {len(cv_objs)} results: {e}", exc_info=True)
+            yield sse_event("error", {"detail": "Failed to finish matching"})
+            return
+        yield sse_event("done", {
+            "matching_metadata": build_matching_metadata(jd_obj, results),
+            "interview_questions_job_id": questions_job_id
+        })
+
+    return event_stream_response(events())
+
+@app.post("/interview_questions", response_model=schemas.InterviewQuestionsResponse)
+def interview_questions(
+    jd_json: dict = Body(...),
+    cv_json: dict = Body(...),
+    current_user: schemas.User = Depends(auth.get_current_user)
+):
+    """Returns interview questions for one candidate, generating them only if they are not cached yet"""
+    jd_obj, _, _ = parse_match_jd(jd_json)
+    cv_obj = CVModel.parse_obj(cv_json)
+    try:
+        questions = generate_interview_questions(jd_obj, cv_obj) or []
+    except llm.LLMJsonError as e:
+        logging.error(f"Could not generate interview questions for candidate {cv_obj.UUID}: {e}")
+        raise HTTPException(status_code=502, detail="Failed to generate interview questions: The AI service encountered an error.")
+    return {"candidate_id": cv_obj.UUID, "interview_questions": questions}
+
+@app.post("/jobs/extract_resumes", response_model=schemas.JobSubmitResponse, status_code=status.HTTP_202_ACCEPTED)
+async def submit_extract_resumes_job(
+    resume_files: list[UploadFile] = File(...),
+    jd_json: str = Form(...),
+    current_user: schemas.User = Depends(auth.get_current_user)
+):
+    """
+    Background variant of /extract_resumes for large batches. Returns a job ID at once;
+    poll /jobs/{job_id} and /jobs/{job_id}/results for progress and partial results.
+    """
+    validate_resume_uploads(resume_files)
+    skill_categories = get_skill_categories(json.loads(jd_json))
+    # Uploads are read now, the request's temporary files are gone once the job runs
+    files = [
+        (os.path.basename(resume_file.filename), await resume_file.read(), resume_file.content_type)
+        for resume_file in resume_files
+    ]
+
+    def work(handle):
+        async def run():
+            # The job runs its own event loop, which gets its own LLM client; close it before the loop ends
+            try:
+                async for extraction in iter_resume_extractions(files, skill_categories):
+                    if extraction.resume_json is None:
+                        handle.add_error({"index": extraction.index, "filename": extraction.filename, "detail": extraction.error})
+                        continue
+                    try:
+                        extracted = schemas.ExtractedCVResponse.model_validate(build_extracted_cv(extraction.resume_json, skill_categories))
+                    except pydantic.ValidationError as e:
+                        logging.error(f"Extracted resume {extraction.filename} failed validation: {e}")
+                        handle.add_error({"index": extraction.index, "filename": extraction.filename, "detail": "Extracted resume failed validation"})
+                        continue
+                    handle.add_result({
+                        "index": extraction.index,
+                        "filename": extraction.filename,
+                        "data": extracted.model_dump(mode="json", by_alias=True)
+                    })
+            finally:
+                await llm.aclose_async_groq_client()
+        asyncio.run(run())
+
+    job = get_job_queue().submit("extract_resumes", current_user.id, len(files), work)
+    return {"job_id": job.id, "status": job.status}
+
+@app.post("/jobs/match", response_model=schemas.JobSubmitResponse, status_code=status.HTTP_202_ACCEPTED)
+async def submit_match_job(
+    jd_json: dict = Body(...),
+    cvs: list = Body(...),
+    repository: Repository = Depends(get_repository),
+    current_user: schemas.User = Depends(auth.get_current_user)
+):
+    """
+    Background variant of /match for large batches. The MatchResults become available
+    as soon as the batch is scored; the matching metadata and the interview questions
+    job ID are returned as the job summary once the results are saved.
+    """
+    jd_obj, flat_skills, skill_categories = parse_match_jd(jd_json)
+    cv_objs = [CVModel.parse_obj(cv_entry["cv_json"]) for cv_entry in cvs]
+
+    # The job runs in a worker thread, outside the server's event loop, so it uses the sync methods
+    def work(handle):
+        db_jd = repository.get_or_create_job_description(jd_obj)
+        scores = compute_similarity_batch(jd_obj, cv_objs)
+        results = build_match_results(jd_obj, cvs, cv_objs, scores, flat_skills, skill_categories)
+        # Started after the results are built, as in /match, so they only carry questions cached before this job
+        questions_job_id = prefetch_interview_questions(jd_obj, rank_cvs(cv_objs, scores), current_user.id)
+        for index, result_data in enumerate(results):
+            handle.add_result({
+                "index": index,
+                "data": schemas.MatchResult.model_validate(result_data).model_dump(mode="json")
+            })
+        save_match_results(db_jd, cv_objs, results, current_user)
+        return {
+            "matching_metadata": build_matching_metadata(jd_obj, results),
+            "interview_questions_job_id": questions_job_id
         }
+
+    job = get_job_queue().submit("match", current_user.id, len(cv_objs), work)
+    return {"job_id": job.id, "status": job.status}
+
+def get_user_job(job_id: str, current_user: schemas.User) -> Job:
+    job = get_job_queue().get(job_id)
+    # Jobs belonging to other users are reported as missing
+    if job is None or (job.owner_id != current_user.id and current_user.role != "admin"):
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+def job_status(job: Job) -> dict:
+    return {
+        "job_id": job.id,
+        "kind": job.kind,
+        "status": job.status,
+        "total": job.total,
+        "completed": job.completed,
+        "failed": len(job.errors),
+        "error": job.error,
+        "created_at": job.created_at,
+        "updated_at": job.updated_at
+    }
+
+@app.get("/jobs/{job_id}", response_model=schemas.JobStatusResponse)
+def read_job(job_id: str, current_user: schemas.User = Depends(auth.get_current_user)):
+    return job_status(get_user_job(job_id, current_user))
+
+@app.get("/jobs/{job_id}/results", response_model=schemas.JobResultsResponse)
+def read_job_results(job_id: str, offset: int = 0, current_user: schemas.User = Depends(auth.get_current_user)):
+    """Returns the results finished so far in completion order; pass ``offset`` to fetch only newer ones."""
+    job = get_user_job(job_id, current_user)
+    return {
+        **job_status(job),
+        "results": job.results[offset:],
+        "errors": job.errors,
+        "summary": job.summary
     }
 
+@app.get("/metrics")
+def read_metrics(current_user: schemas.User = Depends(auth.get_current_admin_user)):
+    """Process-local counters and gauges, such as write-behind flush statistics"""
+    return metrics.snapshot()
+
+def parse_cursor(cursor: Optional[str]):
+    """Decodes the ``cursor`` query parameter of a listing endpoint"""
+    if cursor is None:
+        return None
+    try:
+        return crud.decode_cursor(cursor)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+def set_page_headers(response: Response, page: crud.Page) -> None:
+    """Listings keep returning plain arrays; the cursor for the next page and the total go in headers"""
+    if page.next_cursor:
+        response.headers["X-Next-Cursor"] = page.next_cursor
+    if page.total is not None:
+        response.headers["X-Total-Count"] = str(page.total)
+
 @app.get("/jds", response_model=List[schemas.JobDescription])
-def read_jds(skip: int = 0, limit: int = 100, supabase = Depends(get_supabase), current_user: schemas.User = Depends(auth.get_current_user)):
-    jds = crud.get_jds(supabase, skip=skip, limit=limit)
-    return jds
+async def read_jds(
+    response: Response,
+    skip: int = 0,
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = None,
+    include_details: bool = False,
+    include_total: bool = False,
+    repository: Repository = Depends(get_repository),
+    current_user: schemas.User = Depends(auth.get_current_user)
+):
+    page = await repository.aget_jds(
+        skip=skip, limit=limit, after=parse_cursor(cursor),
+        include_details=include_details, include_total=include_total
+    )
+    set_page_headers(response, page)
+    return page.items
 
 @app.get("/jds/{jd_id}", response_model=schemas.JobDescription)
-def read_jd(jd_id: int, supabase = Depends(get_supabase), current_user: schemas.User = Depends(auth.get_current_user)):
-    db_jd = crud.get_jd(supabase, jd_id=jd_id)
+async def read_jd(jd_id: int, repository: Repository = Depends(get_repository), current_user: schemas.User = Depends(auth.get_current_user)):
+    db_jd = await repository.aget_jd(jd_id)
     if db_jd is None:
         raise HTTPException(status_code=404, detail="Job Description not found")
     return db_jd
 
 @app.put("/jds/{jd_id}", response_model=schemas.JobDescription)
-def update_jd_details(
+async def update_jd_details(
     jd_id: int,
     jd_update: schemas.JobDescriptionDetailUpdate,
-    supabase = Depends(get_supabase),
+    repository: Repository = Depends(get_repository),
     current_user: schemas.User = Depends(auth.get_current_user)
 ):
     if current_user.role not in ["admin", "backend_team"]:
         raise HTTPException(status_code=403, detail="Not authorized")
-    db_jd = crud.update_jd_details(supabase, jd_id=jd_id, jd_update=jd_update)
+    db_jd = await repository.aupdate_jd_details(jd_id, jd_update)
     if db_jd is None:
         raise HTTPException(status_code=404, detail="Job Description not found")
     return db_jd
 
 @app.patch("/jds/{jd_id}", response_model=schemas.JobDescription)
-def update_jd(
+async def update_jd(
     jd_id: int,
     jd_update: schemas.JobDescriptionUpdate,
-    supabase = Depends(get_supabase),
+    repository: Repository = Depends(get_repository),
     current_user: schemas.User = Depends(auth.get_current_user)
 ):
-    db_jd = crud.update_jd(supabase, jd_id=jd_id, jd_update=jd_update)
+    db_jd = await repository.aupdate_jd(jd_id, jd_update)
     if db_jd is None:
         raise HTTPException(status_code=404, detail="Job Description not found")
     return db_jd
 
 @app.get("/jds/{jd_id}/results", response_model=List[schemas.AnalysisResult])
-def read_jd_results(jd_id: int, supabase = Depends(get_supabase), current_user: schemas.User = Depends(auth.get_current_user)):
-    results = crud.get_jd_results(supabase, jd_id=jd_id)
-    return results
+async def read_jd_results(
+    jd_id: int,
+    response: Response,
+    skip: int = 0,
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = None,
+    include_details: bool = False,
+    include_total: bool = False,
+    repository: Repository = Depends(get_repository),
+    current_user: schemas.User = Depends(auth.get_current_user)
+):
+    page = await repository.aget_jd_results(
+        jd_id, skip=skip, limit=limit, after=parse_cursor(cursor),
+        include_details=include_details, include_total=include_total
+    )
+    set_page_headers(response, page)
+    return page.items
 
 @app.get("/analyses", response_model=List[schemas.AnalysisResult])
-def read_user_analyses(supabase = Depends(get_supabase), current_user: schemas.User = Depends(auth.get_current_user)):
-    analyses = crud.get_user_analyses(supabase, user_id=current_user.id)
-    return analyses
+async def read_user_analyses(
+    response: Response,
+    skip: int = 0,
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = None,
+    include_details: bool = False,
+    include_total: bool = False,
+    repository: Repository = Depends(get_repository),
+    current_user: schemas.User = Depends(auth.get_current_user)
+):
+    page = await repository.aget_user_analyses(
+        current_user.id, skip=skip, limit=limit, after=parse_cursor(cursor),
+        include_details=include_details, include_total=include_total
+    )
+    set_page_headers(response, page)
+    return page.items
 
 @app.post("/jds/upload", response_model=schemas.JobDescription)
 async def upload_jd(
     jd_file: UploadFile = File(...),
-    supabase = Depends(get_supabase),
+    repository: Repository = Depends(get_repository),
     current_user: schemas.User = Depends(auth.get_current_user)
 ):
     if jd_file.content_type not in ALLOWED_CONTENT_TYPES:
@@ -475,42 +884,37 @@ async def upload_jd(
             detail="You do not have permission to upload Job Descriptions."
         )
     
-    with tempfile.TemporaryDirectory() as tmpdir:
-        sanitized_filename = os.path.basename(jd_file.filename)
-        jd_path = os.path.join(tmpdir, sanitized_filename)
-        with open(jd_path, "wb") as f:
-            shutil.copyfileobj(jd_file.file, f)
-        
-        jd_text = extract_text_from_file(jd_path)
-        if not jd_text:
-            raise HTTPException(status_code=400, detail=f"Failed to extract text from {jd_file.filename}")
+    # Read straight from the upload's spooled file, or from the text cache when the same file was seen before
+    jd_text = await asyncio.to_thread(extract_text_cached, jd_file.file, os.path.basename(jd_file.filename), jd_file.content_type)
+    if not jd_text:
+        raise HTTPException(status_code=400, detail=f"Failed to extract text from {jd_file.filename}")
 
-        try:
-            jd_json = convert_jd_to_json(jd_text)
-        except llm.LLMJsonError as e:
-            logging.error(f"Failed to process JD from file {jd_file.filename}: {e}", exc_info=True)
-            raise HTTPException(status_code=502, detail=f"Failed to process job description: The AI service encountered an error.")
-        
-        # Flatten skills if they are categorized
-        required_skills = jd_json.get("requiredSkills", [])
-        if isinstance(required_skills, dict):
-            flat_skills = [s for cat in required_skills.values() for s in cat]
-            jd_json_flat = {**jd_json, "requiredSkills": flat_skills}
-        else:
-            jd_json_flat = jd_json
-            
-        try:
-            jd_obj = JDModel.parse_obj(jd_json_flat)
-        except pydantic.ValidationError as e:
-            logging.error(f"Pydantic validation error for JD data from file {jd_file.filename}: {e}")
-            raise HTTPException(
-                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
-                detail=f"LLM extracted invalid JD data. Validation errors: {e.errors()}"
-            )
-        
-        db_jd = crud.get_or_create_job_description(supabase=supabase, jd=jd_obj)
+    try:
+        jd_json = convert_jd_to_json(jd_text)
+    except llm.LLMJsonError as e:
+        logging.error(f"Failed to process JD from file {jd_file.filename}: {e}", exc_info=True)
+        raise HTTPException(status_code=502, detail=f"Failed to process job description: The AI service encountered an error.")
+    
+    # Flatten skills if they are categorized
+    required_skills = jd_json.get("requiredSkills", [])
+    if isinstance(required_skills, dict):
+        flat_skills = [s for cat in required_skills.values() for s in cat]
+        jd_json_flat = {**jd_json, "requiredSkills": flat_skills}
+    else:
+        jd_json_flat = jd_json
         
-        return db_jd
+    try:
+        jd_obj = JDModel.parse_obj(jd_json_flat)
+    except pydantic.ValidationError as e:
+        logging.error(f"Pydantic validation error for JD data from file {jd_file.filename}: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"LLM extracted invalid JD data. Validation errors: {e.errors()}"
+        )
+    
+    db_jd = await repository.aget_or_create_job_description(jd_obj)
+    
+    return db_jd
 
 if __name__ == "__main__":
     import uvicorn
@@ -1,13 +1,16 @@
 from sentence_transformers import util
 from sklearn.metrics.pairwise import cosine_similarity
 from datetime import datetime
+from dataclasses import dataclass
 import re
 import os
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Sequence, Tuple
+import numpy as np
 from difflib import SequenceMatcher
 from dotenv import load_dotenv
 
 from .schemas import JDModel, CVModel, Experience, Education, LocationModel, Skill, Qualifications
+from .embedding_cache import CachedEncoder, open_embedding_store
 
 # Load environment variables
 load_dotenv()
@@ -22,15 +25,74 @@ LOCATION_WEIGHT = float(os.getenv('MATCHING_LOCATION_WEIGHT', 0.0))
 # Get model name from environment variable with default
 SENTENCE_TRANSFORMER_MODEL = os.getenv('SENTENCE_TRANSFORMER_MODEL', 'all-MiniLM-L6-v2')
 
+_transformer = None
 _model = None
 
+def load_transformer():
+    """The SentenceTransformer weights, loaded once per process (or once before forking workers)"""
+    global _transformer
+    if _transformer is None:
+        from sentence_transformers import SentenceTransformer
+        _transformer = SentenceTransformer(SENTENCE_TRANSFORMER_MODEL)
+    return _transformer
+
 def get_model():
     global _model
     if _model is None:
-        from sentence_transformers import SentenceTransformer
-        _model = SentenceTransformer(SENTENCE_TRANSFORMER_MODEL)
+        # Embeddings are cached by content hash so repeated JD and CV strings skip the forward pass.
+        # The on-disk store is opened here, in the process that uses it, never inherited across a fork.
+        _model = CachedEncoder(
+            load_transformer(),
+            SENTENCE_TRANSFORMER_MODEL,
+            store=open_embedding_store()
+        )
     return _model
 
+def preload_model() -> None:
+    """Loads the weights and runs a dummy encode, so lazy initialization is done before the first request"""
+    load_transformer().encode(["warm up"])
+
+class BatchEncoder:
+    """
+    Serves ``encode`` calls from embeddings computed up front in a single batched
+    forward pass. It exposes the subset of the SentenceTransformer ``encode`` API
+    used by the scoring helpers, so it can be passed anywhere a model is expected.
+    Texts that were not collected up front are encoded on demand and remembered.
+    """
+
+    def __init__(self, model, texts: Sequence[str]):
+        self.model = model
+        self._index: Dict[str, int] = {}
+        self._embeddings: Optional[np.ndarray] = None
+        self._add(list(dict.fromkeys(texts)))
+
+    def _add(self, texts: List[str]) -> None:
+        if not texts:
+            return
+        embeddings = np.asarray(self.model.encode(texts))
+        offset = 0 if self._embeddings is None else len(self._embeddings)
+        self._embeddings = embeddings if self._embeddings is None else np.vstack([self._embeddings, embeddings])
+        for i, text in enumerate(texts):
+            self._index[text] = offset + i
+
+    def encode(self, sentences, convert_to_tensor: bool = False, **kwargs):
+        if kwargs:
+            return self.model.encode(sentences, convert_to_tensor=convert_to_tensor, **kwargs)
+
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else list(sentences)
+        if not texts:
+            return self.model.encode(texts, convert_to_tensor=convert_to_tensor)
+
+        self._add([t for t in dict.fromkeys(texts) if t not in self._index])
+        embeddings = self._embeddings[[self._index[t] for t in texts]]
+        if single:
+            embeddings = embeddings[0]
+        if convert_to_tensor:
+            import torch
+            return torch.from_numpy(embeddings)
+        return embeddings
+
 CITY_VARIATIONS = {
     'gurgaon': ['gurugram', 'gurgaon'],
     'gurugram': ['gurugram', 'gurgaon'],
@@ -86,6 +148,8 @@ def calculate_experience_years(experiences: List[Experience]) -> float:
             continue
     return round(max(0, total_days / 365), 1)
 
+EXPERIENCE_QUERY = "How many years of experience are required?"
+
 def extract_required_experience(qualifications: Qualifications, model) -> float:
     if not qualifications or not qualifications.required:
         return 0.0
@@ -93,8 +157,7 @@ def extract_required_experience(qualifications: Qualifications, model) -> float:
     required_sentences = qualifications.required
     sentence_embeddings = model.encode(required_sentences, convert_to_tensor=True)
 
-    query = "How many years of experience are required?"
-    query_embedding = model.encode(query, convert_to_tensor=True)
+    query_embedding = model.encode(EXPERIENCE_QUERY, convert_to_tensor=True)
     similarities = util.cos_sim(query_embedding, sentence_embeddings)[0]
 
     top_idx = int(similarities.argmax())
@@ -122,9 +185,9 @@ def extract_required_experience(qualifications: Qualifications, model) -> float:
 
     return 0.0
 
-def calculate_role_relevance(jd_title: str, cv_suggested_role: str, cv_experiences: List[Experience], model) -> float:
+def calculate_role_relevance(jd_title: str, cv_suggested_role: str, cv_experiences: List[Experience], model, jd_title_emb=None) -> float:
     if cv_suggested_role:
-        jd_emb = model.encode(jd_title.lower())
+        jd_emb = jd_title_emb if jd_title_emb is not None else model.encode(jd_title.lower())
         suggested_role_emb = model.encode(cv_suggested_role.lower())
         role_similarity = cosine_similarity([jd_emb], [suggested_role_emb])[0][0]
         return max(0.3, role_similarity)
@@ -138,7 +201,7 @@ def calculate_role_relevance(jd_title: str, cv_suggested_role: str, cv_experienc
     if not cv_titles_text.strip():
         return 0.5
     
-    jd_emb = model.encode(jd_title.lower())
+    jd_emb = jd_title_emb if jd_title_emb is not None else model.encode(jd_title.lower())
     cv_emb = model.encode(cv_titles_text)
     
     similarity = cosine_similarity([jd_emb], [cv_emb])[0][0]
@@ -269,40 +332,44 @@ def calculate_field_similarity(cv_field: str, jd_text: str, model) -> float:
     jd_embed = model.encode([jd_text], convert_to_tensor=True)
     return util.cos_sim(cv_embed, jd_embed).item()
 
-def calculate_education_match(cv_education: list[Education], jd_education: list[str], model) -> float:
-    if not jd_education:
-        return 1.0
-    if not cv_education:
-        return 0.0
-
-    jd_requirements = []
+def parse_education_requirements(jd_education: List[str]) -> List[Dict]:
+    requirements = []
     for req in jd_education:
-        level = extract_highest_degree_level(req)
-        field = extract_field(req)
-        jd_requirements.append({
+        requirements.append({
             "text": req,
-            "level": level,
-            "field": field
+            "level": extract_highest_degree_level(req),
+            "field": extract_field(req)
         })
+    return requirements
 
-    cv_entries = []
+def parse_education_entries(cv_education: List[Education]) -> List[Dict]:
+    entries = []
     for edu in cv_education:
         degree = normalize_degree(edu.degree) if edu.degree else ""
-        level = extract_highest_degree_level(degree)
-        field = extract_field(edu.fieldOfStudy or degree or "")
-        cv_entries.append({
+        entries.append({
             "text": " ".join(filter(None, [
                 degree,
                 f"in {edu.fieldOfStudy}" if edu.fieldOfStudy else "",
                 f"from {edu.institution}" if edu.institution else ""
             ])),
-            "level": level,
-            "field": field
+            "level": extract_highest_degree_level(degree),
+            "field": extract_field(edu.fieldOfStudy or degree or "")
         })
+    return entries
+
+def calculate_education_match(cv_education: list[Education], jd_education: list[str], model, jd_requirements=None, jd_embeddings=None) -> float:
+    if not jd_education:
+        return 1.0
+    if not cv_education:
+        return 0.0
 
-    jd_texts = [req["text"] for req in jd_requirements]
+    if jd_requirements is None:
+        jd_requirements = parse_education_requirements(jd_education)
+    cv_entries = parse_education_entries(cv_education)
+
+    if jd_embeddings is None:
+        jd_embeddings = model.encode([req["text"] for req in jd_requirements], convert_to_tensor=True)
     cv_texts = [entry["text"] for entry in cv_entries]
-    jd_embeddings = model.encode(jd_texts, convert_to_tensor=True)
     cv_embeddings = model.encode(cv_texts, convert_to_tensor=True)
     similarity_matrix = util.cos_sim(jd_embeddings, cv_embeddings)
 
@@ -373,7 +440,7 @@ def calculate_skills_match(jd_required_skills: List[str], cv_skills: List[Skill]
     
     return max(0.3, min(1.0, semantic_similarity))
 
-def calculate_enhanced_sim_resp(jd_responsibilities: List[str], cv_experiences: List[Experience], model) -> float:
+def calculate_enhanced_sim_resp(jd_responsibilities: List[str], cv_experiences: List[Experience], model, jd_embeddings=None) -> float:
     if not jd_responsibilities or not cv_experiences:
         return 0.0
 
@@ -385,7 +452,8 @@ def calculate_enhanced_sim_resp(jd_responsibilities: List[str], cv_experiences:
     if not cv_descriptions:
         return 0.0
 
-    jd_embeddings = model.encode(jd_responsibilities)
+    if jd_embeddings is None:
+        jd_embeddings = model.encode(jd_responsibilities)
     cv_embeddings = model.encode(cv_descriptions)
 
     similarity_matrix = cosine_similarity(jd_embeddings, cv_embeddings)
@@ -403,8 +471,8 @@ def calculate_enhanced_sim_resp(jd_responsibilities: List[str], cv_experiences:
     final_score = 0.3 + (final_score * 0.7)
     return float(min(1.0, final_score))
 
-def calculate_combined_sim_resp(jd_responsibilities, cv_experiences, model):
-    semantic_score = calculate_enhanced_sim_resp(jd_responsibilities, cv_experiences, model)
+def calculate_combined_sim_resp(jd_responsibilities, cv_experiences, model, jd_embeddings=None):
+    semantic_score = calculate_enhanced_sim_resp(jd_responsibilities, cv_experiences, model, jd_embeddings=jd_embeddings)
     return min(1.0, semantic_score)
 
 def get_match_level(score: float) -> str:
@@ -436,28 +504,108 @@ def generate_match_summary(details: Dict) -> str:
     
     return summary or "No significant strengths or concerns identified"
 
-def compute_similarity(jd: JDModel, cv: CVModel) -> Tuple[float, Dict]:
-    model = get_model()
+def collect_similarity_texts(jd: JDModel, cvs: List[CVModel]) -> List[str]:
+    """
+    Gathers every string ``compute_similarity`` will embed for a JD and a list of
+    CVs, de-duplicated and in first-seen order.
+    """
+    texts = [jd.jobTitle, jd.jobTitle.lower()]
+    if jd.qualifications and jd.qualifications.required:
+        texts.extend(jd.qualifications.required)
+        texts.append(EXPERIENCE_QUERY)
+    texts.extend(jd.keyResponsibilities)
+    jd_requirements = parse_education_requirements(jd.educationRequired)
+    texts.extend(req["text"] for req in jd_requirements)
+    texts.extend(req["field"] for req in jd_requirements if req["field"])
+
+    for cv in cvs:
+        suggested_role = cv.Analytics.suggested_role
+        job_titles = " ".join([exp.jobTitle for exp in cv.experiences_list if exp.jobTitle])
+        if suggested_role:
+            texts.extend([suggested_role, suggested_role.lower()])
+        elif job_titles:
+            texts.extend([job_titles, job_titles.lower()])
+        for exp in cv.experiences_list:
+            texts.extend(exp.description or [])
+        cv_entries = parse_education_entries(cv.education_list)
+        texts.extend(entry["text"] for entry in cv_entries)
+        texts.extend(entry["field"] for entry in cv_entries if entry["field"])
+
+    return list(dict.fromkeys(texts))
+
+@dataclass
+class PreparedJD:
+    """
+    JD-side inputs of the scoring, computed once per request and shared by every
+    CV scored against the JD.
+    """
+    jd: JDModel
+    model: object
+    title_embedding: np.ndarray
+    title_lower_embedding: np.ndarray
+    required_years: float
+    responsibility_embeddings: Optional[np.ndarray]
+    education_requirements: List[Dict]
+    education_embeddings: Optional[np.ndarray]
+
+def prepare_jd(jd: JDModel, cvs: Optional[List[CVModel]] = None, model=None) -> PreparedJD:
+    """
+    Builds the JD-side state for ``score_cv``. When the CVs of the batch are passed
+    too, their texts are encoded together with the JD's in one batched call.
+    """
+    model = model or get_model()
+    if cvs:
+        model = BatchEncoder(model, collect_similarity_texts(jd, cvs))
+
+    education_requirements = parse_education_requirements(jd.educationRequired)
+    return PreparedJD(
+        jd=jd,
+        model=model,
+        title_embedding=model.encode(jd.jobTitle),
+        title_lower_embedding=model.encode(jd.jobTitle.lower()),
+        required_years=extract_required_experience(jd.qualifications, model),
+        responsibility_embeddings=model.encode(jd.keyResponsibilities) if jd.keyResponsibilities else None,
+        education_requirements=education_requirements,
+        education_embeddings=model.encode([req["text"] for req in education_requirements]) if education_requirements else None
+    )
+
+def compute_similarity(jd: JDModel, cv: CVModel, model=None) -> Tuple[float, Dict]:
+    return score_cv(prepare_jd(jd, model=model), cv)
+
+def score_cv(prepared_jd: PreparedJD, cv: CVModel) -> Tuple[float, Dict]:
+    jd = prepared_jd.jd
+    model = prepared_jd.model
     suggested_role = cv.Analytics.suggested_role
     
-    role_relevance = calculate_role_relevance(jd.jobTitle, suggested_role, cv.experiences_list, model)
-    
-    jd_title_emb = model.encode(jd.jobTitle)
+    role_relevance = calculate_role_relevance(jd.jobTitle, suggested_role, cv.experiences_list, model, jd_title_emb=prepared_jd.title_lower_embedding)
     
     cv_experience_years = calculate_experience_years(cv.experiences_list)
-    jd_required_years = extract_required_experience(jd.qualifications, model)
+    jd_required_years = prepared_jd.required_years
     
     cv_title_text = suggested_role if suggested_role else " ".join([exp.jobTitle for exp in cv.experiences_list if exp.jobTitle])
     
-    cv_title_emb = model.encode(cv_title_text if cv_title_text else "")
-    
-    sim_title = cosine_similarity([jd_title_emb], [cv_title_emb])[0][0] if cv_title_text else 0.0
-    sim_resp = calculate_combined_sim_resp(jd.keyResponsibilities, cv.experiences_list, model)
+    if cv_title_text:
+        cv_title_emb = model.encode(cv_title_text)
+        sim_title = cosine_similarity([prepared_jd.title_embedding], [cv_title_emb])[0][0]
+    else:
+        sim_title = 0.0
+    sim_resp = calculate_combined_sim_resp(jd.keyResponsibilities, cv.experiences_list, model, jd_embeddings=prepared_jd.responsibility_embeddings)
     
     experience_match = calculate_experience_match(cv_experience_years, jd_required_years, role_relevance)
-    education_match = calculate_education_match(cv.education_list, jd.educationRequired, model)
+    education_match = calculate_education_match(
+        cv.education_list, jd.educationRequired, model,
+        jd_requirements=prepared_jd.education_requirements,
+        jd_embeddings=prepared_jd.education_embeddings
+    )
     location_match = calculate_location_match(cv.Personal_Data.location, jd.location)
     
+    return combine_scores(
+        sim_title, sim_resp, experience_match, education_match, location_match,
+        role_relevance, cv_experience_years, jd_required_years, suggested_role
+    )
+
+def combine_scores(sim_title, sim_resp, experience_match, education_match, location_match,
+                   role_relevance, cv_experience_years, jd_required_years, suggested_role) -> Tuple[float, Dict]:
     final_score = (
         TITLE_WEIGHT * sim_title +
         RESPONSIBILITIES_WEIGHT * sim_resp +
@@ -486,4 +634,134 @@ def compute_similarity(jd: JDModel, cv: CVModel) -> Tuple[float, Dict]:
         })
     }
     
-    return round(float(final_score), 4), details
\ No newline at end of file
+    return round(float(final_score), 4), details
+
+def normalize_rows(embeddings) -> np.ndarray:
+    embeddings = np.atleast_2d(np.asarray(embeddings, dtype=np.float32))
+    norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+    return embeddings / np.where(norms == 0, 1.0, norms)
+
+def _segment_bounds(lengths: List[int]) -> List[Tuple[int, int]]:
+    ends = np.cumsum(lengths)
+    return [(int(end - length), int(end)) for length, end in zip(lengths, ends)]
+
+def top2_weighted_similarity(similarity_matrix: np.ndarray) -> np.ndarray:
+    """
+    For every row, weights the best and second-best similarity 0.7/0.3 (or takes
+    the best alone when there is a single column), using ``np.partition`` instead
+    of sorting full rows.
+    """
+    columns = similarity_matrix.shape[1]
+    if columns == 1:
+        return similarity_matrix[:, 0]
+    top_two = np.partition(similarity_matrix, columns - 2, axis=1)[:, -2:]
+    return 0.7 * top_two.max(axis=1) + 0.3 * top_two.min(axis=1)
+
+def _batch_responsibility_similarity(prepared_jd: PreparedJD, cvs: List[CVModel]) -> np.ndarray:
+    scores = np.zeros(len(cvs))
+    if prepared_jd.responsibility_embeddings is None:
+        return scores
+
+    cv_bullets = [
+        [d for exp in cv.experiences_list if exp.description for d in exp.description]
+        for cv in cvs
+    ]
+    all_bullets = [bullet for bullets in cv_bullets for bullet in bullets]
+    if not all_bullets:
+        return scores
+
+    # One JD x (all CV bullets) cosine matrix, sliced into one segment per CV
+    similarity = normalize_rows(prepared_jd.responsibility_embeddings) @ normalize_rows(prepared_jd.model.encode(all_bullets)).T
+    for i, (start, end) in enumerate(_segment_bounds([len(b) for b in cv_bullets])):
+        if end > start:
+            best_matches = top2_weighted_similarity(similarity[:, start:end])
+            scores[i] = min(1.0, 0.3 + float(best_matches.mean()) * 0.7)
+    return scores
+
+def _batch_title_similarity(prepared_jd: PreparedJD, texts: List[Optional[str]], jd_embedding: np.ndarray) -> np.ndarray:
+    scores = np.zeros(len(texts))
+    present = [i for i, text in enumerate(texts) if text]
+    if present:
+        cv_embeddings = normalize_rows(prepared_jd.model.encode([texts[i] for i in present]))
+        scores[present] = cv_embeddings @ normalize_rows(jd_embedding)[0]
+    return scores
+
+def _batch_education_match(prepared_jd: PreparedJD, cvs: List[CVModel]) -> np.ndarray:
+    if not prepared_jd.education_requirements:
+        return np.ones(len(cvs))
+    scores = np.zeros(len(cvs))
+
+    cv_entries = [parse_education_entries(cv.education_list) for cv in cvs]
+    all_entries = [entry for entries in cv_entries for entry in entries]
+    if not all_entries:
+        return scores
+
+    model = prepared_jd.model
+    requirements = prepared_jd.education_requirements
+    base = normalize_rows(prepared_jd.education_embeddings) @ normalize_rows(model.encode([e["text"] for e in all_entries])).T
+
+    jd_levels = np.array([req["level"] for req in requirements])[:, None]
+    cv_levels = np.array([entry["level"] for entry in all_entries])[None, :]
+    level_bonus = np.where((jd_levels >= 0) & (cv_levels > jd_levels), 0.25, 0.0)
+
+    field_bonus = np.zeros_like(base)
+    jd_fields = [req["field"] for req in requirements]
+    cv_fields = [entry["field"] for entry in all_entries]
+    fields = list(dict.fromkeys(f for f in jd_fields + cv_fields if f))
+    if fields:
+        field_index = {field: i for i, field in enumerate(fields)}
+        field_embeddings = normalize_rows(model.encode(fields))
+        field_similarity = field_embeddings @ field_embeddings.T
+        for i, jd_field in enumerate(jd_fields):
+            if not jd_field:
+                continue
+            for j, cv_field in enumerate(cv_fields):
+                if not cv_field:
+                    continue
+                if jd_field == cv_field:
+                    field_bonus[i, j] = 0.3
+                else:
+                    field_bonus[i, j] = 0.2 * field_similarity[field_index[cv_field], field_index[jd_field]]
+
+    total = np.minimum(1.0, base + level_bonus + field_bonus)
+    for i, (start, end) in enumerate(_segment_bounds([len(e) for e in cv_entries])):
+        if end > start:
+            best_per_requirement = np.maximum(total[:, start:end].max(axis=1), 0.0)
+            scores[i] = min(1.0, float(best_per_requirement.max()))
+    return scores
+
+def compute_similarity_batch(jd: JDModel, cvs: List[CVModel]) -> List[Tuple[float, Dict]]:
+    """
+    Scores N CVs against one JD as matrix operations. All texts are encoded in one
+    batched call, responsibilities are compared through a single JD x (all CV
+    bullets) cosine matrix, and title, role and education similarities are
+    computed as batched dot products. Results match ``compute_similarity``.
+    """
+    if not cvs:
+        return []
+    prepared_jd = prepare_jd(jd, cvs)
+
+    suggested_roles = [cv.Analytics.suggested_role for cv in cvs]
+    job_titles = [" ".join([exp.jobTitle for exp in cv.experiences_list if exp.jobTitle]) for cv in cvs]
+    title_texts = [role if role else titles for role, titles in zip(suggested_roles, job_titles)]
+    role_texts = [
+        role.lower() if role else (titles.lower() if cv.experiences_list and titles.strip() else None)
+        for role, titles, cv in zip(suggested_roles, job_titles, cvs)
+    ]
+
+    sim_titles = _batch_title_similarity(prepared_jd, title_texts, prepared_jd.title_embedding)
+    role_similarities = _batch_title_similarity(prepared_jd, role_texts, prepared_jd.title_lower_embedding)
+    sim_resps = _batch_responsibility_similarity(prepared_jd, cvs)
+    education_matches = _batch_education_match(prepared_jd, cvs)
+
+    results = []
+    for i, cv in enumerate(cvs):
+        role_relevance = max(0.3, role_similarities[i]) if role_texts[i] else 0.5
+        cv_experience_years = calculate_experience_years(cv.experiences_list)
+        experience_match = calculate_experience_match(cv_experience_years, prepared_jd.required_years, role_relevance)
+        location_match = calculate_location_match(cv.Personal_Data.location, jd.location)
+        results.append(combine_scores(
+            sim_titles[i], sim_resps[i], experience_match, education_matches[i], location_match,
+            role_relevance, cv_experience_years, prepared_jd.required_years, suggested_roles[i]
+        ))
+    return results
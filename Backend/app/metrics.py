@@ -0,0 +1,35 @@
+import threading
+from collections import defaultdict
+from typing import Any, Callable, Dict
+
+# Process-wide counters and gauges, exposed through GET /metrics
+_lock = threading.Lock()
+_counters: Dict[str, float] = defaultdict(float)
+_gauges: Dict[str, float] = {}
+_collectors: Dict[str, Callable[[], Dict[str, Any]]] = {}
+
+def increment(name: str, value: float = 1) -> None:
+    with _lock:
+        _counters[name] += value
+
+def set_gauge(name: str, value: float) -> None:
+    with _lock:
+        _gauges[name] = value
+
+def register_collector(name: str, collect: Callable[[], Dict[str, Any]]) -> None:
+    """Registers a callable whose values are read at snapshot time, e.g. a queue depth or cache hit counters."""
+    with _lock:
+        _collectors[name] = collect
+
+def snapshot() -> Dict[str, Any]:
+    with _lock:
+        data = {"counters": dict(_counters), "gauges": dict(_gauges)}
+        collectors = dict(_collectors)
+    for name, collect in collectors.items():
+        data[name] = collect()
+    return data
+
+def reset() -> None:
+    with _lock:
+        _counters.clear()
+        _gauges.clear()
@@ -2,13 +2,22 @@ import os
 import re
 import json
 import logging
-from pathlib import Path
-from typing import Any
+import io
+import signal
+import threading
+from typing import Any, BinaryIO, Iterable, Iterator, Optional, Union
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+class ExtractionTimeout(BaseException):
+    """
+    Raised in an extraction worker when a document takes longer than its time limit. The alarm
+    raises it inside PyPDF2 and python-docx, so like KeyboardInterrupt it is not an Exception:
+    their ``except Exception`` blocks cannot swallow it. Callers catch it explicitly.
+    """
+
 def to_bool(value: Any) -> bool:
     if isinstance(value, bool):
         return value
@@ -18,37 +27,121 @@ def to_bool(value: Any) -> bool:
         return bool(value)
     return False
 
-def extract_text_from_file(file_path):
-    ext = os.path.splitext(file_path)[1].lower()
+# Leading bytes of the binary formats; anything else is only read as text when it is named or typed as text
+_PDF_MAGIC = b"%PDF-"
+_ZIP_MAGIC = b"PK\x03\x04"  # DOCX files are ZIP archives
+_TEXT_CONTENT_TYPES = {"text/plain"}
+
+def detect_document_type(head: bytes, filename: Optional[str] = None, content_type: Optional[str] = None) -> Optional[str]:
+    """Returns "pdf", "docx" or "txt" from the first bytes of a document, falling back to its name and content type for text."""
+    ext = os.path.splitext(filename or "")[1].lower()
+    if head.startswith(_PDF_MAGIC):
+        return "pdf"
+    if head.startswith(_ZIP_MAGIC) and ext in ("", ".docx"):
+        return "docx"
+    if ext == ".txt" or (not ext and content_type in _TEXT_CONTENT_TYPES):
+        return "txt"
+    return None
+
+def iter_pdf_pages(stream: BinaryIO) -> Iterator[str]:
+    """Yields the text of a PDF page by page; pages are only parsed as they are consumed."""
+    import PyPDF2
+    reader = PyPDF2.PdfReader(stream)
+    for page in reader.pages:
+        yield page.extract_text() or ""
+
+def join_within_budget(parts: Iterable[str], max_chars: Optional[int] = None, separator: str = "") -> str:
+    """Joins parts, stopping once max_chars characters are collected so later parts are never produced."""
+    if not max_chars:
+        return separator.join(parts)
+    collected = []
+    length = 0
+    for part in parts:
+        collected.append(part)
+        length += len(part) + len(separator)
+        if length >= max_chars:
+            break
+    return separator.join(collected)[:max_chars]
+
+def extract_text(source: Union[bytes, bytearray, memoryview, BinaryIO], filename: Optional[str] = None,
+                 content_type: Optional[str] = None, max_chars: Optional[int] = None) -> Optional[str]:
+    """
+    Extracts the text of a PDF, DOCX or TXT document held in memory (bytes or a memoryview)
+    or in a seekable binary file object such as an upload's SpooledTemporaryFile, without
+    writing it to disk. The format is detected from the content; returns None when it is
+    unsupported or the document cannot be read. With max_chars, only the first max_chars
+    characters are returned and PDF pages after them are not parsed.
+    """
+    name = filename or "upload"
+    stream = io.BytesIO(source) if isinstance(source, (bytes, bytearray, memoryview)) else source
     try:
-        if ext == ".txt":
-            return Path(file_path).read_text(encoding="utf-8")
-        elif ext == ".docx":
+        stream.seek(0)
+        doc_type = detect_document_type(stream.read(8), filename, content_type)
+        stream.seek(0)
+        if doc_type == "txt":
+            text = stream.read().decode("utf-8")
+            return text[:max_chars] if max_chars else text
+        elif doc_type == "docx":
             from docx import Document
-            doc = Document(file_path)
-            return "\n".join([para.text for para in doc.paragraphs])
-        elif ext == ".pdf":
-            import PyPDF2
-            text = ""
-            with open(file_path, "rb") as f:
-                reader = PyPDF2.PdfReader(f)
-                for page in reader.pages:
-                    text += page.extract_text() or ""
-            return text
+            doc = Document(stream)
+            return join_within_budget((para.text for para in doc.paragraphs), max_chars, separator="\n")
+        elif doc_type == "pdf":
+            return join_within_budget(iter_pdf_pages(stream), max_chars)
         else:
-            logger.warning(f"Unsupported file type: {ext} for file {file_path}")
+            logger.warning(f"Unsupported file type for file {name}")
             return None
     except Exception as e:
-        logger.error(f"Error extracting text from {file_path}: {e}")
+        logger.error(f"Error extracting text from {name}: {e}")
         return None
 
+def extract_text_from_file(file_path):
+    with open(file_path, "rb") as f:
+        return extract_text(f, filename=os.path.basename(file_path))
+
+def _raise_timeout(signum, frame):
+    raise ExtractionTimeout()
+
+def init_extraction_worker(memory_limit_bytes: int = 0) -> None:
+    """Process pool initializer: caps the worker's heap so an oversized document fails with MemoryError."""
+    if memory_limit_bytes <= 0:
+        return
+    try:
+        import resource
+        # RLIMIT_DATA counts allocated memory, unlike RLIMIT_AS which also counts address space merely reserved
+        _, hard = resource.getrlimit(resource.RLIMIT_DATA)
+        limit = memory_limit_bytes if hard == resource.RLIM_INFINITY else min(memory_limit_bytes, hard)
+        resource.setrlimit(resource.RLIMIT_DATA, (limit, hard))
+    except (ImportError, ValueError, OSError) as e:
+        logger.warning(f"Could not limit extraction worker memory: {e}")
+
+def extract_text_from_upload(filename: str, data: bytes, timeout: Optional[float] = None, max_chars: Optional[int] = None,
+                             content_type: Optional[str] = None):
+    """
+    Runs in a worker process: extracts the text of an upload from its bytes. With a timeout,
+    raises ExtractionTimeout once it has run for that many seconds; the PDF and DOCX readers
+    are pure Python, so the alarm interrupts them between bytecodes.
+    """
+    # SIGALRM only exists on Unix and can only be handled in the main thread
+    armed = bool(timeout) and hasattr(signal, "setitimer") and threading.current_thread() is threading.main_thread()
+    if armed:
+        signal.signal(signal.SIGALRM, _raise_timeout)
+        signal.setitimer(signal.ITIMER_REAL, timeout)
+    try:
+        return extract_text(data, filename=filename, content_type=content_type, max_chars=max_chars)
+    finally:
+        if armed:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+
+# Resume text sent to the LLM is cut to this many characters
+RESUME_TEXT_MAX_CHARS = 8000
+
 def preprocess_resume_text(text: str) -> str:
     text = re.sub(r'\s+', ' ', text)
     text = re.sub(r'[^\w\s\-\.\,\:\;\@\(\)\[\]\{\}\+\=\&\|\/\?\!]', '', text)
     text = text.replace('\n', ' ').replace('\r', ' ')
     text = re.sub(r' +', ' ', text)
-    if len(text) > 8000:
-        text = text[:8000] + "..."
+    if len(text) > RESUME_TEXT_MAX_CHARS:
+        text = text[:RESUME_TEXT_MAX_CHARS] + "..."
     return text.strip()
 
 def clean_json_response(content: str) -> str:
@@ -0,0 +1,204 @@
+import os
+import time
+import logging
+import threading
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+from typing import Any, Callable, Hashable, List, Optional, Tuple
+
+from dotenv import load_dotenv
+
+from . import metrics
+from .schemas import CVModel
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+load_dotenv()
+
+# Buffer match results and write them in the background. Set to "false" to write before responding.
+PERSIST_WRITE_BEHIND = os.getenv("PERSIST_WRITE_BEHIND", "true").lower() == "true"
+# Maximum number of buffered writes; when the buffer is full, writes happen inline in the request
+PERSIST_QUEUE_SIZE = int(os.getenv("PERSIST_QUEUE_SIZE", 10000))
+# Maximum number of writes flushed together, and how long to wait for a batch to fill up
+PERSIST_BATCH_SIZE = int(os.getenv("PERSIST_BATCH_SIZE", 500))
+PERSIST_FLUSH_INTERVAL_SECONDS = float(os.getenv("PERSIST_FLUSH_INTERVAL_SECONDS", 0.5))
+# Failed flushes are retried with exponential backoff before the writes are dropped
+PERSIST_MAX_RETRIES = int(os.getenv("PERSIST_MAX_RETRIES", 3))
+PERSIST_RETRY_BACKOFF_SECONDS = float(os.getenv("PERSIST_RETRY_BACKOFF_SECONDS", 1.0))
+# How long shutdown waits for buffered writes
+PERSIST_DRAIN_TIMEOUT_SECONDS = float(os.getenv("PERSIST_DRAIN_TIMEOUT_SECONDS", 30))
+
+class PersistenceError(Exception):
+    """Raised by a writer when a flush did not reach the database and should be retried."""
+    pass
+
+class WriteBehindQueue:
+    """
+    Buffers writes in memory and flushes them from a background thread. Writes are
+    grouped by key, and each group goes to ``writer(key, items)`` in one call, retried
+    with backoff on failure. The buffer holds at most ``max_items`` writes; beyond
+    that, ``submit`` writes inline so memory stays bounded.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        writer: Callable[[Hashable, List[Any]], None],
+        max_items: int = PERSIST_QUEUE_SIZE,
+        batch_size: int = PERSIST_BATCH_SIZE,
+        flush_interval: float = PERSIST_FLUSH_INTERVAL_SECONDS,
+        max_retries: int = PERSIST_MAX_RETRIES,
+        retry_backoff: float = PERSIST_RETRY_BACKOFF_SECONDS
+    ):
+        self.name = name
+        self.writer = writer
+        self.max_items = max_items
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self._items: "deque[Tuple[Hashable, Any]]" = deque()
+        self._in_flight = 0
+        self._closed = False
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def pending(self) -> int:
+        with self._cond:
+            return len(self._items) + self._in_flight
+
+    def submit(self, key: Hashable, items: List[Any]) -> None:
+        if not items:
+            return
+        with self._cond:
+            queued = not self._closed and len(self._items) + len(items) <= self.max_items
+            if queued:
+                self._items.extend((key, item) for item in items)
+                self._ensure_thread()
+                self._cond.notify_all()
+        if queued:
+            metrics.increment(f"{self.name}.enqueued", len(items))
+        else:
+            metrics.increment(f"{self.name}.inline_writes", len(items))
+            self._write(key, items)
+
+    def _ensure_thread(self) -> None:
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name=f"{self.name}-flusher", daemon=True)
+            self._thread.start()
+
+    def _next_batch(self) -> Optional[List[Tuple[Hashable, Any]]]:
+        with self._cond:
+            while not self._items and not self._closed:
+                self._cond.wait()
+            if not self._items:
+                return None
+            # Give concurrent requests a moment to add to the batch
+            deadline = time.monotonic() + self.flush_interval
+            while len(self._items) < self.batch_size and not self._closed:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+            batch = [self._items.popleft() for _ in range(min(self.batch_size, len(self._items)))]
+            self._in_flight += len(batch)
+            return batch
+
+    def _run(self) -> None:
+        while True:
+            batch = self._next_batch()
+            if batch is None:
+                return
+            groups: "OrderedDict[Hashable, List[Any]]" = OrderedDict()
+            for key, item in batch:
+                groups.setdefault(key, []).append(item)
+            for key, items in groups.items():
+                self._write(key, items)
+            with self._cond:
+                self._in_flight -= len(batch)
+                self._cond.notify_all()
+
+    def _write(self, key: Hashable, items: List[Any]) -> None:
+        for attempt in range(self.max_retries + 1):
+            started = time.monotonic()
+            try:
+                self.writer(key, items)
+            except Exception as e:
+                if attempt == self.max_retries:
+                    logger.error(f"Dropping {len(items)} writes from {self.name} after {attempt + 1} attempts: {e}")
+                    metrics.increment(f"{self.name}.failed", len(items))
+                    return
+                logger.warning(f"Flushing {len(items)} writes from {self.name} failed, retrying: {e}")
+                metrics.increment(f"{self.name}.retries")
+                time.sleep(self.retry_backoff * 2 ** attempt)
+            else:
+                metrics.increment(f"{self.name}.flushed", len(items))
+                metrics.increment(f"{self.name}.flush_batches")
+                metrics.set_gauge(f"{self.name}.last_flush_seconds", time.monotonic() - started)
+                return
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Waits until every buffered write has been flushed. Returns False on timeout."""
+        with self._cond:
+            return self._cond.wait_for(lambda: not self._items and not self._in_flight, timeout)
+
+    def close(self, timeout: Optional[float] = None) -> bool:
+        """Stops accepting writes, flushes the buffer and stops the flusher thread. Returns False on timeout."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+            thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+            return not thread.is_alive()
+        return True
+
+@dataclass
+class AnalysisWrite:
+    cv: CVModel
+    result: dict
+
+def write_analysis_results(key: Tuple[Any, Optional[int], str], writes: List[AnalysisWrite]) -> None:
+    """Saves the candidates of one (repository, JD, user) group and their analysis results with bulk writes"""
+    repository, jd_db_id, user_id = key
+    db_candidates = repository.get_or_create_candidates([w.cv for w in writes], user_id)
+    # The repositories log and swallow errors; an empty outcome for rows that should exist means the write failed
+    if all(c is None for c in db_candidates) and any(w.cv.Personal_Data.email for w in writes):
+        raise PersistenceError("Could not save candidates")
+    if jd_db_id is None:
+        return
+    rows = [(db_candidate.id, w.result) for db_candidate, w in zip(db_candidates, writes) if db_candidate]
+    if rows and not repository.create_analysis_results(jd_db_id, user_id, rows):
+        raise PersistenceError("Could not save analysis results")
+
+_persistence_queue: Optional[WriteBehindQueue] = None
+_persistence_queue_lock = threading.Lock()
+
+def get_persistence_queue() -> WriteBehindQueue:
+    global _persistence_queue
+    if _persistence_queue is None:
+        with _persistence_queue_lock:
+            if _persistence_queue is None:
+                # A zero-sized buffer makes every submit write inline
+                queue = WriteBehindQueue(
+                    "persistence",
+                    write_analysis_results,
+                    max_items=PERSIST_QUEUE_SIZE if PERSIST_WRITE_BEHIND else 0
+                )
+                # Bound to this queue: the global is cleared when the queue is drained at shutdown
+                metrics.register_collector("persistence", lambda: {"pending": queue.pending})
+                _persistence_queue = queue
+    return _persistence_queue
+
+def save_analysis_results(repository, jd_db_id: Optional[int], user_id: str, writes: List[AnalysisWrite]) -> None:
+    get_persistence_queue().submit((repository, jd_db_id, user_id), writes)
+
+def drain_persistence_queue(timeout: float = PERSIST_DRAIN_TIMEOUT_SECONDS) -> None:
+    global _persistence_queue
+    if _persistence_queue is not None:
+        if not _persistence_queue.close(timeout):
+            logger.error(f"Shutting down with {_persistence_queue.pending} unsaved match results")
+        _persistence_queue = None
@@ -0,0 +1,180 @@
+import os
+import sys
+import asyncio
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+from dotenv import load_dotenv
+
+from . import llm, metrics, text_cache
+from .parsing import RESUME_TEXT_MAX_CHARS, ExtractionTimeout, extract_text_from_upload, init_extraction_worker
+from .skills import SKILL_LLM_FALLBACK, detect_skill_presence, flatten_skill_categories, resume_summary
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+load_dotenv()
+
+# Number of processes used for CPU-bound text extraction (PDF/DOCX parsing); app.serve splits them between its workers
+EXTRACTION_WORKERS = int(os.getenv("EXTRACTION_WORKERS", os.cpu_count() or 1))
+# Wall-clock limit for extracting one document; 0 disables it
+EXTRACTION_TIMEOUT_SECONDS = float(os.getenv("EXTRACTION_TIMEOUT_SECONDS", 30))
+# Memory limit of each extraction worker in MB; 0 disables it
+EXTRACTION_MEMORY_LIMIT_MB = int(os.getenv("EXTRACTION_MEMORY_LIMIT_MB", 1024))
+# Resume text extraction stops after this many characters (PDF pages past it are not parsed); 0 reads whole documents.
+# Whitespace is collapsed before the text is cut to RESUME_TEXT_MAX_CHARS for the LLM, hence the headroom.
+EXTRACTION_MAX_CHARS = int(os.getenv("EXTRACTION_MAX_CHARS", 2 * RESUME_TEXT_MAX_CHARS))
+# Extraction workers are replaced after this many documents, releasing memory fragmented by large PDFs; 0 keeps them
+EXTRACTION_MAX_TASKS_PER_WORKER = int(os.getenv("EXTRACTION_MAX_TASKS_PER_WORKER", 50))
+# Maximum number of LLM conversions in flight at once
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", 4))
+
+_process_pool: Optional[ProcessPoolExecutor] = None
+
+def get_process_pool() -> ProcessPoolExecutor:
+    global _process_pool
+    if _process_pool is None:
+        # Spawned (not forked) workers: the server process is multi-threaded by the time the pool starts
+        options = {}
+        if EXTRACTION_MAX_TASKS_PER_WORKER > 0 and sys.version_info >= (3, 11):
+            options["max_tasks_per_child"] = EXTRACTION_MAX_TASKS_PER_WORKER
+        _process_pool = ProcessPoolExecutor(
+            max_workers=EXTRACTION_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=init_extraction_worker,
+            initargs=(EXTRACTION_MEMORY_LIMIT_MB * 1024 * 1024,),
+            **options
+        )
+    return _process_pool
+
+def shutdown_process_pool() -> None:
+    global _process_pool
+    if _process_pool is not None:
+        _process_pool.shutdown(wait=False, cancel_futures=True)
+        _process_pool = None
+
+async def extract_upload_text(
+    filename: str,
+    data: bytes,
+    content_type: Optional[str] = None,
+    timeout: float = EXTRACTION_TIMEOUT_SECONDS,
+    max_chars: int = EXTRACTION_MAX_CHARS
+) -> Optional[str]:
+    """
+    Extracts up to ``max_chars`` characters of an upload in the process pool, unless the same
+    file was extracted before. Raises ExtractionTimeout when the document takes longer than ``timeout`` seconds;
+    the worker stops on its own at that point and a slightly later wait here covers workers
+    that do not.
+    """
+    global _process_pool
+    key, text = await asyncio.to_thread(text_cache.lookup, data, filename, content_type, max_chars)
+    if text is not None:
+        return text
+
+    loop = asyncio.get_running_loop()
+    pool = get_process_pool()
+    future = loop.run_in_executor(
+        pool, extract_text_from_upload, filename, data, timeout or None, max_chars or None, content_type
+    )
+    try:
+        text = await asyncio.wait_for(future, timeout + 5 if timeout else None)
+        if key and text:
+            await asyncio.to_thread(text_cache.get_text_cache().put, key, text)
+        return text
+    except asyncio.TimeoutError:
+        raise ExtractionTimeout()
+    except BrokenProcessPool:
+        # A worker died mid-document (e.g. killed by the OOM killer); later uploads get a new pool
+        logger.error(f"Extraction worker died while reading {filename}")
+        metrics.increment("extraction.worker_failures")
+        if _process_pool is pool:
+            _process_pool = None
+            pool.shutdown(wait=False, cancel_futures=True)
+        return None
+
+@dataclass
+class ResumeExtraction:
+    """Outcome of extracting one uploaded resume; exactly one of resume_json and error is set."""
+    index: int
+    filename: str
+    resume_json: Optional[dict] = None
+    error: Optional[str] = None
+
+async def _extract_resume(
+    index: int,
+    filename: str,
+    data: bytes,
+    content_type: Optional[str],
+    skill_categories: Optional[Dict[str, List[str]]],
+    semaphore: asyncio.Semaphore
+) -> ResumeExtraction:
+    try:
+        resume_text = await extract_upload_text(filename, data, content_type)
+    except ExtractionTimeout:
+        logger.warning(f"Text extraction of {filename} timed out after {EXTRACTION_TIMEOUT_SECONDS}s, skipping.")
+        metrics.increment("extraction.timeouts")
+        return ResumeExtraction(index=index, filename=filename, error="Text extraction timed out")
+    if not resume_text:
+        logger.warning(f"Could not extract text from {filename}, skipping.")
+        return ResumeExtraction(index=index, filename=filename, error="Could not extract text from file")
+
+    async with semaphore:
+        try:
+            # Extracted without the JD's skills, so the cached result is reused for every JD
+            resume_json = await llm.aconvert_resume_to_json(resume_text)
+        except llm.LLMJsonError as e:
+            logger.error(f"Could not process resume {filename}: {e}")
+            return ResumeExtraction(index=index, filename=filename, error=str(e))
+
+    skills = flatten_skill_categories(skill_categories)
+    if skills:
+        resume_json["skill_presence"] = await resolve_skill_presence(resume_json, skills, semaphore)
+    return ResumeExtraction(index=index, filename=filename, resume_json=resume_json)
+
+async def resolve_skill_presence(resume_json: dict, skills: List[str], semaphore: asyncio.Semaphore) -> Dict[str, bool]:
+    """Runs the local skill matcher and asks the LLM only about the skills it could not decide."""
+    presence, undecided = await asyncio.to_thread(detect_skill_presence, resume_json, skills)
+    if undecided and SKILL_LLM_FALLBACK:
+        async with semaphore:
+            try:
+                answer = await llm.acheck_skill_presence(resume_summary(resume_json), undecided)
+                presence.update({skill: answer.get(skill, False) for skill in undecided})
+            except llm.LLMJsonError as e:
+                logger.warning(f"Skill presence fallback failed, treating {len(undecided)} undecided skills as absent: {e}")
+    return presence
+
+async def iter_resume_extractions(
+    files: List[Tuple[str, bytes, Optional[str]]],
+    skill_categories: Optional[Dict[str, List[str]]] = None,
+    max_concurrency: int = LLM_MAX_CONCURRENCY
+) -> AsyncIterator[ResumeExtraction]:
+    """
+    Extracts (filename, bytes, content type) uploads concurrently and yields each result as
+    soon as it finishes. Text extraction runs in the process pool and LLM conversion goes through the
+    async client, with at most ``max_concurrency`` LLM calls in flight.
+    """
+    semaphore = asyncio.Semaphore(max_concurrency)
+    tasks = [
+        asyncio.create_task(_extract_resume(index, filename, data, content_type, skill_categories, semaphore))
+        for index, (filename, data, content_type) in enumerate(files)
+    ]
+    try:
+        for task in asyncio.as_completed(tasks):
+            yield await task
+    finally:
+        for task in tasks:
+            task.cancel()
+
+async def extract_resume_batch(
+    files: List[Tuple[str, bytes, Optional[str]]],
+    skill_categories: Optional[Dict[str, List[str]]] = None,
+    max_concurrency: int = LLM_MAX_CONCURRENCY
+) -> List[ResumeExtraction]:
+    """Extracts resumes concurrently and returns the results in input order."""
+    results = [result async for result in iter_resume_extractions(files, skill_categories, max_concurrency)]
+    return sorted(results, key=lambda result: result.index)
@@ -0,0 +1,161 @@
+import os
+import asyncio
+import threading
+from abc import ABC, abstractmethod
+from typing import List, Optional, Tuple
+
+from dotenv import load_dotenv
+
+from . import crud, schemas
+from .crud import Page
+from .database import get_supabase, get_async_supabase
+
+load_dotenv()
+
+# "supabase" keeps job descriptions, candidates and analysis results in the Supabase project;
+# "sql" stores them in the SQLAlchemy database at DATABASE_URL (users and logins stay on Supabase Auth)
+REPOSITORY_BACKEND = os.getenv("REPOSITORY_BACKEND", "supabase").lower()
+DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./hostcv.db")
+
+class Repository(ABC):
+    """
+    Storage of job descriptions, candidates and analysis results. Methods follow the
+    crud conventions: failures are logged and reported as None, [] or an empty Page.
+    The async variants run the sync ones in a worker thread unless a backend has a
+    native async client.
+    """
+
+    @abstractmethod
+    def get_jd(self, jd_id: int) -> Optional[schemas.JobDescription]: ...
+
+    @abstractmethod
+    def get_or_create_job_description(self, jd: schemas.JDModel) -> Optional[schemas.JobDescription]: ...
+
+    @abstractmethod
+    def get_jds(self, skip: int = 0, limit: int = 100, after: Optional[Tuple[str, int]] = None,
+                include_details: bool = False, include_total: bool = False) -> Page: ...
+
+    @abstractmethod
+    def update_jd(self, jd_id: int, jd_update: schemas.JobDescriptionUpdate) -> Optional[schemas.JobDescription]: ...
+
+    @abstractmethod
+    def update_jd_details(self, jd_id: int, jd_update: schemas.JobDescriptionDetailUpdate) -> Optional[schemas.JobDescription]: ...
+
+    @abstractmethod
+    def get_jd_results(self, jd_id: int, skip: int = 0, limit: int = 100, after: Optional[Tuple[str, int]] = None,
+                       include_details: bool = False, include_total: bool = False) -> Page: ...
+
+    @abstractmethod
+    def get_user_analyses(self, user_id: str, skip: int = 0, limit: int = 100, after: Optional[Tuple[str, int]] = None,
+                          include_details: bool = False, include_total: bool = False) -> Page: ...
+
+    @abstractmethod
+    def get_or_create_candidates(self, cvs: List[schemas.CVModel], recruiter_id: str) -> List[Optional[schemas.Candidate]]: ...
+
+    @abstractmethod
+    def create_analysis_results(self, jd_db_id: int, user_id: str, results: List[Tuple[int, dict]]) -> List[schemas.AnalysisResult]: ...
+
+    async def warm_up(self) -> None:
+        """Prepares caches before the first request"""
+
+    async def aget_jd(self, jd_id: int) -> Optional[schemas.JobDescription]:
+        return await asyncio.to_thread(self.get_jd, jd_id)
+
+    async def aget_or_create_job_description(self, jd: schemas.JDModel) -> Optional[schemas.JobDescription]:
+        return await asyncio.to_thread(self.get_or_create_job_description, jd)
+
+    async def aget_jds(self, **kwargs) -> Page:
+        return await asyncio.to_thread(lambda: self.get_jds(**kwargs))
+
+    async def aupdate_jd(self, jd_id: int, jd_update: schemas.JobDescriptionUpdate) -> Optional[schemas.JobDescription]:
+        return await asyncio.to_thread(self.update_jd, jd_id, jd_update)
+
+    async def aupdate_jd_details(self, jd_id: int, jd_update: schemas.JobDescriptionDetailUpdate) -> Optional[schemas.JobDescription]:
+        return await asyncio.to_thread(self.update_jd_details, jd_id, jd_update)
+
+    async def aget_jd_results(self, jd_id: int, **kwargs) -> Page:
+        return await asyncio.to_thread(lambda: self.get_jd_results(jd_id, **kwargs))
+
+    async def aget_user_analyses(self, user_id: str, **kwargs) -> Page:
+        return await asyncio.to_thread(lambda: self.get_user_analyses(user_id, **kwargs))
+
+class SupabaseRepository(Repository):
+    """The Supabase tables, through the crud functions. Request handlers use the async client."""
+
+    def __init__(self, supabase=None):
+        self._supabase = supabase
+
+    @property
+    def supabase(self):
+        return self._supabase or get_supabase()
+
+    def get_jd(self, jd_id):
+        return crud.get_jd(self.supabase, jd_id=jd_id)
+
+    def get_or_create_job_description(self, jd):
+        return crud.get_or_create_job_description(supabase=self.supabase, jd=jd)
+
+    def get_jds(self, **kwargs):
+        return crud.get_jds(self.supabase, **kwargs)
+
+    def update_jd(self, jd_id, jd_update):
+        return crud.update_jd(self.supabase, jd_id=jd_id, jd_update=jd_update)
+
+    def update_jd_details(self, jd_id, jd_update):
+        return crud.update_jd_details(self.supabase, jd_id=jd_id, jd_update=jd_update)
+
+    def get_jd_results(self, jd_id, **kwargs):
+        return crud.get_jd_results(self.supabase, jd_id=jd_id, **kwargs)
+
+    def get_user_analyses(self, user_id, **kwargs):
+        return crud.get_user_analyses(self.supabase, user_id=user_id, **kwargs)
+
+    def get_or_create_candidates(self, cvs, recruiter_id):
+        return crud.get_or_create_candidates(supabase=self.supabase, cvs=cvs, recruiter_id=recruiter_id)
+
+    def create_analysis_results(self, jd_db_id, user_id, results):
+        return crud.create_analysis_results(supabase=self.supabase, jd_db_id=jd_db_id, user_id=user_id, results=results)
+
+    async def warm_up(self):
+        await crud.awarm_jd_index(await get_async_supabase())
+
+    async def aget_jd(self, jd_id):
+        return await crud.aget_jd(await get_async_supabase(), jd_id=jd_id)
+
+    async def aget_or_create_job_description(self, jd):
+        return await crud.aget_or_create_job_description(supabase=await get_async_supabase(), jd=jd)
+
+    async def aget_jds(self, **kwargs):
+        return await crud.aget_jds(await get_async_supabase(), **kwargs)
+
+    async def aupdate_jd(self, jd_id, jd_update):
+        return await crud.aupdate_jd(await get_async_supabase(), jd_id=jd_id, jd_update=jd_update)
+
+    async def aupdate_jd_details(self, jd_id, jd_update):
+        return await crud.aupdate_jd_details(await get_async_supabase(), jd_id=jd_id, jd_update=jd_update)
+
+    async def aget_jd_results(self, jd_id, **kwargs):
+        return await crud.aget_jd_results(await get_async_supabase(), jd_id=jd_id, **kwargs)
+
+    async def aget_user_analyses(self, user_id, **kwargs):
+        return await crud.aget_user_analyses(await get_async_supabase(), user_id=user_id, **kwargs)
+
+_repository: Optional[Repository] = None
+_repository_lock = threading.Lock()
+
+def create_repository(backend: str = REPOSITORY_BACKEND, database_url: str = DATABASE_URL) -> Repository:
+    if backend == "supabase":
+        return SupabaseRepository()
+    if backend == "sql":
+        # Imported lazily so that Supabase deployments do not load SQLAlchemy
+        from .sql_repository import SQLRepository
+        return SQLRepository(database_url)
+    raise ValueError(f"Unknown REPOSITORY_BACKEND: {backend}")
+
+def get_repository() -> Repository:
+    global _repository
+    if _repository is None:
+        with _repository_lock:
+            if _repository is None:
+                _repository = create_repository()
+    return _repository
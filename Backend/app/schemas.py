@@ -1,7 +1,9 @@
-from pydantic import BaseModel, Field, root_validator, EmailStr, validator
+from pydantic import BaseModel, Field, PrivateAttr, root_validator, EmailStr, validator
 from typing import Dict, List, Any, Tuple, Optional, Union
 from datetime import datetime
 import phonenumbers
+import hashlib
+import json
 
 # Token Schemas
 class Token(BaseModel):
@@ -30,7 +32,7 @@ class User(UserBase):
         from_attributes = True
 
 class CandidateBase(BaseModel):
-    email: EmailStr
+    email: Optional[EmailStr] = None  # candidates.email is nullable; resumes do not always list one
     name: Optional[str] = None
     phone: Optional[str] = None
     assessment_result: Optional[str] = None
@@ -56,6 +58,9 @@ class AnalysisResultCreate(AnalysisResultBase):
 
 class AnalysisResult(AnalysisResultBase):
     id: Optional[int] = None
+    # Omitted from list projections unless details are requested
+    details: Optional[Dict[str, Any]] = None
+    created_at: Optional[datetime] = None
     candidate: Optional[Candidate] = None
 
     class Config:
@@ -80,7 +85,8 @@ class JobDescriptionUpdate(BaseModel):
 class JobDescription(JobDescriptionBase):
     id: Optional[int] = None
     created_at: Optional[datetime] = None
-    details: Dict[str, Any]
+    # Omitted from list projections unless details are requested
+    details: Optional[Dict[str, Any]] = None
     results: List[AnalysisResult] = Field(default_factory=list)
 
     class Config:
@@ -149,6 +155,40 @@ class JDModel(BaseModel):
     age_filter: Optional[AgeFilter] = None
     gender_filter: Optional[str] = None
 
+    # Serializations computed on first use; assigning a field clears them
+    _canonical_json: Optional[bytes] = PrivateAttr(default=None)
+    _content_hash: Optional[str] = PrivateAttr(default=None)
+    _details: Optional[Dict[str, Any]] = PrivateAttr(default=None)
+
+    def __setattr__(self, name, value):
+        super().__setattr__(name, value)
+        if not name.startswith("_"):
+            self._canonical_json = self._content_hash = self._details = None
+
+    def canonical_json(self) -> bytes:
+        """
+        The fields that were set, as compact JSON with sorted keys. Key order in the
+        LLM output (e.g. categorized skills) does not change it, and it is byte-for-byte
+        what content hashes of stored job descriptions were computed from.
+        """
+        if self._canonical_json is None:
+            self._canonical_json = json.dumps(
+                self.model_dump(mode="json", exclude_unset=True), sort_keys=True, separators=(',', ':')
+            ).encode("utf-8")
+        return self._canonical_json
+
+    def content_hash(self) -> str:
+        """SHA256 of canonical_json: the fingerprint job descriptions are deduplicated and cached by"""
+        if self._content_hash is None:
+            self._content_hash = hashlib.sha256(self.canonical_json()).hexdigest()
+        return self._content_hash
+
+    def details_payload(self) -> Dict[str, Any]:
+        """All fields as JSON-compatible data, as stored in job_descriptions.details. Do not modify it."""
+        if self._details is None:
+            self._details = self.model_dump(mode="json")
+        return self._details
+
 class JobDescriptionDetailUpdate(BaseModel):
     details: JDModel
 
@@ -277,6 +317,10 @@ class ExtractedCVResponse(BaseModel):
     cv_json: CVModel
     skill_presence: Dict[str, bool]
 
+class ArchiveExtractionResponse(BaseModel):
+    results: List[ExtractedCVResponse]
+    errors: List[Dict[str, Any]]
+
 class MatchResult(BaseModel):
     candidate_id: Optional[str]
     candidate_name: str
@@ -304,4 +348,31 @@ class MatchingMetadata(BaseModel):
 
 class MatchResponse(BaseModel):
     results: List[MatchResult]
-    matching_metadata: MatchingMetadata
\ No newline at end of file
+    matching_metadata: MatchingMetadata
+    # Background job generating interview questions for the top-ranked candidates, if any
+    interview_questions_job_id: Optional[str] = None
+
+class InterviewQuestionsResponse(BaseModel):
+    candidate_id: Optional[str]
+    interview_questions: List[str]
+
+# Background Job Schemas
+class JobSubmitResponse(BaseModel):
+    job_id: str
+    status: str
+
+class JobStatusResponse(BaseModel):
+    job_id: str
+    kind: str
+    status: str
+    total: int
+    completed: int
+    failed: int
+    error: Optional[str] = None
+    created_at: datetime
+    updated_at: datetime
+
+class JobResultsResponse(JobStatusResponse):
+    results: List[Dict[str, Any]]
+    errors: List[Dict[str, Any]]
+    summary: Optional[Dict[str, Any]] = None
@@ -0,0 +1,155 @@
+"""
+Production launcher: ``python -m app.serve``.
+
+The master process imports the app and loads the embedding model once, then forks
+the workers, which share the model weights copy-on-write instead of each loading
+its own copy on their first /match. Each worker gets an equal share of the cores
+for torch's intra-op threads so that concurrent requests do not oversubscribe them.
+Crashed workers are restarted; SIGTERM/SIGINT stop all of them.
+"""
+import os
+import gc
+import time
+import signal
+import socket
+import logging
+from typing import Dict, Optional
+
+from dotenv import load_dotenv
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+load_dotenv()
+
+HOST = os.getenv("HOST", "0.0.0.0")
+PORT = int(os.getenv("PORT", 8000))
+WEB_CONCURRENCY = int(os.getenv("WEB_CONCURRENCY", os.cpu_count() or 1))
+# torch intra-op threads per worker; 0 splits the cores evenly between the workers
+WORKER_TORCH_THREADS = int(os.getenv("WORKER_TORCH_THREADS", 0))
+PRELOAD_MODEL = os.getenv("PRELOAD_MODEL", "true").lower() == "true"
+# Minimum time between restarts of crashed workers, so a worker failing on startup does not spin
+WORKER_RESTART_DELAY_SECONDS = float(os.getenv("WORKER_RESTART_DELAY_SECONDS", 1))
+
+def worker_share(total: int, workers: int) -> int:
+    return max(1, total // max(1, workers))
+
+def worker_torch_threads(workers: int, cpus: Optional[int] = None, configured: int = WORKER_TORCH_THREADS) -> int:
+    if configured > 0:
+        return configured
+    return worker_share(cpus or os.cpu_count() or 1, workers)
+
+def worker_count(requested: int, job_backend: str) -> int:
+    """
+    Number of workers to fork. Jobs of the in-memory backend only exist in the worker that
+    created them, so polling them through any other worker would 404: it runs a single worker.
+    """
+    if requested > 1 and job_backend == "memory":
+        logger.warning(f"JOB_BACKEND=memory keeps jobs in one process; starting 1 worker instead of {requested}. "
+                       "Configure a shared job backend to run more.")
+        return 1
+    return max(1, requested)
+
+def configure_worker_pools(workers: int) -> int:
+    """
+    Splits the machine's extraction processes (EXTRACTION_WORKERS) between the workers, which
+    each start their own pool, and returns the torch threads of each worker.
+    """
+    from app import pipeline
+    pipeline.EXTRACTION_WORKERS = worker_share(pipeline.EXTRACTION_WORKERS, workers)
+    return worker_torch_threads(workers)
+
+def bind_socket(host: str = HOST, port: int = PORT) -> socket.socket:
+    """Listening socket created by the master and inherited by every worker"""
+    sock = socket.socket(socket.AF_INET6 if ":" in host else socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+    return sock
+
+def preload() -> None:
+    """Imports the app and warms the model in the master, before any worker is forked"""
+    # Tokenizer thread pools and torch's OpenMP pool do not survive a fork. The master warms the
+    # model on a single thread so neither exists yet; workers size their own pool after forking.
+    os.environ.setdefault("TOKENIZERS_PARALLELISM", "false")
+    import torch
+    torch.set_num_threads(1)
+
+    import app.main  # noqa: F401 (imported here so workers inherit the loaded modules)
+    if PRELOAD_MODEL:
+        from app import matching
+        started = time.monotonic()
+        matching.preload_model()
+        logger.info(f"Loaded {matching.SENTENCE_TRANSFORMER_MODEL} in {time.monotonic() - started:.1f}s")
+    # Objects created so far are left out of garbage collection, which would otherwise write to
+    # (and so copy) every shared page the first time a worker runs a collection
+    gc.collect()
+    gc.freeze()
+
+def run_worker(sock: socket.socket, torch_threads: int) -> None:
+    import torch
+    import uvicorn
+    from app.main import app
+
+    torch.set_num_threads(torch_threads)
+    uvicorn.Server(uvicorn.Config(app, log_config=None)).run(sockets=[sock])
+
+def serve(host: str = HOST, port: int = PORT, workers: int = WEB_CONCURRENCY) -> None:
+    from app.jobs import JOB_BACKEND
+    workers = worker_count(workers, JOB_BACKEND)
+    preload()
+    sock = bind_socket(host, port)
+    torch_threads = configure_worker_pools(workers)
+    children: Dict[int, float] = {}
+    stopping = False
+
+    def spawn() -> None:
+        pid = os.fork()
+        if pid == 0:
+            # uvicorn installs its own handlers; until then the defaults apply, not the master's
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            signal.signal(signal.SIGINT, signal.SIG_DFL)
+            code = 0
+            try:
+                run_worker(sock, torch_threads)
+            except BaseException:
+                logger.exception("Worker failed")
+                code = 1
+            finally:
+                os._exit(code)
+        children[pid] = time.monotonic()
+
+    def stop(signum, frame) -> None:
+        nonlocal stopping
+        stopping = True
+        for pid in list(children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    from app.pipeline import EXTRACTION_WORKERS
+    logger.info(f"Starting {workers} workers on {host}:{port} with {torch_threads} torch threads "
+                f"and {EXTRACTION_WORKERS} extraction processes each")
+    for _ in range(workers):
+        spawn()
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    while children:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        started = children.pop(pid, None)
+        if started is None or stopping:
+            continue
+        logger.warning(f"Worker {pid} exited with status {status}, restarting it")
+        time.sleep(max(0.0, WORKER_RESTART_DELAY_SECONDS - (time.monotonic() - started)))
+        if not stopping:
+            spawn()
+    sock.close()
+
+if __name__ == "__main__":
+    serve()
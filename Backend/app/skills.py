@@ -0,0 +1,163 @@
+import os
+import re
+import unicodedata
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from dotenv import load_dotenv
+
+from .matching import get_model, normalize_rows
+
+load_dotenv()
+
+# Cosine similarity at or above which an embedding match counts as present
+SKILL_MATCH_THRESHOLD = float(os.getenv("SKILL_MATCH_THRESHOLD", 0.8))
+# Below this similarity a skill is absent; between the two thresholds the LLM decides
+SKILL_REJECT_THRESHOLD = float(os.getenv("SKILL_REJECT_THRESHOLD", 0.5))
+# Ask the LLM about skills the local matcher cannot decide
+SKILL_LLM_FALLBACK = os.getenv("SKILL_LLM_FALLBACK", "true").lower() == "true"
+
+# Common spellings mapped to one canonical (normalized) skill name
+SKILL_ALIASES = {
+    "js": "javascript",
+    "ts": "typescript",
+    "py": "python",
+    "golang": "go",
+    "postgres": "postgresql",
+    "psql": "postgresql",
+    "mongo": "mongodb",
+    "k8s": "kubernetes",
+    "node": "node.js",
+    "nodejs": "node.js",
+    "reactjs": "react",
+    "react.js": "react",
+    "vuejs": "vue",
+    "vue.js": "vue",
+    "angularjs": "angular",
+    "nextjs": "next.js",
+    "cpp": "c++",
+    "c sharp": "c#",
+    "csharp": "c#",
+    "dotnet": ".net",
+    "sklearn": "scikit-learn",
+    "scikit learn": "scikit-learn",
+    "tf": "tensorflow",
+    "ml": "machine learning",
+    "dl": "deep learning",
+    "ai": "artificial intelligence",
+    "nlp": "natural language processing",
+    "cv": "computer vision",
+    "aws": "amazon web services",
+    "gcp": "google cloud platform",
+    "google cloud": "google cloud platform",
+    "azure": "microsoft azure",
+    "ms excel": "excel",
+    "microsoft excel": "excel",
+    "hr": "human resources",
+    "ci cd": "ci/cd",
+    "rest": "rest api",
+    "restful api": "rest api",
+    "restful apis": "rest api",
+    "rest apis": "rest api",
+}
+
+# Surface forms shorter than this are only matched against listed skills, never in free text ("go", "r", "c")
+_MIN_PHRASE_LENGTH = 3
+
+def normalize_skill(name: str) -> str:
+    """Lowercases a skill name and collapses separators, then resolves known aliases."""
+    text = unicodedata.normalize("NFKC", name or "").lower()
+    text = re.sub(r"[\s_\-]+", " ", text).strip(" .,;:()")
+    return SKILL_ALIASES.get(text, text)
+
+def _surface_forms(canonical: str) -> Set[str]:
+    return {canonical} | {alias for alias, target in SKILL_ALIASES.items() if target == canonical}
+
+def _as_list(value) -> list:
+    return value if isinstance(value, list) else []
+
+def resume_skill_terms(resume_json: dict) -> List[str]:
+    """Skill-like terms listed in a structured resume: skills, technologies and extracted keywords."""
+    terms = [s.get("skillName") for s in _as_list(resume_json.get("Skills")) if isinstance(s, dict)]
+    for section in ("Experiences", "Projects"):
+        for entry in _as_list(resume_json.get(section)):
+            if isinstance(entry, dict):
+                terms.extend(_as_list(entry.get("technologiesUsed")))
+    analytics = resume_json.get("Analytics")
+    if isinstance(analytics, dict) and isinstance(analytics.get("keyword_analysis"), dict):
+        terms.extend(_as_list(analytics["keyword_analysis"].get("extracted_keywords")))
+    return list(dict.fromkeys(t for t in terms if isinstance(t, str) and t.strip()))
+
+def resume_free_text(resume_json: dict) -> str:
+    """Descriptive text of a resume that may mention skills outside the skill lists."""
+    parts: List[str] = []
+    for entry in _as_list(resume_json.get("Experiences")):
+        if isinstance(entry, dict):
+            parts.append(entry.get("jobTitle") or "")
+            parts.extend(d for d in _as_list(entry.get("description")) if isinstance(d, str))
+    for entry in _as_list(resume_json.get("Projects")):
+        if isinstance(entry, dict):
+            parts.extend([entry.get("projectName") or "", entry.get("description") or ""])
+    for entry in _as_list(resume_json.get("Education")):
+        if isinstance(entry, dict):
+            parts.extend([entry.get("degree") or "", entry.get("fieldOfStudy") or ""])
+    parts.extend(a for a in _as_list(resume_json.get("Achievements")) if isinstance(a, str))
+    return " ".join(parts)
+
+def resume_summary(resume_json: dict) -> str:
+    """Compact text of a resume's skill terms and descriptions, used for the LLM fallback."""
+    return f"Skills: {', '.join(resume_skill_terms(resume_json))}\n{resume_free_text(resume_json)}".strip()
+
+def _contains_phrase(text: str, phrase: str) -> bool:
+    # Word boundaries that treat "+", "#" and "." as part of a skill name (c++, c#, node.js)
+    return re.search(rf"(?<![\w+#.]){re.escape(phrase)}(?![\w+#]|\.\w)", text) is not None
+
+def detect_skill_presence(resume_json: dict, skills: Iterable[str], model=None) -> Tuple[Dict[str, bool], List[str]]:
+    """
+    Checks a JD-independent structured resume for each skill without calling the LLM.
+
+    Skills are matched in order against the resume's listed skill terms (after
+    normalization and alias resolution), then as whole phrases in its free text,
+    and finally by embedding similarity to the listed terms. Returns the presence
+    map and the skills the embeddings could not decide either way; those are
+    reported as absent in the map.
+    """
+    skills = list(dict.fromkeys(skills))
+    terms = resume_skill_terms(resume_json)
+    term_index = {normalize_skill(term) for term in terms}
+    text = " ".join(normalize_skill(part) for part in [*terms, resume_free_text(resume_json)])
+
+    presence: Dict[str, bool] = {}
+    remaining: List[str] = []
+    for skill in skills:
+        canonical = normalize_skill(skill)
+        if not canonical:
+            presence[skill] = False
+        elif canonical in term_index or any(
+            _contains_phrase(text, form) for form in _surface_forms(canonical) if len(form) >= _MIN_PHRASE_LENGTH
+        ):
+            presence[skill] = True
+        else:
+            remaining.append(skill)
+
+    undecided: List[str] = []
+    if remaining and terms:
+        model = model or get_model()
+        similarities = normalize_rows(model.encode(remaining)) @ normalize_rows(model.encode(terms)).T
+        best = similarities.max(axis=1)
+        for skill, similarity in zip(remaining, best):
+            presence[skill] = bool(similarity >= SKILL_MATCH_THRESHOLD)
+            if SKILL_REJECT_THRESHOLD <= similarity < SKILL_MATCH_THRESHOLD:
+                undecided.append(skill)
+    elif remaining:
+        # No listed skills to compare against: only the LLM can tell from the descriptions
+        for skill in remaining:
+            presence[skill] = False
+        if resume_free_text(resume_json).strip():
+            undecided = remaining
+
+    return presence, undecided
+
+def flatten_skill_categories(skill_categories: Optional[Dict[str, List[str]]]) -> List[str]:
+    if not skill_categories:
+        return []
+    return list(dict.fromkeys(skill for category_skills in skill_categories.values() for skill in category_skills))
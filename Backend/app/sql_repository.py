@@ -0,0 +1,299 @@
+import logging
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import (
+    JSON, DateTime, Float, ForeignKey, Index, Integer, String, and_, create_engine, event, func, or_, select
+)
+from sqlalchemy.pool import StaticPool
+from sqlalchemy.orm import DeclarativeBase, Mapped, Session, defer, mapped_column, relationship, sessionmaker
+
+from . import crud, schemas
+from .crud import Page
+from .repository import Repository
+
+logger = logging.getLogger(__name__)
+
+def _utcnow() -> datetime:
+    # Timestamps are stored as naive UTC so that SQLite and Postgres compare them the same way
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+class Base(DeclarativeBase):
+    pass
+
+# Same tables as the Supabase schema in docs/supabase_setup.md
+class JobDescriptionRecord(Base):
+    __tablename__ = "job_descriptions"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    job_id_str: Mapped[Optional[str]] = mapped_column(String, index=True)
+    content_hash: Mapped[str] = mapped_column(String, unique=True, index=True)
+    job_title: Mapped[str] = mapped_column(String, index=True)
+    company_name: Mapped[Optional[str]] = mapped_column(String)
+    location: Mapped[Optional[str]] = mapped_column(String)
+    ctc: Mapped[Optional[str]] = mapped_column(String)
+    status: Mapped[str] = mapped_column(String, default="Active")
+    details: Mapped[Optional[Dict[str, Any]]] = mapped_column(JSON)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=_utcnow)
+
+    __table_args__ = (Index("job_descriptions_created_at_id_idx", "created_at", "id"),)
+
+class CandidateRecord(Base):
+    __tablename__ = "candidates"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    name: Mapped[str] = mapped_column(String)
+    email: Mapped[Optional[str]] = mapped_column(String, unique=True, index=True)
+    phone: Mapped[Optional[str]] = mapped_column(String)
+    assessment_result: Mapped[Optional[str]] = mapped_column(String)
+    recruiter_id: Mapped[Optional[str]] = mapped_column(String)
+    uploaded_at: Mapped[datetime] = mapped_column(DateTime, default=_utcnow)
+
+class AnalysisResultRecord(Base):
+    __tablename__ = "analysis_results"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    job_description_id: Mapped[int] = mapped_column(ForeignKey("job_descriptions.id"), index=True)
+    candidate_id: Mapped[int] = mapped_column(ForeignKey("candidates.id"), index=True)
+    user_id: Mapped[str] = mapped_column(String, index=True)
+    score: Mapped[float] = mapped_column(Float)
+    match_level: Mapped[str] = mapped_column(String)
+    details: Mapped[Optional[Dict[str, Any]]] = mapped_column(JSON)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=_utcnow)
+
+    candidate: Mapped[Optional[CandidateRecord]] = relationship(lazy="joined")
+
+    # Keyset pagination of the per-JD and per-user listings
+    __table_args__ = (
+        Index("analysis_results_jd_created_at_id_idx", "job_description_id", "created_at", "id"),
+        Index("analysis_results_user_created_at_id_idx", "user_id", "created_at", "id"),
+    )
+
+def _timestamp(value: Optional[datetime]) -> Optional[datetime]:
+    return value.replace(tzinfo=timezone.utc) if value is not None else None
+
+def _parse_timestamp(value: str) -> datetime:
+    parsed = datetime.fromisoformat(value)
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+def _jd_to_schema(record: JobDescriptionRecord, include_details: bool = True) -> schemas.JobDescription:
+    return schemas.JobDescription(
+        id=record.id,
+        job_id_str=record.job_id_str,
+        content_hash=record.content_hash,
+        job_title=record.job_title,
+        company_name=record.company_name,
+        location=record.location,
+        ctc=record.ctc,
+        status=record.status,
+        details=record.details if include_details else None,
+        created_at=_timestamp(record.created_at)
+    )
+
+def _candidate_to_schema(record: CandidateRecord) -> schemas.Candidate:
+    return schemas.Candidate(
+        id=record.id,
+        name=record.name,
+        email=record.email,
+        phone=record.phone,
+        assessment_result=record.assessment_result,
+        recruiter_id=record.recruiter_id,
+        uploaded_at=_timestamp(record.uploaded_at)
+    )
+
+def _analysis_to_schema(record: AnalysisResultRecord, include_details: bool = True) -> schemas.AnalysisResult:
+    return schemas.AnalysisResult(
+        id=record.id,
+        job_description_id=record.job_description_id,
+        candidate_id=record.candidate_id,
+        user_id=record.user_id,
+        score=record.score,
+        match_level=record.match_level,
+        details=record.details if include_details else None,
+        created_at=_timestamp(record.created_at),
+        candidate=_candidate_to_schema(record.candidate) if record.candidate else None
+    )
+
+class SQLRepository(Repository):
+    """
+    Job descriptions, candidates and analysis results in a local SQLAlchemy database
+    (SQLite or Postgres). Tables and indexes are created on first use. Listings use
+    the same (created_at, id) keyset order and cursors as the Supabase backend.
+    """
+
+    def __init__(self, database_url: str):
+        if database_url.startswith("sqlite"):
+            # In-memory databases exist per connection, so every thread has to share one
+            in_memory = database_url in ("sqlite://", "sqlite:///:memory:")
+            self.engine = create_engine(
+                database_url,
+                connect_args={"check_same_thread": False},
+                poolclass=StaticPool if in_memory else None
+            )
+            event.listen(self.engine, "connect", _configure_sqlite)
+        else:
+            self.engine = create_engine(database_url, pool_pre_ping=True)
+        Base.metadata.create_all(self.engine)
+        self._sessions = sessionmaker(self.engine, expire_on_commit=False)
+
+    def _page(self, session: Session, query, model, limit: int, skip: int, after: Optional[Tuple[str, int]],
+              include_total: bool, convert) -> Page:
+        total = session.scalar(select(func.count()).select_from(query.order_by(None).subquery())) if include_total else None
+        query = query.order_by(model.created_at.desc(), model.id.desc())
+        if after is None:
+            query = query.offset(skip)
+        else:
+            created_at, row_id = _parse_timestamp(after[0]), after[1]
+            query = query.where(or_(model.created_at < created_at, and_(model.created_at == created_at, model.id < row_id)))
+        records = session.scalars(query.limit(limit)).unique().all()
+        next_cursor = None
+        if len(records) == limit:
+            next_cursor = crud.encode_cursor(records[-1].created_at.isoformat(), records[-1].id)
+        return Page(items=[convert(record) for record in records], next_cursor=next_cursor, total=total)
+
+    def get_jd(self, jd_id):
+        try:
+            with self._sessions() as session:
+                record = session.get(JobDescriptionRecord, jd_id)
+                if record is not None:
+                    return _jd_to_schema(record)
+        except Exception as e:
+            logger.error(f"Error getting job description: {e}")
+        return None
+
+    def get_or_create_job_description(self, jd):
+        try:
+            with self._sessions.begin() as session:
+                if jd.jobId:
+                    record = session.scalars(select(JobDescriptionRecord).where(JobDescriptionRecord.job_id_str == jd.jobId)).first()
+                    if record is not None:
+                        return _jd_to_schema(record)
+
+                content_hash = jd.content_hash()
+                record = session.scalars(select(JobDescriptionRecord).where(JobDescriptionRecord.content_hash == content_hash)).first()
+                if record is not None:
+                    if not record.job_id_str and jd.jobId:
+                        record.job_id_str = jd.jobId
+                    return _jd_to_schema(record)
+
+                record = JobDescriptionRecord(**crud._jd_insert_row(jd, content_hash))
+                session.add(record)
+                session.flush()
+                return _jd_to_schema(record)
+        except Exception as e:
+            logger.error(f"Error getting or creating job description: {e}")
+        return None
+
+    def get_jds(self, skip=0, limit=100, after=None, include_details=False, include_total=False):
+        try:
+            with self._sessions() as session:
+                query = select(JobDescriptionRecord)
+                if not include_details:
+                    query = query.options(defer(JobDescriptionRecord.details))
+                return self._page(session, query, JobDescriptionRecord, limit, skip, after, include_total,
+                                  lambda record: _jd_to_schema(record, include_details))
+        except Exception as e:
+            logger.error(f"Error getting job descriptions: {e}")
+        return Page(items=[])
+
+    def _update_jd(self, jd_id: int, values: Dict[str, Any]) -> Optional[schemas.JobDescription]:
+        with self._sessions.begin() as session:
+            record = session.get(JobDescriptionRecord, jd_id)
+            if record is None:
+                return None
+            for key, value in values.items():
+                setattr(record, key, value)
+            session.flush()
+            return _jd_to_schema(record)
+
+    def update_jd(self, jd_id, jd_update):
+        try:
+            update_data = jd_update.dict(exclude_unset=True)
+            if update_data:
+                return self._update_jd(jd_id, update_data)
+        except Exception as e:
+            logger.error(f"Error updating job description: {e}")
+        return None
+
+    def update_jd_details(self, jd_id, jd_update):
+        try:
+            return self._update_jd(jd_id, crud._jd_details_row(jd_update.details))
+        except Exception as e:
+            logger.error(f"Error updating job description details: {e}")
+        return None
+
+    def _analyses(self, column, value, skip, limit, after, include_details, include_total) -> Page:
+        with self._sessions() as session:
+            query = select(AnalysisResultRecord).where(column == value)
+            if not include_details:
+                query = query.options(defer(AnalysisResultRecord.details))
+            return self._page(session, query, AnalysisResultRecord, limit, skip, after, include_total,
+                              lambda record: _analysis_to_schema(record, include_details))
+
+    def get_jd_results(self, jd_id, skip=0, limit=100, after=None, include_details=False, include_total=False):
+        try:
+            return self._analyses(AnalysisResultRecord.job_description_id, jd_id, skip, limit, after, include_details, include_total)
+        except Exception as e:
+            logger.error(f"Error getting JD results: {e}")
+        return Page(items=[])
+
+    def get_user_analyses(self, user_id, skip=0, limit=100, after=None, include_details=False, include_total=False):
+        try:
+            return self._analyses(AnalysisResultRecord.user_id, user_id, skip, limit, after, include_details, include_total)
+        except Exception as e:
+            logger.error(f"Error getting user analyses: {e}")
+        return Page(items=[])
+
+    def get_or_create_candidates(self, cvs, recruiter_id):
+        try:
+            rows = [crud._candidate_row(cv, recruiter_id) for cv in cvs]
+            # Later CVs with the same email win, as they would when saved one by one
+            rows_by_email = {row["email"]: row for row in rows if row["email"]}
+            with self._sessions.begin() as session:
+                records = {
+                    record.email: record
+                    for record in session.scalars(select(CandidateRecord).where(CandidateRecord.email.in_(list(rows_by_email))))
+                } if rows_by_email else {}
+                for email, row in rows_by_email.items():
+                    record = records.get(email)
+                    if record is None:
+                        records[email] = record = CandidateRecord(**row)
+                        session.add(record)
+                    else:
+                        for key, value in row.items():
+                            setattr(record, key, value)
+                # candidates.email is nullable, so CVs without one are stored as new candidates
+                without_email = [CandidateRecord(**row) for row in rows if not row["email"]]
+                session.add_all(without_email)
+                session.flush()
+                candidates = {email: _candidate_to_schema(record) for email, record in records.items()}
+                inserted = iter([_candidate_to_schema(record) for record in without_email])
+            return [candidates.get(row["email"]) if row["email"] else next(inserted) for row in rows]
+        except Exception as e:
+            logger.error(f"Error getting or creating candidates: {e}")
+        return [None] * len(cvs)
+
+    def create_analysis_results(self, jd_db_id, user_id, results):
+        if not results:
+            return []
+        try:
+            with self._sessions.begin() as session:
+                records = [
+                    AnalysisResultRecord(**crud._analysis_result_row(jd_db_id, candidate_db_id, user_id, result))
+                    for candidate_db_id, result in results
+                ]
+                session.add_all(records)
+                session.flush()
+                return [_analysis_to_schema(record) for record in records]
+        except Exception as e:
+            logger.error(f"Error creating analysis results: {e}")
+        return []
+
+def _configure_sqlite(dbapi_connection, connection_record):
+    # WAL lets readers proceed while the write-behind queue writes; foreign keys are off by default in SQLite
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA foreign_keys=ON")
+    cursor.close()
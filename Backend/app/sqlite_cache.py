@@ -0,0 +1,153 @@
+import os
+import time
+import sqlite3
+import logging
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from . import metrics
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# SQLite limits the number of bound parameters per statement
+_SQLITE_BATCH_SIZE = 500
+
+class SQLiteCache:
+    """
+    Keyed cache of blobs in SQLite. Every worker process opening the same file shares it;
+    SQLite handles the locking between them. Least recently used entries are evicted once
+    the cache holds more than ``max_entries`` entries or ``max_bytes`` bytes, and entries
+    older than ``ttl_seconds`` are misses (None disables a bound). Failures to read or write
+    the cache are logged and treated as misses. Hits, misses and evictions are counted
+    under the cache's ``name``. Subclasses store other values by overriding
+    ``encode_value`` and ``decode_value``.
+    """
+
+    def __init__(self, name: str, path: str = ":memory:", max_entries: Optional[int] = None,
+                 max_bytes: Optional[int] = None, ttl_seconds: Optional[float] = None):
+        directory = os.path.dirname(path) if path != ":memory:" else ""
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.name = name
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        if path != ":memory:":
+            self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS cache_entries (
+                key TEXT PRIMARY KEY,
+                value BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS cache_entries_accessed_at ON cache_entries (accessed_at)")
+        self._conn.commit()
+
+    def encode_value(self, value: Any) -> bytes:
+        return value
+
+    def decode_value(self, value: bytes) -> Any:
+        return value
+
+    def get(self, key: str) -> Optional[Any]:
+        return self.get_many([key]).get(key)
+
+    def get_many(self, keys: List[str]) -> Dict[str, Any]:
+        now = time.time()
+        found: Dict[str, bytes] = {}
+        try:
+            with self._lock:
+                expired = []
+                for start in range(0, len(keys), _SQLITE_BATCH_SIZE):
+                    chunk = keys[start:start + _SQLITE_BATCH_SIZE]
+                    placeholders = ",".join("?" * len(chunk))
+                    rows = self._conn.execute(
+                        f"SELECT key, value, created_at FROM cache_entries WHERE key IN ({placeholders})", chunk
+                    ).fetchall()
+                    for key, value, created_at in rows:
+                        if self.ttl_seconds is not None and created_at < now - self.ttl_seconds:
+                            expired.append((key,))
+                        else:
+                            found[key] = value
+                if expired or found:
+                    self._conn.executemany("DELETE FROM cache_entries WHERE key = ?", expired)
+                    self._conn.executemany("UPDATE cache_entries SET accessed_at = ? WHERE key = ?", [(now, key) for key in found])
+                    self._conn.commit()
+        except sqlite3.Error as e:
+            logger.warning(f"{self.name} read failed, treating it as a miss: {e}")
+            found = {}
+
+        misses = len(set(keys)) - len(found)
+        if found:
+            metrics.increment(f"{self.name}.hits", len(found))
+        if misses:
+            metrics.increment(f"{self.name}.misses", misses)
+        # Decoded per lookup, so callers are free to mutate what they get
+        return {key: self.decode_value(value) for key, value in found.items()}
+
+    def put(self, key: str, value: Any) -> None:
+        self.put_many([(key, value)])
+
+    def put_many(self, items: Iterable[Tuple[str, Any]]) -> None:
+        now = time.time()
+        rows = []
+        for key, value in items:
+            data = self.encode_value(value)
+            # An entry larger than the whole cache would only evict everything else
+            if self.max_bytes is None or len(data) <= self.max_bytes:
+                rows.append((key, data, len(data), now, now))
+        if not rows:
+            return
+        try:
+            with self._lock:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO cache_entries (key, value, size, created_at, accessed_at) VALUES (?, ?, ?, ?, ?)",
+                    rows
+                )
+                self._evict(now)
+                self._conn.commit()
+        except sqlite3.Error as e:
+            logger.warning(f"{self.name} write failed: {e}")
+
+    def _evict(self, now: float) -> None:
+        evicted = 0
+        if self.ttl_seconds is not None:
+            evicted += self._conn.execute("DELETE FROM cache_entries WHERE created_at < ?", (now - self.ttl_seconds,)).rowcount
+        if self.max_entries is not None:
+            evicted += self._conn.execute(
+                "DELETE FROM cache_entries WHERE key IN "
+                "(SELECT key FROM cache_entries ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,)
+            ).rowcount
+        if self.max_bytes is not None:
+            excess = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM cache_entries").fetchone()[0] - self.max_bytes
+            if excess > 0:
+                oldest = []
+                for key, size in self._conn.execute("SELECT key, size FROM cache_entries ORDER BY accessed_at"):
+                    oldest.append((key,))
+                    excess -= size
+                    if excess <= 0:
+                        break
+                self._conn.executemany("DELETE FROM cache_entries WHERE key = ?", oldest)
+                evicted += len(oldest)
+        if evicted:
+            metrics.increment(f"{self.name}.evictions", evicted)
+
+def open_sqlite_cache(cache_class, path: str, memory_fallback: bool = True) -> Optional[SQLiteCache]:
+    """
+    Opens ``cache_class`` on the on-disk file at ``path``. When the path is empty (cache disabled)
+    or the file cannot be opened, falls back to an in-memory cache, or to None without ``memory_fallback``.
+    """
+    if path:
+        try:
+            return cache_class(path)
+        except (sqlite3.Error, OSError) as e:
+            logger.warning(f"Could not open cache at {path}, using in-memory cache only: {e}")
+    return cache_class(":memory:") if memory_fallback else None
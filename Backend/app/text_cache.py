@@ -0,0 +1,86 @@
+import os
+import hashlib
+import threading
+from typing import BinaryIO, Optional, Tuple, Union
+
+from dotenv import load_dotenv
+
+from .parsing import detect_document_type, extract_text
+from .sqlite_cache import SQLiteCache, open_sqlite_cache
+
+load_dotenv()
+
+# On-disk cache of extracted document text; an empty string keeps it in memory only
+TEXT_CACHE_PATH = os.getenv("TEXT_CACHE_PATH", os.path.join(".cache", "text.sqlite3"))
+# Least recently used texts are evicted once the cached texts take more than this many MB
+TEXT_CACHE_MAX_MB = int(os.getenv("TEXT_CACHE_MAX_MB", 256))
+
+# Part of every key; bump it when a change to parsing.extract_text changes its output
+_EXTRACTION_VERSION = "1"
+_HASH_CHUNK_SIZE = 1024 * 1024
+
+Document = Union[bytes, bytearray, memoryview, BinaryIO]
+
+def document_key(source: Document, filename: Optional[str] = None, content_type: Optional[str] = None,
+                 max_chars: Optional[int] = None) -> Optional[str]:
+    """
+    SHA256 of a document's bytes and detected type, or None when the type is unsupported.
+    The type is part of the key because the same bytes are only read as text when named or typed
+    as text, and the character budget because it changes how much text is extracted.
+    """
+    digest = hashlib.sha256()
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        head = bytes(source[:8])
+        digest.update(source)
+    else:
+        source.seek(0)
+        head = source.read(8)
+        source.seek(0)
+        for chunk in iter(lambda: source.read(_HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+        source.seek(0)
+    doc_type = detect_document_type(head, filename, content_type)
+    if doc_type is None:
+        return None
+    return f"{_EXTRACTION_VERSION}:{doc_type}:{max_chars or 0}:{digest.hexdigest()}"
+
+class TextCache(SQLiteCache):
+    """Extracted document text, bounded by the total size of the texts."""
+
+    def __init__(self, path: str = ":memory:", max_bytes: int = TEXT_CACHE_MAX_MB * 1024 * 1024):
+        super().__init__("text_cache", path, max_bytes=max_bytes)
+
+    def encode_value(self, value: str) -> bytes:
+        return value.encode("utf-8")
+
+    def decode_value(self, value: bytes) -> str:
+        return value.decode("utf-8")
+
+def open_text_cache(path: str = TEXT_CACHE_PATH) -> TextCache:
+    return open_sqlite_cache(TextCache, path)
+
+_text_cache: Optional[TextCache] = None
+_text_cache_lock = threading.Lock()
+
+def get_text_cache() -> TextCache:
+    global _text_cache
+    if _text_cache is None:
+        with _text_cache_lock:
+            if _text_cache is None:
+                _text_cache = open_text_cache()
+    return _text_cache
+
+def lookup(source: Document, filename: Optional[str] = None, content_type: Optional[str] = None,
+           max_chars: Optional[int] = None) -> Tuple[Optional[str], Optional[str]]:
+    """Returns the document's cache key and its cached text, if any; the key is None for unsupported types."""
+    key = document_key(source, filename, content_type, max_chars)
+    return key, get_text_cache().get(key) if key else None
+
+def extract_text_cached(source: Document, filename: Optional[str] = None, content_type: Optional[str] = None) -> Optional[str]:
+    """parsing.extract_text through the cache, for documents read in the calling process."""
+    key, text = lookup(source, filename, content_type)
+    if text is None:
+        text = extract_text(source, filename, content_type)
+        if key and text:
+            get_text_cache().put(key, text)
+    return text
@@ -0,0 +1,84 @@
+import os
+import time
+import threading
+from typing import Dict, List, Optional
+
+from dotenv import load_dotenv
+
+from . import metrics, schemas
+
+load_dotenv()
+
+# How long a loaded directory is served before the next listing reloads it from Supabase Auth
+USER_DIRECTORY_TTL_SECONDS = float(os.getenv("USER_DIRECTORY_TTL_SECONDS", 300))
+# Users fetched per Supabase Auth admin API page while loading the directory
+USER_DIRECTORY_PAGE_SIZE = int(os.getenv("USER_DIRECTORY_PAGE_SIZE", 1000))
+
+class UserDirectory:
+    """
+    In-memory copy of the Supabase Auth users, indexed by id, username and email.
+    Listings are slices of prebuilt lists, so a page costs O(page) instead of a
+    full user listing. ``invalidate`` marks the copy stale; a load that started
+    before the invalidation is discarded so it cannot resurrect deleted users.
+    """
+
+    def __init__(self, ttl_seconds: float = USER_DIRECTORY_TTL_SECONDS):
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._generation = 0
+        self._loaded_at: Optional[float] = None
+        self._users: List[schemas.User] = []
+        self._by_id: Dict[str, schemas.User] = {}
+        self._by_email: Dict[str, schemas.User] = {}
+        self._by_username: Dict[str, List[schemas.User]] = {}
+
+    @property
+    def generation(self) -> int:
+        return self._generation
+
+    def is_fresh(self) -> bool:
+        loaded_at = self._loaded_at
+        return loaded_at is not None and time.monotonic() - loaded_at < self.ttl_seconds
+
+    def load(self, users: List[schemas.User], generation: int) -> bool:
+        """Replaces the directory with ``users`` unless it was invalidated after ``generation`` was read."""
+        by_username: Dict[str, List[schemas.User]] = {}
+        for user in users:
+            by_username.setdefault(user.username, []).append(user)
+        with self._lock:
+            if generation != self._generation:
+                return False
+            self._users = list(users)
+            self._by_id = {user.id: user for user in users}
+            self._by_email = {user.email.lower(): user for user in users if user.email}
+            self._by_username = by_username
+            self._loaded_at = time.monotonic()
+        metrics.increment("user_directory.loads")
+        return True
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._loaded_at = None
+
+    def list(self, skip: int = 0, limit: int = 100, username: Optional[str] = None) -> List[schemas.User]:
+        users = self._by_username.get(username, []) if username else self._users
+        return users[skip : skip + limit]
+
+    def get(self, user_id: str) -> Optional[schemas.User]:
+        return self._by_id.get(user_id)
+
+    def get_by_email(self, email: str) -> Optional[schemas.User]:
+        return self._by_email.get(email.lower())
+
+    def __len__(self) -> int:
+        return len(self._users)
+
+_user_directory: Optional[UserDirectory] = None
+
+def get_user_directory() -> UserDirectory:
+    global _user_directory
+    if _user_directory is None:
+        _user_directory = UserDirectory()
+        metrics.register_collector("user_directory", lambda: {"users": len(_user_directory), "fresh": _user_directory.is_fresh()})
+    return _user_directory
@@ -1,8 +1,48 @@
 import pytest
 from unittest.mock import Mock, patch
 from app.main import app
+from app import jd_index, llm, persistence, text_cache, user_directory
+from app.llm_cache import LLMResultCache
 from fastapi.testclient import TestClient
 
+@pytest.fixture(autouse=True)
+def llm_cache(monkeypatch):
+    """Give every test an empty in-memory LLM result cache"""
+    cache = LLMResultCache(":memory:")
+    monkeypatch.setattr(llm, "_llm_cache", cache)
+    return cache
+
+@pytest.fixture(autouse=True)
+def texts(monkeypatch):
+    """Give every test an empty in-memory text cache"""
+    cache = text_cache.TextCache(":memory:")
+    monkeypatch.setattr(text_cache, "_text_cache", cache)
+    return cache
+
+@pytest.fixture(autouse=True)
+def persistence_queue(monkeypatch):
+    """Give every test its own write-behind queue that flushes immediately and does not retry"""
+    queue = persistence.WriteBehindQueue(
+        "persistence", persistence.write_analysis_results, flush_interval=0, max_retries=0
+    )
+    monkeypatch.setattr(persistence, "_persistence_queue", queue)
+    yield queue
+    queue.close(timeout=5)
+
+@pytest.fixture(autouse=True)
+def users(monkeypatch):
+    """Give every test an empty user directory"""
+    directory = user_directory.UserDirectory()
+    monkeypatch.setattr(user_directory, "_user_directory", directory)
+    return directory
+
+@pytest.fixture(autouse=True)
+def jds(monkeypatch):
+    """Give every test an empty JD index"""
+    index = jd_index.JDIndex()
+    monkeypatch.setattr(jd_index, "_jd_index", index)
+    return index
+
 # Mock Supabase client for testing
 @pytest.fixture
 def mock_supabase():
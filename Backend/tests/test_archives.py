@@ -0,0 +1,67 @@
+import io
+import tarfile
+import zipfile
+import pytest
+from app.archives import ArchiveError, ArchiveTooLarge, read_resume_archive
+
+ALLOWED = ["application/pdf", "application/vnd.openxmlformats-officedocument.wordprocessingml.document", "text/plain"]
+
+def _zip(entries):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+        for name, data in entries.items():
+            archive.writestr(name, data)
+    buffer.seek(0)
+    return buffer
+
+def _tar_gz(entries):
+    buffer = io.BytesIO()
+    with tarfile.open(fileobj=buffer, mode="w:gz") as archive:
+        for name, data in entries.items():
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            archive.addfile(info, io.BytesIO(data))
+    buffer.seek(0)
+    return buffer
+
+@pytest.mark.parametrize("build", [_zip, _tar_gz])
+def test_read_resume_archive(build):
+    """Test that resumes are read from ZIP and compressed tar archives, skipping OS metadata."""
+    archive = build({
+        "drop/first.txt": b"first",
+        "drop/second.pdf": b"%PDF-second",
+        "__MACOSX/drop/._first.txt": b"metadata",
+        "drop/.DS_Store": b"metadata",
+    })
+    assert read_resume_archive(archive, ALLOWED, max_file_size=100).files == [
+        ("first.txt", b"first", "text/plain"), ("second.pdf", b"%PDF-second", "application/pdf")
+    ]
+
+def test_read_resume_archive_skips_entries_failing_checks():
+    """Test that entries failing the checks of individual uploads are reported without failing the archive."""
+    archive = read_resume_archive(_zip({
+        "drop/resume.docx": b"PK docx",
+        "drop/photo.png": b"png",
+        "drop/big.txt": b"x" * 101,
+        "drop/notes": b"no extension",
+    }), ALLOWED, max_file_size=100)
+
+    assert [(filename, content_type) for filename, data, content_type in archive.files] == [
+        ("resume.docx", "application/vnd.openxmlformats-officedocument.wordprocessingml.document")
+    ]
+    assert [entry["filename"] for entry in archive.skipped] == ["drop/photo.png", "drop/big.txt", "drop/notes"]
+    assert "size limit" in archive.skipped[1]["detail"]
+
+def test_read_resume_archive_checks_archive_limits():
+    """Test that limits on the archive as a whole reject it."""
+    with pytest.raises(ArchiveTooLarge):
+        read_resume_archive(_tar_gz({"a.txt": b"x" * 60, "b.txt": b"x" * 60}), ALLOWED, max_file_size=100, max_total_size=100)
+    with pytest.raises(ArchiveError, match="more than 2"):
+        read_resume_archive(_zip({f"{i}.txt": b"x" for i in range(3)}), ALLOWED, max_file_size=100, max_entries=2)
+
+def test_read_resume_archive_rejects_other_uploads():
+    """Test that empty archives and files that are not archives are rejected."""
+    with pytest.raises(ArchiveError, match="does not contain"):
+        read_resume_archive(_zip({"__MACOSX/._a.txt": b"x"}), ALLOWED, max_file_size=100)
+    with pytest.raises(ArchiveError, match="Could not read"):
+        read_resume_archive(io.BytesIO(b"%PDF-1.7 not an archive"), ALLOWED, max_file_size=100)
@@ -4,6 +4,7 @@ Script to test admin user authentication in Supabase
 """
 
 import os
+import pytest
 from app.database import get_supabase
 
 def test_admin_auth():
@@ -35,6 +36,135 @@ def test_admin_auth():
         print(f"Error during authentication: {e}")
         return False
 
+SECRET = "test-jwt-secret"
+
+def _token(exp_in=3600, secret=SECRET, algorithm="HS256", headers=None, **claims):
+    import time
+    from jose import jwt
+    payload = {
+        "sub": "user-1",
+        "email": "ann@example.com",
+        "aud": "authenticated",
+        "role": "authenticated",
+        "exp": int(time.time()) + exp_in,
+        "user_metadata": {"username": "ann", "role": "admin"},
+        **claims
+    }
+    return jwt.encode(payload, secret, algorithm=algorithm, headers=headers)
+
+def _request(token):
+    from unittest.mock import Mock
+    return Mock(headers={"Authorization": f"Bearer {token}"})
+
+@pytest.fixture
+def token_cache(monkeypatch):
+    from app import auth
+    cache = auth.TokenCache(max_entries=2)
+    monkeypatch.setattr(auth, "_token_cache", cache)
+    monkeypatch.setattr(auth, "SUPABASE_JWT_SECRET", SECRET)
+    monkeypatch.setattr(auth, "_jwks_cache", None)
+    return cache
+
+def test_token_verified_locally(token_cache):
+    """Test that a token signed with the project secret is accepted without calling Supabase Auth"""
+    from unittest.mock import Mock
+    from app import auth
+    supabase = Mock()
+    user = auth.get_current_user(_request(_token()), supabase)
+
+    assert (user.id, user.username, user.role) == ("user-1", "ann", "admin")
+    supabase.auth.get_user.assert_not_called()
+
+def test_expired_token_rejected_locally(token_cache):
+    """Test that an expired token is rejected without calling Supabase Auth"""
+    from unittest.mock import Mock
+    from fastapi import HTTPException
+    from app import auth
+    supabase = Mock()
+    with pytest.raises(HTTPException) as exc_info:
+        auth.get_current_user(_request(_token(exp_in=-10)), supabase)
+    assert exc_info.value.status_code == 401
+    supabase.auth.get_user.assert_not_called()
+
+def test_unverifiable_token_checked_remotely_once(token_cache):
+    """Test that tokens the secret cannot verify fall back to Supabase Auth and are then cached"""
+    from types import SimpleNamespace
+    from unittest.mock import Mock
+    from app import auth
+    supabase = Mock()
+    supabase.auth.get_user.return_value = SimpleNamespace(user=SimpleNamespace(
+        id="user-1", email="ann@example.com", user_metadata={"username": "ann"}
+    ))
+    token = _token(secret="rotated-secret")
+
+    first = auth.get_current_user(_request(token), supabase)
+    second = auth.get_current_user(_request(token), supabase)
+
+    assert first == second
+    assert first.role == "recruiter"
+    supabase.auth.get_user.assert_called_once_with(token)
+
+def test_project_key_is_not_accepted_as_user_token(token_cache):
+    """Test that anon-style tokens signed with the project secret but without a user are rejected with 401"""
+    import time
+    from unittest.mock import Mock
+    from fastapi import HTTPException
+    from jose import jwt
+    from app import auth
+    supabase = Mock()
+    supabase.auth.get_user.side_effect = Exception("invalid JWT")
+    anon_key = jwt.encode({"iss": "supabase", "role": "anon", "exp": int(time.time()) + 3600}, SECRET, algorithm="HS256")
+
+    assert auth.verify_token_locally(anon_key) is None
+    assert auth.verify_token_locally(_token(role="service_role")) is None
+    with pytest.raises(HTTPException) as exc_info:
+        auth.get_current_user(_request(anon_key), supabase)
+    assert exc_info.value.status_code == 401
+
+def test_token_cache_is_bounded_and_expires():
+    """Test that the token cache evicts the least recently used entry and drops expired ones"""
+    import time
+    from app import auth, schemas
+    cache = auth.TokenCache(max_entries=2)
+    user = schemas.User(id="1", username="ann", email="ann@example.com", role="recruiter", is_active=True)
+    cache.put("a", user, time.time() + 60)
+    cache.put("b", user, time.time() + 60)
+    cache.get("a")
+    cache.put("c", user, time.time() + 60)
+    cache.put("d", user, time.time() - 1)
+
+    assert cache.get("a") == user
+    assert cache.get("b") is None
+    assert cache.get("d") is None
+
+def test_token_verified_with_jwks(token_cache, monkeypatch):
+    """Test that asymmetrically signed tokens are verified with the cached project JWKS"""
+    from unittest.mock import Mock, patch
+    from cryptography.hazmat.primitives import serialization
+    from cryptography.hazmat.primitives.asymmetric import rsa
+    from jose import jwk
+    from app import auth
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    private_pem = private_key.private_bytes(
+        serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+    ).decode()
+    public_pem = private_key.public_key().public_bytes(
+        serialization.Encoding.PEM, serialization.PublicFormat.SubjectPublicKeyInfo
+    ).decode()
+    public_jwk = dict(jwk.construct(public_pem, "RS256").to_dict(), kid="key-1")
+    monkeypatch.setattr(auth, "_jwks_cache", auth.JWKSCache("https://example.supabase.co/auth/v1/.well-known/jwks.json"))
+    jwks_response = Mock(json=Mock(return_value={"keys": [public_jwk]}))
+
+    with patch.object(auth.httpx, "get", return_value=jwks_response) as get:
+        supabase = Mock()
+        user = auth.get_current_user(_request(_token(secret=private_pem, algorithm="RS256", headers={"kid": "key-1"})), supabase)
+        auth.get_current_user(_request(_token(secret=private_pem, algorithm="RS256", headers={"kid": "key-1"}, sub="user-2")), supabase)
+
+    assert user.id == "user-1"
+    get.assert_called_once()
+    supabase.auth.get_user.assert_not_called()
+
+
 if __name__ == "__main__":
     success = test_admin_auth()
     if success:
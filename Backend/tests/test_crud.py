@@ -2,49 +2,6 @@ import pytest
 from unittest.mock import Mock
 from app import crud, schemas
 
-def test_create_jd_content_hash():
-    """Test that the content hash function works correctly"""
-    # Create a simple JD model for testing
-    jd_data = {
-        "jobId": "test-123",
-        "jobTitle": "Test Job",
-        "companyProfile": {
-            "companyName": "Test Company"
-        },
-        "location": {
-            "city": "Test City",
-            "state": "Test State",
-            "country": "Test Country",
-            "remoteStatus": "Remote"
-        },
-        "datePosted": "2023-01-01",
-        "employmentType": "Full-time",
-        "jobSummary": "This is a test job",
-        "keyResponsibilities": ["Responsibility 1", "Responsibility 2"],
-        "qualifications": {
-            "required": ["Requirement 1"],
-            "preferred": ["Preference 1"]
-        },
-        "requiredSkills": ["Skill 1", "Skill 2"],
-        "educationRequired": ["Bachelor's Degree"],
-        "compensationAndBenefits": {
-            "salaryRange": "$50,000 - $70,000",
-            "benefits": ["Health Insurance"]
-        },
-        "applicationInfo": {
-            "howToApply": "Apply online",
-            "applyLink": "https://test.com/apply"
-        },
-        "extractedKeywords": ["keyword1", "keyword2"],
-    }
-    
-    jd_model = schemas.JDModel(**jd_data)
-    content_hash = crud._create_jd_content_hash(jd_model)
-    
-    # Verify that we get a hash back
-    assert isinstance(content_hash, str)
-    assert len(content_hash) == 64  # SHA256 hashes are 64 characters long
-
 def test_ensure_complete_skill_presence():
     """Test that skill presence is properly ensured"""
     skill_presence = {"Python": True, "Java": False}
@@ -67,4 +24,134 @@ def test_ensure_complete_skill_presence():
     
     # Verify that missing skills are set to False
     assert result["JavaScript"] == False
-    assert result["C++"] == False
\ No newline at end of file
+    assert result["C++"] == False
+def _cv(email, first_name="John"):
+    from tests.test_llm import MOCK_RESUME_JSON
+    personal_data = dict(MOCK_RESUME_JSON["Personal Data"], email=email, firstName=first_name, lastName="Doe", phone=None)
+    return schemas.CVModel.parse_obj(dict(MOCK_RESUME_JSON, **{"Personal Data": personal_data}))
+
+def _candidate_row(id, email, name="John Doe"):
+    return {"id": id, "name": name, "email": email, "phone": None, "recruiter_id": "recruiter-1", "assessment_result": None}
+
+def test_get_or_create_candidates():
+    """Test that candidates are resolved with one select and one upsert, plus one insert for CVs without an email"""
+    supabase = Mock()
+    table = supabase.table.return_value
+    # unchanged@example.com is up to date, changed@example.com has a new name, new@example.com does not exist yet
+    table.select.return_value.in_.return_value.execute.return_value = Mock(data=[
+        _candidate_row(1, "unchanged@example.com"),
+        _candidate_row(2, "changed@example.com", name="Old Name"),
+    ])
+    table.upsert.return_value.execute.return_value = Mock(data=[
+        _candidate_row(2, "changed@example.com"),
+        _candidate_row(3, "new@example.com"),
+    ])
+    table.insert.return_value.execute.return_value = Mock(data=[_candidate_row(4, None), _candidate_row(5, None)])
+
+    cvs = [_cv("new@example.com"), _cv(None), _cv("unchanged@example.com"), _cv(None), _cv("changed@example.com")]
+    candidates = crud.get_or_create_candidates(supabase, cvs, recruiter_id="recruiter-1")
+
+    assert [c.id for c in candidates] == [3, 4, 1, 5, 2]
+    table.select.return_value.in_.assert_called_once_with("email", ["new@example.com", "unchanged@example.com", "changed@example.com"])
+    upserted, = table.upsert.call_args.args
+    assert [row["email"] for row in upserted] == ["new@example.com", "changed@example.com"]
+    assert table.upsert.call_args.kwargs == {"on_conflict": "email"}
+    # CVs without an email skip the lookup and are inserted together
+    inserted, = table.insert.call_args.args
+    assert [row["email"] for row in inserted] == [None, None]
+
+def test_get_or_create_candidates_error():
+    """Test that a failing bulk write returns no candidates instead of raising"""
+    supabase = Mock()
+    supabase.table.return_value.select.side_effect = Exception("connection refused")
+    assert crud.get_or_create_candidates(supabase, [_cv("a@example.com")], recruiter_id="recruiter-1") == [None]
+
+def test_create_analysis_results():
+    """Test that all analysis rows are inserted in one call"""
+    supabase = Mock()
+    supabase.table.return_value.insert.return_value.execute.return_value = Mock(data=[
+        {"id": 10, "job_description_id": 5, "candidate_id": 1, "user_id": "recruiter-1", "score": 80.0, "match_level": "Good Match", "details": {}},
+        {"id": 11, "job_description_id": 5, "candidate_id": 2, "user_id": "recruiter-1", "score": 60.0, "match_level": "Fair Match", "details": {}},
+    ])
+    result = {"match_score": 80.0, "match_level": "Good Match", "match_details": {}}
+
+    created = crud.create_analysis_results(supabase, jd_db_id=5, user_id="recruiter-1", results=[(1, result), (2, result)])
+
+    assert [r.id for r in created] == [10, 11]
+    rows, = supabase.table.return_value.insert.call_args.args
+    assert [row["candidate_id"] for row in rows] == [1, 2]
+    assert crud.create_analysis_results(supabase, jd_db_id=5, user_id="recruiter-1", results=[]) == []
+
+def test_aget_or_create_candidates():
+    """Test that the async bulk variant awaits the same select and upsert"""
+    import asyncio
+    from unittest.mock import AsyncMock
+    supabase = Mock()
+    table = supabase.table.return_value
+    table.select.return_value.in_.return_value.execute = AsyncMock(return_value=Mock(data=[_candidate_row(1, "unchanged@example.com")]))
+    table.upsert.return_value.execute = AsyncMock(return_value=Mock(data=[_candidate_row(2, "new@example.com")]))
+
+    candidates = asyncio.run(crud.aget_or_create_candidates(
+        supabase, [_cv("new@example.com"), _cv("unchanged@example.com")], recruiter_id="recruiter-1"
+    ))
+
+    assert [c.id for c in candidates] == [2, 1]
+    upserted, = table.upsert.call_args.args
+    assert [row["email"] for row in upserted] == ["new@example.com"]
+
+def test_aget_jd_results_error():
+    """Test that the async variants log failures and return the same fallback as the sync ones"""
+    import asyncio
+    supabase = Mock()
+    supabase.table.return_value.select.side_effect = Exception("connection refused")
+    assert asyncio.run(crud.aget_jd_results(supabase, jd_id=1)) == crud.Page(items=[])
+
+def _builder(data, count=None):
+    """Query builder mock whose filter and modifier methods return the builder itself"""
+    query = Mock()
+    for method in ("select", "eq", "order", "range", "limit", "or_"):
+        getattr(query, method).return_value = query
+    query.execute.return_value = Mock(data=data, count=count)
+    supabase = Mock()
+    supabase.table.return_value = query
+    return supabase, query
+
+def test_get_jds_keyset_pagination():
+    """Test that list pages skip details, continue after the cursor and hand out the next one"""
+    rows = [
+        {"id": 9, "job_id_str": "JD-9", "content_hash": "a", "job_title": "A", "created_at": "2024-05-02T00:00:00+00:00"},
+        {"id": 8, "job_id_str": "JD-8", "content_hash": "b", "job_title": "B", "created_at": "2024-05-01T00:00:00+00:00"},
+    ]
+    supabase, query = _builder(rows)
+
+    page = crud.get_jds(supabase, limit=2, after=("2024-05-03T00:00:00+00:00", 10))
+
+    assert [jd.id for jd in page.items] == [9, 8]
+    assert page.items[0].details is None
+    assert "details" not in query.select.call_args.args[0]
+    query.or_.assert_called_once_with('created_at.lt."2024-05-03T00:00:00+00:00",and(created_at.eq."2024-05-03T00:00:00+00:00",id.lt.10)')
+    query.limit.assert_called_once_with(2)
+    query.range.assert_not_called()
+    assert crud.decode_cursor(page.next_cursor) == ("2024-05-01T00:00:00+00:00", 8)
+
+    supabase, query = _builder(rows[:1], count=1)
+    page = crud.get_jds(supabase, skip=5, limit=2, include_details=True, include_total=True)
+    query.range.assert_called_once_with(5, 6)
+    assert "details" in query.select.call_args.args[0]
+    assert query.select.call_args.kwargs == {"count": "exact"}
+    assert page.next_cursor is None
+    assert page.total == 1
+
+def test_decode_cursor_rejects_malformed_cursors():
+    """Test that cursors round-trip and that tampered ones raise ValueError"""
+    assert crud.decode_cursor(crud.encode_cursor("2024-05-01T00:00:00+00:00", 3)) == ("2024-05-01T00:00:00+00:00", 3)
+    # Timestamps are re-serialized rather than passed through
+    assert crud.decode_cursor(crud.encode_cursor("2024-05-01T00:00:00Z", 3)) == ("2024-05-01T00:00:00+00:00", 3)
+    tampered = [
+        crud.encode_cursor('2024-05-01",id.gt.0,created_at.lt."2100-01-01', 3),
+        crud.encode_cursor("2024-05-01T00:00:00+00:00", "3),or(id.gt.0"),
+        crud.encode_cursor("2024-05-01T00:00:00+00:00", True),
+    ]
+    for cursor in ["not-a-cursor", crud.encode_cursor("2024-05-01", 3)[:-4], "WzEsIDJd"] + tampered:
+        with pytest.raises(ValueError):
+            crud.decode_cursor(cursor)
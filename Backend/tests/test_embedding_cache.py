@@ -0,0 +1,76 @@
+import numpy as np
+import pytest
+from app.embedding_cache import CachedEncoder, EmbeddingStore, embedding_key, normalize_text
+
+class FakeModel:
+    """Deterministic stand-in for a SentenceTransformer that records encode calls."""
+    def __init__(self):
+        self.calls = []
+
+    def encode(self, sentences, convert_to_tensor=False, **kwargs):
+        self.calls.append(list(sentences))
+        return np.array([[len(s), s.count(" "), 1.0] for s in sentences], dtype=np.float32)
+
+def test_normalize_text():
+    """Test that whitespace differences normalize to the same text."""
+    assert normalize_text("  Bachelor's in\n Computer   Science ") == "Bachelor's in Computer Science"
+
+def test_embedding_key_depends_on_model_name():
+    """Test that the cache key is scoped to the model name."""
+    assert embedding_key("model-a", "text") != embedding_key("model-b", "text")
+    assert len(embedding_key("model-a", "text")) == 64
+
+def test_cached_encoder_only_encodes_misses():
+    """Test that repeated texts are served from the cache."""
+    model = FakeModel()
+    encoder = CachedEncoder(model, "fake-model")
+
+    first = encoder.encode(["Software Engineer", "Data Scientist"])
+    second = encoder.encode(["Data Scientist", "Product Manager", "Software  Engineer"])
+
+    assert model.calls == [["Software Engineer", "Data Scientist"], ["Product Manager"]]
+    assert second.shape == (3, 3)
+    assert np.array_equal(second[0], first[1])
+    assert np.array_equal(second[2], first[0])
+    assert encoder.hits == 2
+    assert encoder.misses == 3
+
+def test_cached_encoder_single_string():
+    """Test that a single string returns a 1-D embedding like the model does."""
+    encoder = CachedEncoder(FakeModel(), "fake-model")
+    embedding = encoder.encode("Software Engineer")
+    assert embedding.shape == (3,)
+
+def test_cached_encoder_evicts_least_recently_used():
+    """Test that the in-process cache is bounded."""
+    model = FakeModel()
+    encoder = CachedEncoder(model, "fake-model", max_size=2)
+
+    encoder.encode(["a", "b", "c"])
+    encoder.encode(["a"])
+
+    assert model.calls == [["a", "b", "c"], ["a"]]
+
+def test_embedding_store_survives_restart(tmp_path):
+    """Test that embeddings written by one encoder are reused by a fresh one."""
+    path = str(tmp_path / "embeddings.sqlite3")
+    first_model = FakeModel()
+    CachedEncoder(first_model, "fake-model", store=EmbeddingStore(path)).encode(["Software Engineer"])
+
+    second_model = FakeModel()
+    encoder = CachedEncoder(second_model, "fake-model", store=EmbeddingStore(path))
+    embedding = encoder.encode("Software Engineer")
+
+    assert second_model.calls == []
+    assert embedding == pytest.approx([17.0, 1.0, 1.0])
+
+def test_embedding_store_is_bounded(tmp_path):
+    """Test that the on-disk store evicts the least recently used embeddings beyond its row cap."""
+    store = EmbeddingStore(str(tmp_path / "embeddings.sqlite3"), max_entries=2)
+    encoder = CachedEncoder(FakeModel(), "fake-model", store=store, max_size=0)
+    encoder.encode(["a", "b"])
+    encoder.encode(["a"])
+    encoder.encode(["c"])
+
+    keys = [embedding_key("fake-model", text) for text in ("a", "b", "c")]
+    assert sorted(store.get_many(keys)) == sorted([keys[0], keys[2]])
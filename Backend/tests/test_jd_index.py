@@ -0,0 +1,93 @@
+import asyncio
+from unittest.mock import AsyncMock, Mock
+from app import crud, jd_index, schemas
+from tests.test_llm import MOCK_JD_JSON
+
+def _jd(id, job_id_str="JD-1", content_hash="hash-1", title="Engineer"):
+    return schemas.JobDescription(id=id, job_id_str=job_id_str, content_hash=content_hash, job_title=title)
+
+def _row(id, job_id_str, content_hash):
+    return {"id": id, "job_id_str": job_id_str, "content_hash": content_hash, "job_title": "Engineer"}
+
+def _jd_model(**overrides):
+    return schemas.JDModel(**dict(MOCK_JD_JSON, **overrides))
+
+def test_index_lookups(jds):
+    """Test that JDs are found by jobId and content hash, and replaced rows drop their old keys."""
+    jds.add(_jd(1), jds.generation)
+    assert jds.get_by_job_id("JD-1").id == 1
+    assert jds.get_by_hash("hash-1").id == 1
+
+    jds.add(_jd(1, job_id_str="JD-2", content_hash="hash-2"), jds.generation)
+    assert jds.get_by_job_id("JD-1") is None
+    assert jds.get_by_hash("hash-1") is None
+    assert jds.get_by_job_id("JD-2").id == 1
+
+def test_index_expires_and_evicts():
+    """Test that entries expire after the TTL and the least recently used JD is evicted first."""
+    index = jd_index.JDIndex(ttl_seconds=0)
+    index.add(_jd(1), index.generation)
+    assert index.get_by_job_id("JD-1") is None
+
+    index = jd_index.JDIndex(max_entries=2)
+    index.load([_jd(1, "JD-1", "h1"), _jd(2, "JD-2", "h2")], index.generation)
+    index.get_by_hash("h1")
+    index.add(_jd(3, "JD-3", "h3"), index.generation)
+    assert index.get_by_hash("h2") is None
+    assert index.get_by_hash("h1").id == 1
+    assert len(index) == 2
+
+def test_rows_read_before_an_update_are_not_indexed(jds):
+    """Test that a lookup racing an update cannot put the old row back into the index."""
+    generation = jds.generation
+    jds.invalidate(1)
+    assert not jds.add(_jd(1), generation)
+    assert not jds.load([_jd(1)], generation)
+    assert len(jds) == 0
+
+def test_get_or_create_job_description_uses_index(jds):
+    """Test that a JD is read from the database once and then resolved from the index."""
+    supabase = Mock()
+    table = supabase.table.return_value
+    table.select.return_value.eq.return_value.execute.return_value = Mock(data=[_row(7, MOCK_JD_JSON["jobId"], "stored-hash")])
+    jd = _jd_model()
+
+    assert crud.get_or_create_job_description(supabase, jd).id == 7
+    assert crud.get_or_create_job_description(supabase, jd).id == 7
+    table.select.return_value.eq.assert_called_once_with("job_id_str", MOCK_JD_JSON["jobId"])
+
+def test_get_or_create_job_description_by_hash(jds):
+    """Test that hash hits are only served when they cannot conflict with the jobId lookup."""
+    content_hash = _jd_model(jobId="").content_hash()
+    jds.add(_jd(3, job_id_str=None, content_hash=content_hash), jds.generation)
+    supabase = Mock()
+
+    assert crud.get_or_create_job_description(supabase, _jd_model(jobId="")).id == 3
+    supabase.table.assert_not_called()
+
+    # The row found by hash still lacks the jobId, which the database path writes
+    jds.add(_jd(3, job_id_str=None, content_hash=_jd_model().content_hash()), jds.generation)
+    supabase.table.return_value.select.return_value.eq.return_value.execute.return_value = Mock(data=[])
+    supabase.table.return_value.insert.return_value.execute.return_value = Mock(data=[_row(4, MOCK_JD_JSON["jobId"], "h")])
+    assert crud.get_or_create_job_description(supabase, _jd_model()).id == 4
+    supabase.table.assert_called()
+
+def test_update_jd_invalidates_index(jds):
+    """Test that updated JDs are dropped from the index."""
+    jds.add(_jd(1), jds.generation)
+    supabase = Mock()
+    supabase.table.return_value.update.return_value.eq.return_value.execute.return_value = Mock(data=[_row(1, "JD-1", "hash-1")])
+
+    crud.update_jd(supabase, 1, schemas.JobDescriptionUpdate(status="Closed"))
+
+    assert jds.get_by_job_id("JD-1") is None
+
+def test_awarm_jd_index(jds):
+    """Test that the most recent JDs are loaded at startup."""
+    supabase = Mock()
+    query = supabase.table.return_value.select.return_value.order.return_value.limit.return_value
+    query.execute = AsyncMock(return_value=Mock(data=[_row(1, "JD-1", "h1"), _row(2, None, "h2")]))
+
+    assert asyncio.run(crud.awarm_jd_index(supabase, limit=2)) == 2
+    assert jds.get_by_hash("h2").id == 2
+    supabase.table.return_value.select.return_value.order.return_value.limit.assert_called_once_with(2)
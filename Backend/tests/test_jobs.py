@@ -0,0 +1,64 @@
+import time
+import threading
+import pytest
+from app import jobs
+
+def _wait_for(queue, job_id, timeout=5):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = queue.get(job_id)
+        if job.status in (jobs.COMPLETED, jobs.FAILED):
+            return job
+        time.sleep(0.01)
+    raise AssertionError(f"Job {job_id} did not finish")
+
+@pytest.fixture
+def queue():
+    queue = jobs.JobQueue(jobs.InMemoryJobBackend(), max_workers=1)
+    yield queue
+    queue.shutdown(wait=True)
+
+def test_job_exposes_partial_results(queue):
+    """Test that results reported by a running job are visible before it completes."""
+    release = threading.Event()
+
+    def work(handle):
+        handle.add_result({"index": 0})
+        release.wait(5)
+        handle.add_error({"index": 1, "detail": "failed"})
+        return {"done": True}
+
+    job = queue.submit("test", "user-1", 2, work)
+    deadline = time.monotonic() + 5
+    while queue.get(job.id).completed == 0 and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    partial = queue.get(job.id)
+    assert partial.status == jobs.RUNNING
+    assert partial.results == [{"index": 0}]
+
+    release.set()
+    finished = _wait_for(queue, job.id)
+    assert finished.status == jobs.COMPLETED
+    assert finished.completed == 2
+    assert finished.errors == [{"index": 1, "detail": "failed"}]
+    assert finished.summary == {"done": True}
+
+def test_failed_job_records_error(queue):
+    """Test that an exception in the work function marks the job as failed."""
+    def work(handle):
+        raise RuntimeError("boom")
+
+    job = _wait_for(queue, queue.submit("test", "user-1", 1, work).id)
+    assert job.status == jobs.FAILED
+    assert job.error == "boom"
+
+def test_finished_jobs_expire():
+    """Test that finished jobs are dropped once their TTL has passed."""
+    backend = jobs.InMemoryJobBackend(ttl_seconds=0)
+    job = backend.create_job("test", "user-1", 0)
+    assert backend.get_job(job.id) is not None
+
+    backend.set_status(job.id, jobs.COMPLETED)
+    time.sleep(0.01)
+    assert backend.get_job(job.id) is None
@@ -1,5 +1,6 @@
 import pytest
-from unittest.mock import patch, MagicMock
+import asyncio
+from unittest.mock import patch, MagicMock, AsyncMock
 from app import llm
 from app.schemas import JDModel, CVModel, LocationModel, CompanyProfile, Qualifications, CompensationBenefits, ApplicationInfo, Experience, Education, Skill, JobStability, EducationGap, KeywordAnalysis, Analytics
 import json
@@ -196,6 +197,85 @@ def test_convert_resume_to_json(mock_get_client):
     assert result["Personal Data"]["firstName"] == "John"
     assert "Python" in [skill["skillName"] for skill in result["Skills"]]
 
+@patch('app.llm.get_groq_client')
+def test_convert_resume_to_json_uses_cache(mock_get_client):
+    """Test that a repeated resume is served from the cache unless the skill categories change."""
+    mock_client = MagicMock()
+    mock_response = MagicMock()
+    mock_response.choices = [MagicMock(message=MagicMock(content=json.dumps(MOCK_RESUME_JSON)))]
+    mock_client.chat.completions.create.return_value = mock_response
+    mock_get_client.return_value = mock_client
+
+    first = llm.convert_resume_to_json(MOCK_RESUME_TEXT)
+    first["Personal Data"]["firstName"] = "Changed"
+    second = llm.convert_resume_to_json(MOCK_RESUME_TEXT)
+    assert mock_client.chat.completions.create.call_count == 1
+    assert second["Personal Data"]["firstName"] == "John"
+
+    llm.convert_resume_to_json(MOCK_RESUME_TEXT, {"critical": ["Python"]})
+    assert mock_client.chat.completions.create.call_count == 2
+
+@patch('app.llm.get_groq_client')
+def test_convert_jd_to_json_uses_cache(mock_get_client):
+    """Test that re-uploading the same JD does not call the AI service again."""
+    mock_client = MagicMock()
+    mock_response = MagicMock()
+    mock_response.choices = [MagicMock(message=MagicMock(content=json.dumps(MOCK_JD_JSON)))]
+    mock_client.chat.completions.create.return_value = mock_response
+    mock_get_client.return_value = mock_client
+
+    llm.convert_jd_to_json(MOCK_JD_TEXT)
+    result = llm.convert_jd_to_json(MOCK_JD_TEXT + "\n")
+    assert mock_client.chat.completions.create.call_count == 1
+    assert result["jobTitle"] == "Senior Python Developer"
+
+@patch('app.llm.get_async_groq_client')
+def test_aconvert_resume_to_json(mock_get_client):
+    """Test converting resume text to JSON through the async client."""
+    mock_client = MagicMock()
+    mock_response = MagicMock()
+    mock_response.choices = [MagicMock(message=MagicMock(content=json.dumps(MOCK_RESUME_JSON)))]
+    mock_client.chat.completions.create = AsyncMock(return_value=mock_response)
+    mock_get_client.return_value = mock_client
+
+    result = asyncio.run(llm.aconvert_resume_to_json(MOCK_RESUME_TEXT))
+
+    assert result["Personal Data"]["firstName"] == "John"
+    assert result["skill_presence"] == MOCK_RESUME_JSON.get("skill_presence", {})
+
+@patch('app.llm.get_async_groq_client')
+def test_aconvert_resume_to_json_uses_cache_off_event_loop(mock_get_client, monkeypatch):
+    """Test that the async variant reads and writes the SQLite result cache outside the event loop's thread."""
+    import threading
+    mock_client = MagicMock()
+    mock_response = MagicMock()
+    mock_response.choices = [MagicMock(message=MagicMock(content=json.dumps(MOCK_RESUME_JSON)))]
+    mock_client.chat.completions.create = AsyncMock(return_value=mock_response)
+    mock_get_client.return_value = mock_client
+    cache = llm.get_llm_cache()
+    threads = []
+    monkeypatch.setattr(cache, "get", lambda key: threads.append(threading.current_thread()))
+    monkeypatch.setattr(cache, "put", lambda key, value: threads.append(threading.current_thread()))
+
+    asyncio.run(llm.aconvert_resume_to_json(MOCK_RESUME_TEXT))
+
+    assert len(threads) == 2 and threading.main_thread() not in threads
+
+@patch('app.llm.get_async_groq_client')
+def test_acheck_skill_presence(mock_get_client):
+    """Test that the skill presence fallback returns a boolean for every requested skill."""
+    mock_client = MagicMock()
+    mock_response = MagicMock()
+    mock_response.choices = [MagicMock(message=MagicMock(content=json.dumps({"Airflow": True, "Spark": "false"})))]
+    mock_client.chat.completions.create = AsyncMock(return_value=mock_response)
+    mock_get_client.return_value = mock_client
+
+    result = asyncio.run(llm.acheck_skill_presence("Skills: Python", ["Spark", "Airflow", "Kafka"]))
+    assert result == {"Airflow": True, "Kafka": False, "Spark": False}
+
+    asyncio.run(llm.acheck_skill_presence("Skills: Python", ["Airflow", "Kafka", "Spark"]))
+    assert mock_client.chat.completions.create.call_count == 1
+
 @patch('app.llm.get_groq_client')
 def test_convert_resume_to_json_with_skill_categories(mock_get_client):
     """Test converting resume text to JSON with skill categories."""
@@ -314,6 +394,11 @@ def test_generate_interview_questions(mock_get_client):
     assert len(questions) > 0
     assert isinstance(questions[0], str)
 
+    # Questions are cached per (JD, CV) pair
+    assert llm.get_cached_interview_questions(jd, cv) == questions
+    assert llm.generate_interview_questions(jd, cv) == questions
+    assert mock_client.chat.completions.create.call_count == 1
+
 def test_get_groq_client():
     """Test getting Groq client."""
     # Test when GROK_API_KEY is not set
@@ -480,4 +565,19 @@ def test_generate_interview_questions_api_error(mock_get_client):
     
     # Test the function
     with pytest.raises(llm.LLMJsonError):
-        llm.generate_interview_questions(jd, cv)
\ No newline at end of file
+        llm.generate_interview_questions(jd, cv)
+def test_async_client_per_event_loop(monkeypatch):
+    """Test that every event loop gets its own async client, closed with aclose_async_groq_client."""
+    monkeypatch.setenv("GROK_API_KEY", "test-key")
+    monkeypatch.setattr(llm.groq, "AsyncGroq", lambda api_key: MagicMock(close=AsyncMock()))
+
+    async def use_client():
+        first = llm.get_async_groq_client()
+        assert llm.get_async_groq_client() is first
+        await llm.aclose_async_groq_client()
+        return first
+
+    first, second = asyncio.run(use_client()), asyncio.run(use_client())
+    assert first is not second
+    first.close.assert_awaited_once()
+    assert len(llm.async_clients) == 0
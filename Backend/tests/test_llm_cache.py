@@ -0,0 +1,47 @@
+import time
+from app import metrics
+from app.llm_cache import LLMResultCache, llm_cache_key
+
+def test_llm_cache_key():
+    """Test that every input of an extraction is part of the key."""
+    key = llm_cache_key("resume", "text", "model", "1", {"critical": ["Python"]})
+    assert key == llm_cache_key("resume", "text", "model", "1", {"critical": ["Python"]})
+    assert key != llm_cache_key("jd", "text", "model", "1", {"critical": ["Python"]})
+    assert key != llm_cache_key("resume", "other", "model", "1", {"critical": ["Python"]})
+    assert key != llm_cache_key("resume", "text", "other-model", "1", {"critical": ["Python"]})
+    assert key != llm_cache_key("resume", "text", "model", "2", {"critical": ["Python"]})
+    assert key != llm_cache_key("resume", "text", "model", "1", None)
+
+def test_llm_cache_round_trip(tmp_path):
+    """Test that results survive reopening the on-disk cache."""
+    metrics.reset()
+    path = str(tmp_path / "llm.sqlite3")
+    LLMResultCache(path).put("key", {"jobTitle": "Developer"})
+
+    cache = LLMResultCache(path)
+    assert cache.get("key") == {"jobTitle": "Developer"}
+    assert cache.get("missing") is None
+    assert metrics.snapshot()["counters"] == {"llm_cache.hits": 1, "llm_cache.misses": 1}
+
+def test_llm_cache_expires_entries():
+    """Test that entries older than the TTL are misses."""
+    cache = LLMResultCache(ttl_seconds=0)
+    cache.put("key", {"a": 1})
+    time.sleep(0.01)
+    assert cache.get("key") is None
+
+def test_llm_cache_evicts_least_recently_used():
+    """Test that the cache keeps at most max_entries results."""
+    cache = LLMResultCache(max_entries=2)
+    cache.put("a", 1)
+    time.sleep(0.01)
+    cache.put("b", 2)
+    time.sleep(0.01)
+    # Touching "a" makes "b" the least recently used entry
+    assert cache.get("a") == 1
+    time.sleep(0.01)
+    cache.put("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
@@ -1,6 +1,10 @@
+import json
 import pytest
+from unittest.mock import patch
 from fastapi.testclient import TestClient
+from app import auth, crud, llm, main, persistence, schemas
 from app.main import app
+from tests.test_llm import MOCK_RESUME_JSON
 
 client = TestClient(app)
 
@@ -12,4 +16,335 @@ def test_read_main():
 def test_token_endpoint():
     """Test that the token endpoint returns a 401 for invalid credentials"""
     response = client.post("/token", data={"username": "test", "password": "test"})
-    assert response.status_code == 401
\ No newline at end of file
+    assert response.status_code == 401
+def _parse_sse(body: str):
+    events = []
+    for block in body.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.split("\n"))
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+def _as_recruiter():
+    return schemas.User(id="test-user-id", username="testuser", email="test@example.com", role="recruiter")
+
+def test_sse_event_format():
+    """Test that events are formatted as Server-Sent Events."""
+    assert main.sse_event("progress", {"completed": 1}) == 'event: progress\ndata: {"completed": 1}\n\n'
+
+def test_extract_resumes_stream():
+    """Test that the streaming endpoint emits one event per resume and a final done event."""
+    async def fake_convert(resume_text, skill_categories=None):
+        if resume_text == "broken":
+            raise llm.LLMJsonError("Could not parse the response from the AI service as JSON.")
+        return dict(MOCK_RESUME_JSON, UUID=resume_text)
+
+    app.dependency_overrides[auth.get_current_user] = _as_recruiter
+    try:
+        with patch.object(llm, "aconvert_resume_to_json", side_effect=fake_convert):
+            response = client.post(
+                "/extract_resumes/stream",
+                files=[
+                    ("resume_files", ("first.txt", b"first", "text/plain")),
+                    ("resume_files", ("broken.txt", b"broken", "text/plain")),
+                ],
+                data={"jd_json": json.dumps({"requiredSkills": {"critical": ["Python"]}})}
+            )
+    finally:
+        app.dependency_overrides.clear()
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = _parse_sse(response.text)
+    results = [data for name, data in events if name == "result"]
+    errors = [data for name, data in events if name == "error"]
+
+    assert len(results) == 1
+    assert results[0]["filename"] == "first.txt"
+    assert results[0]["data"]["cv_json"]["UUID"] == "first"
+    assert results[0]["data"]["skill_presence"]["Python"] is True
+    assert errors == [{"index": 1, "filename": "broken.txt", "detail": "Could not parse the response from the AI service as JSON."}]
+    assert [data["completed"] for name, data in events if name == "progress"] == [1, 2]
+    assert events[-1] == ("done", {"completed": 2, "failed": 1, "total": 2})
+
+def test_extract_resumes_stream_rejects_unsupported_files():
+    """Test that uploads are validated before the stream starts."""
+    app.dependency_overrides[auth.get_current_user] = _as_recruiter
+    try:
+        response = client.post(
+            "/extract_resumes/stream",
+            files=[("resume_files", ("resume.png", b"...", "image/png"))],
+            data={"jd_json": "{}"}
+        )
+    finally:
+        app.dependency_overrides.clear()
+    assert response.status_code == 400
+
+def test_extract_resumes_from_archive():
+    """Test that the resumes in a ZIP upload are extracted like individually uploaded files."""
+    from tests.test_archives import _zip
+
+    async def fake_convert(resume_text, skill_categories=None):
+        return dict(MOCK_RESUME_JSON, UUID=resume_text)
+
+    app.dependency_overrides[auth.get_current_user] = _as_recruiter
+    try:
+        with patch.object(llm, "aconvert_resume_to_json", side_effect=fake_convert):
+            response = client.post(
+                "/extract_resumes/archive",
+                files={"archive_file": ("drop.zip", _zip({"first.txt": b"first", "second.txt": b"second"}).read(), "application/zip")},
+                data={"jd_json": "{}"}
+            )
+            mixed = client.post(
+                "/extract_resumes/archive",
+                files={"archive_file": ("drop.zip", _zip({"first.txt": b"first", "photo.png": b"png"}).read(), "application/zip")},
+                data={"jd_json": "{}"}
+            )
+            rejected = client.post(
+                "/extract_resumes/archive",
+                files={"archive_file": ("drop.zip", b"not an archive", "application/zip")},
+                data={"jd_json": "{}"}
+            )
+    finally:
+        app.dependency_overrides.clear()
+
+    assert response.status_code == 200
+    assert [cv["cv_json"]["UUID"] for cv in response.json()["results"]] == ["first", "second"]
+    assert response.json()["errors"] == []
+    assert mixed.status_code == 200
+    assert [cv["cv_json"]["UUID"] for cv in mixed.json()["results"]] == ["first"]
+    assert mixed.json()["errors"] == [{"filename": "photo.png", "detail": "Unsupported file type"}]
+    assert rejected.status_code == 400
+
+def test_match_stream():
+    """Test that the streaming match endpoint emits one result per candidate and the metadata."""
+    from tests.test_llm import MOCK_JD_JSON
+    cvs = [
+        {"cv_json": dict(MOCK_RESUME_JSON, UUID="first"), "skill_presence": {"Python": True, "FastAPI": False}},
+        {"cv_json": dict(MOCK_RESUME_JSON, UUID="second"), "skill_presence": {}},
+    ]
+
+    app.dependency_overrides[auth.get_current_user] = _as_recruiter
+    try:
+        with patch.object(main.crud, "aget_or_create_job_description", return_value=None), \
+             patch.object(main.crud, "get_or_create_candidates", side_effect=lambda supabase, cvs, recruiter_id: [None] * len(cvs)), \
+             patch.object(main, "generate_interview_questions", return_value=["Tell us about FastAPI"]):
+            response = client.post("/match/stream", json={"jd_json": MOCK_JD_JSON, "cvs": cvs})
+            persistence.get_persistence_queue().flush(timeout=5)
+    finally:
+        app.dependency_overrides.clear()
+
+    assert response.status_code == 200
+    events = _parse_sse(response.text)
+    results = sorted((data for name, data in events if name == "result"), key=lambda data: data["index"])
+
+    assert [r["data"]["candidate_id"] for r in results] == ["first", "second"]
+    # Skills missing from the sent skill_presence are checked against the resume locally
+    assert results[0]["data"]["present_skills"] == ["Python", "PostgreSQL"]
+    assert results[1]["data"]["present_skills"] == ["Python", "FastAPI", "PostgreSQL"]
+    name, data = events[-1]
+    assert name == "done"
+    assert data["matching_metadata"]["candidates_evaluated"] == 2
+    assert data["interview_questions_job_id"]
+
+def test_match_stream_emits_chunks_and_errors(monkeypatch):
+    """Test that streamed candidates are scored chunk by chunk and that a failure ends the stream with an error event."""
+    from tests.test_llm import MOCK_JD_JSON
+    cvs = [{"cv_json": dict(MOCK_RESUME_JSON, UUID=f"cv-{i}"), "skill_presence": {}} for i in range(3)]
+    monkeypatch.setattr(main, "MATCH_STREAM_CHUNK_SIZE", 2)
+
+    app.dependency_overrides[auth.get_current_user] = _as_recruiter
+    try:
+        with patch.object(main.crud, "aget_or_create_job_description", return_value=None), \
+             patch.object(main, "compute_similarity_batch", side_effect=lambda jd, cv_objs: [(0.5, {})] * len(cv_objs)) as score, \
+             patch.object(main, "prefetch_interview_questions", side_effect=RuntimeError("queue is down")):
+            response = client.post("/match/stream", json={"jd_json": MOCK_JD_JSON, "cvs": cvs})
+    finally:
+        app.dependency_overrides.clear()
+
+    assert [len(call.args[1]) for call in score.call_args_list] == [2, 1]
+    events = _parse_sse(response.text)
+    assert [data["index"] for name, data in events if name == "result"] == [0, 1, 2]
+    assert events[-1] == ("error", {"detail": "Failed to finish matching"})
+
+def _wait_for_job(job_id, timeout=5):
+    import time
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        response = client.get(f"/jobs/{job_id}/results")
+        if response.json()["status"] in ("completed", "failed"):
+            return response
+        time.sleep(0.01)
+    raise AssertionError(f"Job {job_id} did not finish")
+
+def test_extract_resumes_job():
+    """Test that a background extraction job can be polled for its results."""
+    async def fake_convert(resume_text, skill_categories=None):
+        if resume_text == "broken":
+            raise llm.LLMJsonError("Could not parse the response from the AI service as JSON.")
+        return dict(MOCK_RESUME_JSON, UUID=resume_text)
+
+    app.dependency_overrides[auth.get_current_user] = _as_recruiter
+    try:
+        with patch.object(llm, "aconvert_resume_to_json", side_effect=fake_convert):
+            response = client.post(
+                "/jobs/extract_resumes",
+                files=[
+                    ("resume_files", ("first.txt", b"first", "text/plain")),
+                    ("resume_files", ("broken.txt", b"broken", "text/plain")),
+                ],
+                data={"jd_json": json.dumps({"requiredSkills": {"critical": ["Python"]}})}
+            )
+            assert response.status_code == 202
+            job_id = response.json()["job_id"]
+            response = _wait_for_job(job_id)
+        status_response = client.get(f"/jobs/{job_id}")
+    finally:
+        app.dependency_overrides.clear()
+
+    data = response.json()
+    assert data["status"] == "completed"
+    assert data["total"] == 2
+    assert data["failed"] == 1
+    assert [r["data"]["cv_json"]["UUID"] for r in data["results"]] == ["first"]
+    assert data["errors"][0]["filename"] == "broken.txt"
+    assert status_response.json()["completed"] == 2
+
+def test_match_job():
+    """Test that a background match job returns every result and the matching metadata."""
+    from tests.test_llm import MOCK_JD_JSON
+    cvs = [
+        {"cv_json": dict(MOCK_RESUME_JSON, UUID="first"), "skill_presence": {"Python": True}},
+        {"cv_json": dict(MOCK_RESUME_JSON, UUID="second"), "skill_presence": {}},
+    ]
+
+    app.dependency_overrides[auth.get_current_user] = _as_recruiter
+    try:
+        with patch.object(main.crud, "get_or_create_job_description", return_value=None), \
+             patch.object(main.crud, "get_or_create_candidates", side_effect=lambda supabase, cvs, recruiter_id: [None] * len(cvs)), \
+             patch.object(main, "generate_interview_questions", return_value=["Tell us about FastAPI"]):
+            response = client.post("/jobs/match", json={"jd_json": MOCK_JD_JSON, "cvs": cvs})
+            assert response.status_code == 202
+            response = _wait_for_job(response.json()["job_id"])
+            persistence.get_persistence_queue().flush(timeout=5)
+    finally:
+        app.dependency_overrides.clear()
+
+    data = response.json()
+    assert data["status"] == "completed"
+    assert sorted(r["data"]["candidate_id"] for r in data["results"]) == ["first", "second"]
+    assert data["summary"]["matching_metadata"]["candidates_evaluated"] == 2
+
+def test_job_of_another_user_is_not_found():
+    """Test that users cannot poll jobs they did not submit."""
+    job = main.get_job_queue().submit("test", "someone-else", 0, lambda handle: None)
+    app.dependency_overrides[auth.get_current_user] = _as_recruiter
+    try:
+        response = client.get(f"/jobs/{job.id}")
+    finally:
+        app.dependency_overrides.clear()
+    assert response.status_code == 404
+
+def _questions_client(questions):
+    from unittest.mock import MagicMock
+    mock_client = MagicMock()
+    mock_client.chat.completions.create.return_value = MagicMock(
+        choices=[MagicMock(message=MagicMock(content=json.dumps(questions)))]
+    )
+    return mock_client
+
+def test_match_generates_interview_questions_in_background():
+    """Test that /match does not wait for interview questions and reuses them once generated."""
+    from tests.test_llm import MOCK_JD_JSON
+    cvs = [{"cv_json": dict(MOCK_RESUME_JSON, UUID="first"), "skill_presence": {}}]
+    mock_client = _questions_client(["Tell us about FastAPI"])
+
+    app.dependency_overrides[auth.get_current_user] = _as_recruiter
+    try:
+        with patch.object(main.crud, "aget_or_create_job_description", return_value=None), \
+             patch.object(main.crud, "get_or_create_candidates", side_effect=lambda supabase, cvs, recruiter_id: [None] * len(cvs)), \
+             patch.object(llm, "get_groq_client", return_value=mock_client):
+            first = client.post("/match", json={"jd_json": MOCK_JD_JSON, "cvs": cvs}).json()
+            job = _wait_for_job(first["interview_questions_job_id"]).json()
+            second = client.post("/match", json={"jd_json": MOCK_JD_JSON, "cvs": cvs}).json()
+            persistence.get_persistence_queue().flush(timeout=5)
+    finally:
+        app.dependency_overrides.clear()
+
+    assert first["results"][0]["interview_questions"] == []
+    assert job["results"] == [{"candidate_id": "first", "interview_questions": ["Tell us about FastAPI"]}]
+    assert second["results"][0]["interview_questions"] == ["Tell us about FastAPI"]
+    assert second["interview_questions_job_id"] is None
+    assert mock_client.chat.completions.create.call_count == 1
+
+def test_interview_questions_endpoint():
+    """Test that questions for one candidate are generated on demand."""
+    from tests.test_llm import MOCK_JD_JSON
+    app.dependency_overrides[auth.get_current_user] = _as_recruiter
+    try:
+        with patch.object(llm, "get_groq_client", return_value=_questions_client(["Why FastAPI?"])):
+            response = client.post("/interview_questions", json={"jd_json": MOCK_JD_JSON, "cv_json": dict(MOCK_RESUME_JSON, UUID="first")})
+    finally:
+        app.dependency_overrides.clear()
+
+    assert response.status_code == 200
+    assert response.json() == {"candidate_id": "first", "interview_questions": ["Why FastAPI?"]}
+
+def test_match_saves_results_in_background():
+    """Test that /match responds before its results are written and the writes are flushed afterwards."""
+    import threading
+    from unittest.mock import MagicMock
+    from tests.test_llm import MOCK_JD_JSON
+    cvs = [{"cv_json": dict(MOCK_RESUME_JSON, UUID="first"), "skill_presence": {}}]
+    release = threading.Event()
+
+    def slow_candidates(supabase, cvs, recruiter_id):
+        release.wait(5)
+        return [MagicMock(id=index + 1) for index in range(len(cvs))]
+
+    app.dependency_overrides[auth.get_current_user] = _as_recruiter
+    try:
+        with patch.object(main.crud, "aget_or_create_job_description", return_value=MagicMock(id=7)), \
+             patch.object(main.crud, "get_or_create_candidates", side_effect=slow_candidates), \
+             patch.object(main.crud, "create_analysis_results", return_value=[MagicMock()]) as create_results, \
+             patch.object(main, "generate_interview_questions", return_value=[]):
+            response = client.post("/match", json={"jd_json": MOCK_JD_JSON, "cvs": cvs})
+            assert response.status_code == 200
+            assert create_results.call_count == 0
+            release.set()
+            assert persistence.get_persistence_queue().flush(timeout=5)
+    finally:
+        app.dependency_overrides.clear()
+
+    create_results.assert_called_once()
+    assert create_results.call_args.kwargs["jd_db_id"] == 7
+    assert [candidate_id for candidate_id, _ in create_results.call_args.kwargs["results"]] == [1]
+
+def test_metrics_requires_admin():
+    """Test that metrics are only exposed to admins."""
+    app.dependency_overrides[auth.get_current_user] = _as_recruiter
+    try:
+        response = client.get("/metrics")
+    finally:
+        app.dependency_overrides.clear()
+    assert response.status_code == 403
+
+def test_analyses_page_headers():
+    """Test that listings return the page as an array and the next cursor and total in headers."""
+    page = crud.Page(items=[], next_cursor="abc", total=250)
+    app.dependency_overrides[auth.get_current_user] = _as_recruiter
+    try:
+        with patch.object(main.crud, "aget_user_analyses", return_value=page) as aget_user_analyses:
+            response = client.get("/analyses?limit=50&include_total=true")
+            invalid = client.get("/analyses?cursor=not-a-cursor")
+            tampered = client.get("/analyses", params={"cursor": crud.encode_cursor('2024-05-01",id.gt.0,created_at.lt."2100', 1)})
+    finally:
+        app.dependency_overrides.clear()
+    assert response.status_code == 200
+    assert response.json() == []
+    assert response.headers["X-Next-Cursor"] == "abc"
+    assert response.headers["X-Total-Count"] == "250"
+    assert aget_user_analyses.call_args.kwargs["limit"] == 50
+    assert aget_user_analyses.call_args.kwargs["include_total"] is True
+    assert invalid.status_code == 400
+    assert tampered.status_code == 400
+    assert aget_user_analyses.call_count == 1
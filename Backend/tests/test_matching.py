@@ -1,4 +1,5 @@
 import pytest
+import numpy as np
 from app import matching
 from app.schemas import JDModel, CVModel, LocationModel, CompanyProfile, Qualifications, CompensationBenefits, ApplicationInfo, Experience, Education, Skill, JobStability, EducationGap, KeywordAnalysis, Analytics
 
@@ -417,4 +418,157 @@ def test_compute_similarity():
     assert "responsibilities_similarity" in details
     assert "experience_suitability" in details
     assert "education_relevance" in details
-    assert "location_compatibility" in details
\ No newline at end of file
+    assert "location_compatibility" in details
+
+def _make_jd(**overrides):
+    data = dict(
+        jobId="JD001",
+        jobTitle="Software Engineer",
+        companyProfile=CompanyProfile(companyName="Test Company"),
+        location=LocationModel(city="San Francisco", state="CA", country="USA"),
+        datePosted="2023-01-01",
+        jobSummary="Test job",
+        keyResponsibilities=["Develop software", "Review code"],
+        qualifications=Qualifications(required=["3-5 years of experience in Python"]),
+        requiredSkills=["Python"],
+        educationRequired=["Bachelor's in Computer Science"],
+        compensationAndBenefits=CompensationBenefits(),
+        applicationInfo=ApplicationInfo(),
+        extractedKeywords=["Python"]
+    )
+    data.update(overrides)
+    return JDModel(**data)
+
+def _make_cv(suggested_role="Software Engineer", descriptions=None, field="Computer Science"):
+    return CVModel(
+        UUID="12345",
+        Personal_Data={
+            "firstName": "John",
+            "lastName": "Doe",
+            "email": "john@example.com",
+            "location": LocationModel(city="Bangalore", state="KA", country="India")
+        },
+        education_list=[
+            Education(institution="Test University", degree="B.Tech", fieldOfStudy=field)
+        ],
+        experiences_list=[
+            Experience(
+                jobTitle="Backend Developer",
+                company="Test Company",
+                startDate="2019-07-01",
+                endDate="2023-01-01",
+                description=descriptions if descriptions is not None else ["Developed software applications", "Reviewed pull requests"]
+            )
+        ],
+        Analytics=Analytics(
+            job_stability=JobStability(),
+            education_gap=EducationGap(),
+            keyword_analysis=KeywordAnalysis(),
+            suggested_role=suggested_role
+        )
+    )
+
+class CountingModel:
+    """Wraps the real model and counts encode calls."""
+    def __init__(self, model):
+        self.model = model
+        self.calls = 0
+
+    def encode(self, *args, **kwargs):
+        self.calls += 1
+        return self.model.encode(*args, **kwargs)
+
+def test_batch_encoder_encodes_collected_texts_once():
+    """Test that the batch encoder serves every collected text from one encode call."""
+    model = CountingModel(matching.get_model())
+    jd = _make_jd()
+    cv = _make_cv()
+
+    encoder = matching.BatchEncoder(model, matching.collect_similarity_texts(jd, [cv]))
+    assert model.calls == 1
+
+    matching.compute_similarity(jd, cv, model=encoder)
+    assert model.calls == 1
+
+def test_batch_encoder_matches_model_output():
+    """Test that embeddings served by the batch encoder match direct encodes."""
+    model = matching.get_model()
+    encoder = matching.BatchEncoder(model, ["Software Engineer", "Data Scientist"])
+
+    single = encoder.encode("Data Scientist")
+    batch = encoder.encode(["Software Engineer", "Unseen text"])
+
+    assert single == pytest.approx(model.encode("Data Scientist"), abs=1e-4)
+    assert batch.shape[0] == 2
+    assert batch[1] == pytest.approx(model.encode("Unseen text"), abs=1e-4)
+
+def test_compute_similarity_batch_matches_compute_similarity():
+    """Test that batch scoring gives the same results as scoring CVs one by one."""
+    jd = _make_jd()
+    cvs = [
+        _make_cv(),
+        _make_cv(suggested_role=None, field="Mechanical Engineering"),
+        _make_cv(suggested_role="Data Analyst", descriptions=[])
+    ]
+
+    no_history = _make_cv(suggested_role=None)
+    no_history.experiences_list = []
+    no_history.education_list = []
+    cvs.append(no_history)
+
+    batched = matching.compute_similarity_batch(jd, cvs)
+    assert len(batched) == len(cvs)
+    for cv, (score, details) in zip(cvs, batched):
+        expected_score, expected_details = matching.compute_similarity(jd, cv)
+        assert score == pytest.approx(expected_score, abs=1e-3)
+        for key, value in expected_details.items():
+            if isinstance(value, float):
+                assert details[key] == pytest.approx(value, abs=1e-3), key
+            else:
+                assert details[key] == value, key
+
+    assert matching.compute_similarity_batch(jd, []) == []
+
+def test_prepare_jd():
+    """Test that JD-side scoring inputs are computed once."""
+    jd = _make_jd()
+    prepared = matching.prepare_jd(jd)
+
+    assert prepared.jd is jd
+    assert prepared.required_years == 3.0
+    assert len(prepared.responsibility_embeddings) == len(jd.keyResponsibilities)
+    assert len(prepared.education_requirements) == len(jd.educationRequired)
+    assert len(prepared.education_embeddings) == len(jd.educationRequired)
+
+def test_score_cv_reuses_prepared_jd():
+    """Test that scoring against a prepared JD does no JD-side encoding per CV."""
+    model = CountingModel(matching.get_model())
+    jd = _make_jd()
+    prepared = matching.prepare_jd(jd, [_make_cv()], model=model)
+    calls_after_prepare = model.calls
+
+    for _ in range(3):
+        score, details = matching.score_cv(prepared, _make_cv())
+        assert 0 <= score <= 1
+        assert details["required_exp_years"] == 3.0
+
+    assert model.calls == calls_after_prepare
+
+def test_score_cv_matches_compute_similarity():
+    """Test that score_cv gives the same result as compute_similarity."""
+    jd = _make_jd()
+    cv = _make_cv(suggested_role=None)
+
+    score, _ = matching.score_cv(matching.prepare_jd(jd), cv)
+    expected_score, _ = matching.compute_similarity(jd, cv)
+    assert score == pytest.approx(expected_score, abs=1e-3)
+
+def test_top2_weighted_similarity():
+    """Test that the partition-based top-2 weighting matches sorting each row."""
+    similarity = np.array([
+        [0.1, 0.9, 0.5, 0.7],
+        [0.4, 0.2, 0.8, 0.8],
+    ])
+    expected = [0.7 * sorted(row, reverse=True)[0] + 0.3 * sorted(row, reverse=True)[1] for row in similarity]
+    assert matching.top2_weighted_similarity(similarity) == pytest.approx(expected)
+    assert matching.top2_weighted_similarity(similarity[:, :1]) == pytest.approx([0.1, 0.4])
@@ -1,5 +1,9 @@
+import io
+import itertools
 import pytest
-from app.parsing import to_bool, clean_resume_json, clean_json_response, preprocess_resume_text
+from unittest.mock import patch
+from app import parsing
+from app.parsing import to_bool, clean_resume_json, clean_json_response, preprocess_resume_text, detect_document_type, extract_text, join_within_budget
 
 def test_to_bool_with_boolean():
     """Test to_bool with boolean values."""
@@ -213,4 +217,48 @@ def test_preprocess_resume_text():
     long_text = "A" * 9000
     processed = preprocess_resume_text(long_text)
     assert len(processed) <= 8010  # 8000 + 3 for ellipsis
-    assert processed.endswith("...")
\ No newline at end of file
+    assert processed.endswith("...")
+
+def _docx_bytes(text):
+    from docx import Document
+    buffer = io.BytesIO()
+    doc = Document()
+    doc.add_paragraph(text)
+    doc.save(buffer)
+    return buffer.getvalue()
+
+def test_detect_document_type():
+    """Test that binary formats are detected from their leading bytes and text from the name or content type."""
+    assert detect_document_type(b"%PDF-1.7", "resume.docx") == "pdf"
+    assert detect_document_type(b"PK\x03\x04", "resume.docx") == "docx"
+    assert detect_document_type(b"PK\x03\x04", "archive.zip") is None
+    assert detect_document_type(b"John Doe", "resume.txt") == "txt"
+    assert detect_document_type(b"John Doe", None, "text/plain") == "txt"
+    assert detect_document_type(b"John Doe", "resume.pdf") is None
+
+def test_extract_text_in_memory():
+    """Test that documents are read from bytes, memoryviews and file objects without touching disk."""
+    data = _docx_bytes("Senior Python Developer")
+    assert extract_text(data) == "Senior Python Developer"
+    assert extract_text(memoryview(data), filename="resume.docx") == "Senior Python Developer"
+
+    upload = io.BytesIO(b"John Doe")
+    upload.read()
+    assert extract_text(upload, filename="resume.txt") == "John Doe"
+    assert extract_text(b"%PDF-1.7 truncated", filename="resume.pdf") is None
+
+def test_join_within_budget():
+    """Test that parts are joined up to the budget and later parts are not consumed."""
+    assert join_within_budget(["ab", "cd"]) == "abcd"
+    assert join_within_budget(["ab", "cd", "ef"], max_chars=3) == "abc"
+    assert join_within_budget(["ab", "cd"], max_chars=4, separator="\n") == "ab\nc"
+    pages = iter(["ab", "cd", "ef"])
+    join_within_budget(pages, max_chars=3)
+    assert list(pages) == ["ef"]
+
+def test_extract_text_stops_at_budget():
+    """Test that PDF pages past the character budget are never parsed."""
+    endless_pdf = itertools.repeat("x" * 100)
+    with patch.object(parsing, "iter_pdf_pages", return_value=endless_pdf):
+        assert extract_text(b"%PDF-1.7", max_chars=1000) == "x" * 1000
+    assert extract_text(b"John Doe", filename="resume.txt", max_chars=4) == "John"
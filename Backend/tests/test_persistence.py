@@ -0,0 +1,124 @@
+import threading
+import pytest
+from unittest.mock import MagicMock, patch
+from app import metrics, persistence
+from app.schemas import CVModel
+from tests.test_llm import MOCK_RESUME_JSON
+
+@pytest.fixture(autouse=True)
+def reset_metrics():
+    metrics.reset()
+
+def _queue(writer, **kwargs):
+    kwargs.setdefault("flush_interval", 0)
+    kwargs.setdefault("retry_backoff", 0)
+    return persistence.WriteBehindQueue("test", writer, **kwargs)
+
+def test_writes_are_grouped_by_key():
+    """Test that buffered writes are flushed in one call per key."""
+    release = threading.Event()
+    calls = []
+
+    def writer(key, items):
+        release.wait(5)
+        calls.append((key, items))
+
+    queue = _queue(writer, flush_interval=0.2)
+    queue.submit("a", [1, 2])
+    queue.submit("b", [3])
+    queue.submit("a", [4])
+    release.set()
+    assert queue.flush(timeout=5)
+    queue.close(timeout=5)
+
+    assert sorted(calls) == [("a", [1, 2, 4]), ("b", [3])]
+    counters = metrics.snapshot()["counters"]
+    assert counters["test.enqueued"] == 4
+    assert counters["test.flushed"] == 4
+    assert counters["test.flush_batches"] == 2
+
+def test_failed_writes_are_retried():
+    """Test that a failing flush is retried and counted."""
+    writer = MagicMock(side_effect=[persistence.PersistenceError("down"), None])
+    queue = _queue(writer, max_retries=2)
+    queue.submit("a", [1])
+    assert queue.flush(timeout=5)
+    queue.close(timeout=5)
+
+    assert writer.call_count == 2
+    counters = metrics.snapshot()["counters"]
+    assert counters["test.retries"] == 1
+    assert counters["test.flushed"] == 1
+
+def test_writes_are_dropped_after_retries():
+    """Test that writes failing every attempt are dropped and counted as failed."""
+    writer = MagicMock(side_effect=persistence.PersistenceError("down"))
+    queue = _queue(writer, max_retries=1)
+    queue.submit("a", [1, 2])
+    assert queue.flush(timeout=5)
+    queue.close(timeout=5)
+
+    assert writer.call_count == 2
+    assert metrics.snapshot()["counters"]["test.failed"] == 2
+
+def test_full_buffer_writes_inline():
+    """Test that writes beyond the buffer size happen in the caller instead of growing the buffer."""
+    release = threading.Event()
+    writer_threads = {}
+
+    def writer(key, items):
+        writer_threads[key] = threading.current_thread()
+        if key == "queued":
+            release.wait(5)
+
+    queue = _queue(writer, max_items=2)
+    queue.submit("queued", [1, 2])
+    queue.submit("overflow", [3])
+    release.set()
+    queue.close(timeout=5)
+
+    assert writer_threads["overflow"] is threading.current_thread()
+    assert writer_threads["queued"] is not threading.current_thread()
+    assert metrics.snapshot()["counters"]["test.inline_writes"] == 1
+
+def test_close_drains_buffered_writes():
+    """Test that closing the queue flushes what is buffered and then writes inline."""
+    calls = []
+    queue = _queue(lambda key, items: calls.append(items), flush_interval=10)
+    queue.submit("a", [1])
+    assert queue.close(timeout=5)
+    queue.submit("a", [2])
+
+    assert calls == [[1], [2]]
+    assert queue.pending == 0
+
+def _cv(email):
+    personal_data = dict(MOCK_RESUME_JSON["Personal Data"], email=email)
+    return CVModel.parse_obj(dict(MOCK_RESUME_JSON, **{"Personal Data": personal_data}))
+
+def test_write_analysis_results():
+    """Test that candidates are saved first and their analysis results in one insert."""
+    writes = [persistence.AnalysisWrite(cv=_cv("a@example.com"), result={"match_score": 0.5}),
+              persistence.AnalysisWrite(cv=_cv("b@example.com"), result={"match_score": 0.7})]
+    repository = MagicMock()
+    repository.get_or_create_candidates.return_value = [MagicMock(id=1), None]
+    repository.create_analysis_results.return_value = [MagicMock()]
+
+    persistence.write_analysis_results((repository, 5, "recruiter-1"), writes)
+
+    repository.create_analysis_results.assert_called_once_with(5, "recruiter-1", [(1, {"match_score": 0.5})])
+
+def test_write_analysis_results_raises_on_failed_write():
+    """Test that repository failures surface as PersistenceError so the queue retries them."""
+    writes = [persistence.AnalysisWrite(cv=_cv("a@example.com"), result={"match_score": 0.5})]
+    repository = MagicMock()
+    repository.get_or_create_candidates.return_value = [None]
+    with pytest.raises(persistence.PersistenceError):
+        persistence.write_analysis_results((repository, 5, "recruiter-1"), writes)
+
+def test_metrics_after_drain(monkeypatch):
+    """Test that the queue's metrics can still be read once it has been drained at shutdown."""
+    monkeypatch.setattr(persistence, "_persistence_queue", None)
+    persistence.get_persistence_queue()
+    persistence.drain_persistence_queue(timeout=5)
+    assert metrics.snapshot()["persistence"] == {"pending": 0}
@@ -0,0 +1,131 @@
+import time
+import asyncio
+import pytest
+from unittest.mock import patch
+from app import llm, parsing, pipeline
+
+def _files(*texts):
+    return [(f"resume_{i}.txt", text.encode("utf-8"), "text/plain") for i, text in enumerate(texts)]
+
+def test_extract_text_from_upload():
+    """Test that an uploaded file is extracted from its bytes."""
+    assert pipeline.extract_text_from_upload("resume.txt", b"John Doe") == "John Doe"
+    assert pipeline.extract_text_from_upload("resume.xyz", b"John Doe") is None
+    assert pipeline.extract_text_from_upload("resume", b"John Doe", content_type="text/plain") == "John Doe"
+
+def test_extract_text_from_upload_times_out():
+    """Test that a document taking longer than its time limit is interrupted."""
+    with patch.object(parsing, "extract_text", side_effect=lambda data, **kwargs: time.sleep(5)):
+        started = time.monotonic()
+        with pytest.raises(parsing.ExtractionTimeout):
+            parsing.extract_text_from_upload("resume.pdf", b"%PDF-", timeout=0.05)
+    assert time.monotonic() - started < 1
+
+def test_extraction_timeout_is_not_swallowed_by_parsers():
+    """Test that the timeout escapes parser code that catches every Exception."""
+    def swallow_errors(data, **kwargs):
+        deadline = time.monotonic() + 5
+        while time.monotonic() < deadline:
+            try:
+                time.sleep(0.01)
+            except Exception:
+                pass
+
+    with patch.object(parsing, "extract_text", side_effect=swallow_errors):
+        started = time.monotonic()
+        with pytest.raises(parsing.ExtractionTimeout):
+            parsing.extract_text_from_upload("resume.pdf", b"%PDF-", timeout=0.05)
+    assert time.monotonic() - started < 1
+
+def test_extract_resume_batch_reports_timeouts():
+    """Test that a resume whose extraction times out is reported without holding up the others."""
+    async def fake_extract(filename, data, content_type=None):
+        if filename == "resume_0.txt":
+            raise parsing.ExtractionTimeout()
+        return data.decode("utf-8")
+
+    async def fake_convert(resume_text, skill_categories=None):
+        return {"text": resume_text}
+
+    with patch.object(pipeline, "extract_upload_text", side_effect=fake_extract), \
+         patch.object(llm, "aconvert_resume_to_json", side_effect=fake_convert):
+        results = asyncio.run(pipeline.extract_resume_batch(_files("slow", "fast")))
+
+    assert results[0].error == "Text extraction timed out"
+    assert results[1].resume_json == {"text": "fast"}
+
+def test_extract_resume_batch_keeps_input_order():
+    """Test that results come back in input order even when later resumes finish first."""
+    async def fake_convert(resume_text, skill_categories=None):
+        # The first resume is the slowest one
+        await asyncio.sleep(0.05 if resume_text == "first" else 0)
+        skills = [{"skillName": "Python"}] if resume_text == "first" else []
+        return {"text": resume_text, "categories": skill_categories, "Skills": skills}
+
+    with patch.object(llm, "aconvert_resume_to_json", side_effect=fake_convert):
+        results = asyncio.run(pipeline.extract_resume_batch(_files("first", "second", "third"), {"critical": ["Python"]}))
+
+    assert [r.resume_json["text"] for r in results] == ["first", "second", "third"]
+    assert [r.filename for r in results] == ["resume_0.txt", "resume_1.txt", "resume_2.txt"]
+    # Resumes are extracted without the JD's skills; presence is checked locally afterwards
+    assert all(r.resume_json["categories"] is None for r in results)
+    assert [r.resume_json["skill_presence"] for r in results] == [{"Python": True}, {"Python": False}, {"Python": False}]
+
+def test_extract_resume_batch_asks_llm_about_undecided_skills():
+    """Test that only skills the local matcher cannot decide are sent to the LLM."""
+    async def fake_convert(resume_text, skill_categories=None):
+        return {"Skills": [], "Experiences": [{"jobTitle": "Engineer", "description": ["Built data pipelines with Python"]}]}
+
+    async def fake_check(resume_summary, skills):
+        return {skill: True for skill in skills}
+
+    with patch.object(llm, "aconvert_resume_to_json", side_effect=fake_convert), \
+         patch.object(llm, "acheck_skill_presence", side_effect=fake_check) as check:
+        results = asyncio.run(pipeline.extract_resume_batch(_files("first"), {"critical": ["Python", "Airflow"]}))
+
+    assert results[0].resume_json["skill_presence"] == {"Python": True, "Airflow": True}
+    assert check.call_args.args[1] == ["Airflow"]
+
+def test_extract_resume_batch_limits_llm_concurrency():
+    """Test that no more than max_concurrency LLM calls are in flight."""
+    in_flight = 0
+    peak = 0
+
+    async def fake_convert(resume_text, skill_categories=None):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return {"text": resume_text}
+
+    with patch.object(llm, "aconvert_resume_to_json", side_effect=fake_convert):
+        results = asyncio.run(pipeline.extract_resume_batch(_files(*[f"cv {i}" for i in range(6)]), max_concurrency=2))
+
+    assert len(results) == 6
+    assert peak <= 2
+
+def test_extract_resume_batch_reports_failures():
+    """Test that unreadable files and LLM errors are reported without failing the batch."""
+    async def fake_convert(resume_text, skill_categories=None):
+        if resume_text == "bad":
+            raise llm.LLMJsonError("Could not parse the response from the AI service as JSON.")
+        return {"text": resume_text}
+
+    files = _files("good", "bad") + [("resume.xyz", b"unsupported", None)]
+    with patch.object(llm, "aconvert_resume_to_json", side_effect=fake_convert):
+        results = asyncio.run(pipeline.extract_resume_batch(files))
+
+    assert results[0].resume_json == {"text": "good"}
+    assert results[1].resume_json is None and "AI service" in results[1].error
+    assert results[2].resume_json is None and results[2].error
+
+def test_extract_resume_batch_reads_text_by_content_type():
+    """Test that a text resume without an extension is read by its declared content type."""
+    async def fake_convert(resume_text, skill_categories=None):
+        return {"text": resume_text}
+
+    with patch.object(llm, "aconvert_resume_to_json", side_effect=fake_convert):
+        results = asyncio.run(pipeline.extract_resume_batch([("resume", b"John Doe", "text/plain")]))
+
+    assert results[0].resume_json == {"text": "John Doe"}
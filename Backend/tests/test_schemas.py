@@ -134,6 +134,27 @@ def test_jd_model_schema_categorized_skills():
     assert isinstance(jd.requiredSkills, dict)
     assert "Python" in jd.requiredSkills["critical"]
 
+def test_jd_model_content_hash():
+    """Test that the JD content hash ignores key order, is memoized and is reset by field assignment."""
+    import hashlib
+    import json
+    from tests.test_llm import MOCK_JD_JSON
+    jd = schemas.JDModel(**dict(MOCK_JD_JSON, requiredSkills={"critical": ["Python"], "important": ["SQL"]}))
+    reordered = schemas.JDModel(**dict(MOCK_JD_JSON, requiredSkills={"important": ["SQL"], "critical": ["Python"]}))
+
+    content_hash = jd.content_hash()
+    assert len(content_hash) == 64  # SHA256 hashes are 64 characters long
+    assert reordered.content_hash() == content_hash
+    # Same fingerprint as job descriptions stored before the hash was memoized
+    legacy = json.dumps(jd.model_dump(exclude_unset=True), sort_keys=True, separators=(',', ':'))
+    assert content_hash == hashlib.sha256(legacy.encode("utf-8")).hexdigest()
+    assert jd.canonical_json() is jd.canonical_json()
+    assert jd.details_payload()["jobTitle"] == MOCK_JD_JSON["jobTitle"]
+
+    jd.jobTitle = "Another Job"
+    assert jd.content_hash() != content_hash
+    assert jd.details_payload()["jobTitle"] == "Another Job"
+
 def test_cv_model_schema():
     """Test CVModel schema validation."""
     cv_data = {
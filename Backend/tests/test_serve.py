@@ -0,0 +1,44 @@
+from unittest.mock import Mock
+from app import matching, pipeline, serve
+
+def test_worker_torch_threads():
+    """Test that the cores are split between workers unless a thread count is configured."""
+    assert serve.worker_torch_threads(4, cpus=8, configured=0) == 2
+    assert serve.worker_torch_threads(16, cpus=8, configured=0) == 1
+    assert serve.worker_torch_threads(4, cpus=8, configured=3) == 3
+
+def test_worker_count_requires_shared_job_backend():
+    """Test that jobs kept in process memory limit the launcher to one worker."""
+    assert serve.worker_count(4, "memory") == 1
+    assert serve.worker_count(4, "redis") == 4
+    assert serve.worker_count(0, "redis") == 1
+
+def test_configure_worker_pools_splits_extraction_processes(monkeypatch):
+    """Test that extraction processes and torch threads are divided between the workers."""
+    monkeypatch.setattr(pipeline, "EXTRACTION_WORKERS", 8)
+    monkeypatch.setattr(serve, "WORKER_TORCH_THREADS", 0)
+    monkeypatch.setattr(serve.os, "cpu_count", lambda: 8)
+
+    assert serve.configure_worker_pools(4) == 2
+    assert pipeline.EXTRACTION_WORKERS == 2
+
+def test_bind_socket_is_inherited_by_workers():
+    """Test that the master's listening socket survives into forked workers."""
+    sock = serve.bind_socket("127.0.0.1", 0)
+    try:
+        assert sock.get_inheritable()
+        assert sock.getsockname()[1] > 0
+    finally:
+        sock.close()
+
+def test_preload_model_reuses_loaded_weights(monkeypatch):
+    """Test that the preloaded weights are warmed once and wrapped by the per-process encoder."""
+    transformer = Mock()
+    monkeypatch.setattr(matching, "_transformer", transformer)
+    monkeypatch.setattr(matching, "_model", None)
+    monkeypatch.setattr(matching, "open_embedding_store", lambda: None)
+
+    matching.preload_model()
+
+    transformer.encode.assert_called_once_with(["warm up"])
+    assert matching.get_model().model is transformer
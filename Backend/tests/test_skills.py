@@ -0,0 +1,65 @@
+import numpy as np
+from app.skills import detect_skill_presence, flatten_skill_categories, normalize_skill, resume_skill_terms
+
+RESUME_JSON = {
+    "Skills": [{"skillName": "JS"}, {"skillName": "Postgres"}, {"skillName": "C++"}],
+    "Experiences": [
+        {
+            "jobTitle": "Backend Developer",
+            "description": ["Deployed services on Kubernetes", "Wrote Go tools"],
+            "technologiesUsed": ["Node.js"]
+        }
+    ],
+    "Projects": [{"projectName": "Dashboard", "description": "Charts built with React.js", "technologiesUsed": []}],
+    "Analytics": {"keyword_analysis": {"extracted_keywords": ["REST APIs"]}}
+}
+
+class FixedModel:
+    """Embeds every text as one of a few fixed vectors, so similarities are known."""
+    vectors = {
+        "Typescript tooling": [1.0, 0.0],
+        "Cobol": [0.0, 1.0],
+        "Go": [0.0, 1.0],
+        "C": [0.0, 1.0],
+        "Frontend frameworks": [0.6, 0.8],
+    }
+
+    def encode(self, texts):
+        return np.array([self.vectors.get(t, [1.0, 0.0]) for t in texts], dtype=np.float32)
+
+def test_normalize_skill():
+    """Test that spelling variants share one canonical name."""
+    assert normalize_skill(" ReactJS ") == "react"
+    assert normalize_skill("React.js") == "react"
+    assert normalize_skill("scikit_learn") == "scikit-learn"
+    assert normalize_skill("Python") == "python"
+
+def test_resume_skill_terms():
+    """Test that skills, technologies and keywords are collected once each."""
+    assert resume_skill_terms(RESUME_JSON) == ["JS", "Postgres", "C++", "Node.js", "REST APIs"]
+
+def test_detect_skill_presence_matches_aliases_and_text():
+    """Test that listed skills, aliases and whole phrases in descriptions are found without embeddings."""
+    presence, undecided = detect_skill_presence(
+        RESUME_JSON, ["JavaScript", "PostgreSQL", "c++", "NodeJS", "REST API", "Kubernetes", "React"], model=FixedModel()
+    )
+    assert all(presence.values())
+    assert undecided == []
+
+def test_detect_skill_presence_short_names_need_listed_skill():
+    """Test that short skill names are not matched inside free text."""
+    presence, _ = detect_skill_presence(RESUME_JSON, ["Go", "C"], model=FixedModel())
+    assert presence == {"Go": False, "C": False}
+
+def test_detect_skill_presence_uses_embedding_thresholds():
+    """Test that similar skills are present, distant ones absent and borderline ones undecided."""
+    presence, undecided = detect_skill_presence(
+        RESUME_JSON, ["Typescript tooling", "Cobol", "Frontend frameworks"], model=FixedModel()
+    )
+    assert presence == {"Typescript tooling": True, "Cobol": False, "Frontend frameworks": False}
+    assert undecided == ["Frontend frameworks"]
+
+def test_flatten_skill_categories():
+    """Test that categorized skills are flattened without duplicates."""
+    assert flatten_skill_categories({"critical": ["Python"], "extra": ["Python", "Docker"]}) == ["Python", "Docker"]
+    assert flatten_skill_categories(None) == []
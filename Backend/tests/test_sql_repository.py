@@ -0,0 +1,86 @@
+import asyncio
+import pytest
+from app import crud, repository, schemas
+from app.sql_repository import SQLRepository
+from tests.test_llm import MOCK_JD_JSON, MOCK_RESUME_JSON
+
+@pytest.fixture
+def repo():
+    return SQLRepository("sqlite://")
+
+def _jd(**overrides):
+    return schemas.JDModel(**dict(MOCK_JD_JSON, **overrides))
+
+def _cv(email, first_name="John"):
+    personal_data = dict(MOCK_RESUME_JSON["Personal Data"], email=email, firstName=first_name, lastName="Doe", phone=None)
+    return schemas.CVModel.parse_obj(dict(MOCK_RESUME_JSON, **{"Personal Data": personal_data}))
+
+def test_get_or_create_job_description(repo):
+    """Test that JDs are found again by jobId, or by content hash when they have none."""
+    created = repo.get_or_create_job_description(_jd())
+    assert created.id is not None
+    assert created.details["jobTitle"] == MOCK_JD_JSON["jobTitle"]
+    assert repo.get_or_create_job_description(_jd()).id == created.id
+
+    without_job_id = repo.get_or_create_job_description(_jd(jobId="", jobTitle="Other"))
+    assert without_job_id.id != created.id
+    assert repo.get_or_create_job_description(_jd(jobId="", jobTitle="Other")).id == without_job_id.id
+
+def test_update_jd(repo):
+    """Test that status and detail updates are stored and unknown JDs return None."""
+    jd = repo.get_or_create_job_description(_jd())
+    assert repo.update_jd(jd.id, schemas.JobDescriptionUpdate(status="Closed")).status == "Closed"
+    updated = repo.update_jd_details(jd.id, schemas.JobDescriptionDetailUpdate(details=_jd(jobTitle="Senior Engineer")))
+    assert updated.job_title == "Senior Engineer"
+    assert updated.content_hash == _jd(jobTitle="Senior Engineer").content_hash()
+    assert repo.get_jd(jd.id).job_title == "Senior Engineer"
+    assert repo.update_jd(9999, schemas.JobDescriptionUpdate(status="Closed")) is None
+    assert repo.get_jd(9999) is None
+
+def test_get_jds_pages_with_cursors(repo):
+    """Test that listings walk newest first with cursors, without details unless requested."""
+    ids = [repo.get_or_create_job_description(_jd(jobId=f"JD-{i}", jobTitle=f"Job {i}")).id for i in range(5)]
+
+    first = repo.get_jds(limit=2, include_total=True)
+    assert [jd.id for jd in first.items] == ids[::-1][:2]
+    assert first.items[0].details is None
+    assert first.total == 5
+    second = repo.get_jds(limit=2, after=crud.decode_cursor(first.next_cursor))
+    third = repo.get_jds(limit=2, after=crud.decode_cursor(second.next_cursor), include_details=True)
+    assert [jd.id for jd in second.items + third.items] == ids[::-1][2:]
+    assert third.next_cursor is None
+    assert third.items[0].details is not None
+    assert [jd.id for jd in repo.get_jds(skip=3, limit=10).items] == ids[::-1][3:]
+
+def test_candidates_and_analysis_results(repo):
+    """Test that candidates are upserted by email and results are listed per JD and per user."""
+    jd = repo.get_or_create_job_description(_jd())
+    first = repo.get_or_create_candidates([_cv("a@example.com"), _cv(None), _cv("b@example.com")], recruiter_id="recruiter-1")
+    assert first[1].id not in (first[0].id, first[2].id) and first[1].email is None
+    again = repo.get_or_create_candidates([_cv("a@example.com", first_name="Jane")], recruiter_id="recruiter-2")
+    assert again[0].id == first[0].id
+    assert again[0].name == "Jane Doe"
+
+    result = {"match_score": 80.0, "match_level": "Good Match", "match_details": {"skills": 1}}
+    created = repo.create_analysis_results(jd.id, "recruiter-1", [(first[0].id, result), (first[2].id, result)])
+    assert len(created) == 2
+
+    page = repo.get_jd_results(jd.id, include_total=True)
+    assert [r.candidate.email for r in page.items] == ["b@example.com", "a@example.com"]
+    assert page.items[0].details is None
+    assert page.total == 2
+    assert repo.get_user_analyses("recruiter-1", include_details=True).items[0].details == {"skills": 1}
+    assert repo.get_user_analyses("someone-else").items == []
+
+def test_async_variants_run_in_threads(repo):
+    """Test that the default async variants return what the sync methods do."""
+    jd = repo.get_or_create_job_description(_jd())
+    assert asyncio.run(repo.aget_jd(jd.id)).id == jd.id
+    assert [j.id for j in asyncio.run(repo.aget_jds(limit=5)).items] == [jd.id]
+
+def test_create_repository_rejects_unknown_backends():
+    """Test that the backend setting is validated."""
+    assert isinstance(repository.create_repository("sql", "sqlite://"), SQLRepository)
+    assert isinstance(repository.create_repository("supabase"), repository.SupabaseRepository)
+    with pytest.raises(ValueError):
+        repository.create_repository("mongo")
@@ -0,0 +1,33 @@
+from app import metrics
+from app.sqlite_cache import SQLiteCache, open_sqlite_cache
+
+def test_sqlite_cache_get_many():
+    """Test that batched lookups return the stored blobs and count hits and misses."""
+    metrics.reset()
+    cache = SQLiteCache("blobs")
+    cache.put_many([(str(i), str(i).encode()) for i in range(600)])
+
+    found = cache.get_many([str(i) for i in range(0, 700, 100)])
+
+    assert found == {str(i): str(i).encode() for i in range(0, 600, 100)}
+    assert metrics.snapshot()["counters"] == {"blobs.hits": 6, "blobs.misses": 1}
+
+def test_sqlite_cache_failures_are_misses():
+    """Test that a broken database is logged and treated as a miss rather than raised."""
+    cache = SQLiteCache("blobs")
+    cache.put("key", b"value")
+    cache._conn.execute("DROP TABLE cache_entries")
+
+    cache.put("other", b"value")
+    assert cache.get("key") is None
+
+def test_open_sqlite_cache_falls_back(tmp_path):
+    """Test that a cache that cannot be opened falls back to memory, or to None when asked."""
+    blocked = tmp_path / "file"
+    blocked.write_text("not a directory")
+    path = str(blocked / "cache.sqlite3")
+    cache_class = lambda path: SQLiteCache("blobs", path)
+
+    assert isinstance(open_sqlite_cache(cache_class, path), SQLiteCache)
+    assert isinstance(open_sqlite_cache(cache_class, ""), SQLiteCache)
+    assert open_sqlite_cache(cache_class, path, memory_fallback=False) is None
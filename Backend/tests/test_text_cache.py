@@ -0,0 +1,51 @@
+import io
+import asyncio
+from unittest.mock import patch
+from app import metrics, parsing, pipeline, text_cache
+from app.text_cache import TextCache, document_key, extract_text_cached
+
+def test_document_key():
+    """Test that keys depend on the bytes and detected type, whichever way the document is passed."""
+    key = document_key(b"John Doe", "resume.txt")
+    assert key == document_key(io.BytesIO(b"John Doe"), "cv.txt")
+    assert key == document_key(memoryview(b"John Doe"), None, "text/plain")
+    assert key != document_key(b"Jane Doe", "resume.txt")
+    assert key != document_key(b"John Doe", "resume.txt", max_chars=100)
+    assert document_key(b"John Doe", "resume.xyz") is None
+
+def test_text_cache_round_trip(tmp_path):
+    """Test that texts survive reopening the on-disk cache and lookups are counted."""
+    metrics.reset()
+    path = str(tmp_path / "text.sqlite3")
+    TextCache(path).put("key", "John Doe")
+
+    cache = TextCache(path)
+    assert cache.get("key") == "John Doe"
+    assert cache.get("missing") is None
+    assert metrics.snapshot()["counters"] == {"text_cache.hits": 1, "text_cache.misses": 1}
+
+def test_text_cache_evicts_least_recently_used_by_size():
+    """Test that the oldest texts are dropped once the total size exceeds the limit."""
+    cache = TextCache(max_bytes=10)
+    cache.put("a", "aaaa")
+    cache.put("b", "bbbb")
+    assert cache.get("a") == "aaaa"
+    cache.put("c", "cccc")
+    assert cache.get("b") is None
+    assert cache.get("a") == "aaaa"
+    cache.put("huge", "x" * 11)
+    assert cache.get("huge") is None
+
+def test_extract_text_cached(texts):
+    """Test that a file seen before is not parsed again."""
+    with patch.object(text_cache, "extract_text", wraps=parsing.extract_text) as extract:
+        assert extract_text_cached(io.BytesIO(b"John Doe"), "resume.txt") == "John Doe"
+        assert extract_text_cached(io.BytesIO(b"John Doe"), "resume.txt") == "John Doe"
+    assert extract.call_count == 1
+
+def test_extract_upload_text_uses_cache(texts):
+    """Test that resumes whose text is cached skip the process pool."""
+    texts.put(document_key(b"John Doe", "resume.txt", max_chars=pipeline.EXTRACTION_MAX_CHARS), "John Doe")
+    with patch.object(pipeline, "get_process_pool") as pool:
+        assert asyncio.run(pipeline.extract_upload_text("resume.txt", b"John Doe")) == "John Doe"
+    pool.assert_not_called()
@@ -0,0 +1,58 @@
+from types import SimpleNamespace
+from unittest.mock import Mock, patch
+from app import crud, schemas, user_directory
+
+def _user(id, username, email=None):
+    return schemas.User(id=id, username=username, email=email or f"{username}@example.com", role="recruiter", is_active=True)
+
+def _auth_user(id, username):
+    return SimpleNamespace(id=id, email=f"{username}@example.com", user_metadata={"username": username}, created_at=None)
+
+def test_directory_pages_and_filters(users):
+    """Test that listings are served from the indexes."""
+    users.load([_user("1", "ann"), _user("2", "bob"), _user("3", "ann", "ann2@example.com")], users.generation)
+
+    assert [u.id for u in users.list(skip=1, limit=1)] == ["2"]
+    assert [u.id for u in users.list(username="ann")] == ["1", "3"]
+    assert [u.id for u in users.list(skip=1, username="ann")] == ["3"]
+    assert users.get("2").username == "bob"
+    assert users.get_by_email("ANN2@example.com").id == "3"
+    assert users.is_fresh()
+
+def test_directory_expires():
+    """Test that a directory older than its TTL is stale."""
+    directory = user_directory.UserDirectory(ttl_seconds=0)
+    directory.load([_user("1", "ann")], directory.generation)
+    assert not directory.is_fresh()
+
+def test_load_started_before_invalidation_is_discarded(users):
+    """Test that a listing fetched before a user was deleted does not repopulate the directory."""
+    generation = users.generation
+    users.invalidate()
+    assert not users.load([_user("1", "ann")], generation)
+    assert not users.is_fresh()
+    assert users.list() == []
+
+def test_get_users_lists_auth_users_once(users):
+    """Test that users are listed from Supabase Auth page by page, once per directory load."""
+    admin = Mock()
+    admin.auth.admin.list_users.side_effect = [
+        [_auth_user("1", "ann"), _auth_user("2", "bob")],
+        [_auth_user("3", "cid")],
+    ]
+    with patch.object(user_directory, "USER_DIRECTORY_PAGE_SIZE", 2), \
+         patch.object(crud, "USER_DIRECTORY_PAGE_SIZE", 2), \
+         patch.object(crud, "get_admin_supabase", return_value=admin):
+        first = crud.get_users(Mock(), skip=0, limit=10)
+        second = crud.get_users(Mock(), skip=2, limit=10)
+
+    assert [u.username for u in first] == ["ann", "bob", "cid"]
+    assert [u.username for u in second] == ["cid"]
+    assert admin.auth.admin.list_users.call_count == 2
+    assert admin.auth.admin.list_users.call_args.kwargs == {"page": 2, "per_page": 2}
+
+def test_delete_user_invalidates_directory(users):
+    """Test that deleting a user forces the next listing to reload."""
+    users.load([_user("1", "ann")], users.generation)
+    crud.delete_user(Mock(), "1")
+    assert not users.is_fresh()
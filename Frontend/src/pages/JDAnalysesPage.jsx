@@ -8,6 +8,7 @@ const JDAnalysesPage = () => {
     const [analyses, setAnalyses] = useState([]);
     const [loading, setLoading] = useState(true);
     const [error, setError] = useState('');
+    const [nextCursor, setNextCursor] = useState(null);
 
     useEffect(() => {
         const fetchAnalyses = async () => {
@@ -15,6 +16,7 @@ const JDAnalysesPage = () => {
                 setLoading(true);
                 const analysesResponse = await api.get(`/jds/${jdId}/results`);
                 setAnalyses(analysesResponse.data);
+                setNextCursor(analysesResponse.headers['x-next-cursor'] || null);
             } catch (err) {
                 setError('Failed to fetch analyses.');
             } finally {
@@ -24,6 +26,16 @@ const JDAnalysesPage = () => {
         fetchAnalyses();
     }, [jdId]);
 
+    const loadMore = async () => {
+        try {
+            const response = await api.get(`/jds/${jdId}/results`, { params: { cursor: nextCursor } });
+            setAnalyses(prev => [...prev, ...response.data]);
+            setNextCursor(response.headers['x-next-cursor'] || null);
+        } catch (err) {
+            setError('Failed to fetch analyses.');
+        }
+    };
+
     if (loading) {
         return <ProcessingLoader />;
     }
@@ -55,6 +67,13 @@ const JDAnalysesPage = () => {
                     )}
                 </ul>
             </div>
+            {nextCursor && (
+                <div className="text-center mt-6">
+                    <button onClick={loadMore} className="px-6 py-2 bg-red-500 text-white rounded-lg hover:bg-red-600">
+                        Load more
+                    </button>
+                </div>
+            )}
         </div>
     );
 };
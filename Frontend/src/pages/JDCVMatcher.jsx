@@ -1,4 +1,4 @@
-import React, { useState, useCallback, useEffect } from 'react';
+import React, { useState, useCallback, useEffect, useRef } from 'react';
 import { Link } from 'react-router-dom';
 import { Brain, Zap, Target, Clock, Briefcase, LogOut, Users } from 'lucide-react';
 import api from '../api';
@@ -31,6 +31,11 @@ const JDCVMatcher = ({ isPastAnalysesPage }) => {
   const [skillCategories, setSkillCategories] = useState(defaultSkillCategories());
   const [cvExtractionResults, setCvExtractionResults] = useState(null);
   const [finalResults, setFinalResults] = useState(null);
+  // Interview questions arrive after the match results: from a background job for the top candidates, on demand for the rest
+  const [matchJdJson, setMatchJdJson] = useState(null);
+  const [questionsPending, setQuestionsPending] = useState(false);
+  const [loadingQuestionsFor, setLoadingQuestionsFor] = useState(null);
+  const questionsJobRef = useRef(null);
   const [dragOver, setDragOver] = useState({ jd: false, cv: false });
   const [expandedIdx, setExpandedIdx] = useState(null);
   const [newSkill, setNewSkill] = useState("");
@@ -46,6 +51,9 @@ const JDCVMatcher = ({ isPastAnalysesPage }) => {
     setView(isPastAnalysesPage ? 'past' : 'main');
   }, [isPastAnalysesPage]);
 
+  // Stops polling for interview questions once the page is left
+  useEffect(() => () => { questionsJobRef.current = null; }, []);
+
   useEffect(() => {
     if (user?.role === 'recruiter') {
       const fetchJds = async () => {
@@ -132,7 +140,20 @@ const JDCVMatcher = ({ isPastAnalysesPage }) => {
     }
   };
 
-  const handleSelectJd = (jd) => {
+  const handleSelectJd = async (jd) => {
+    // The /jds listing omits details, so the full JD is fetched on selection
+    if (!jd.details) {
+      setProcessing(true);
+      try {
+        const response = await api.get(`/jds/${jd.id}`);
+        jd = response.data;
+      } catch (err) {
+        alert('Failed to fetch job description details.');
+        return;
+      } finally {
+        setProcessing(false);
+      }
+    }
     setSelectedJd(jd);
     const details = jd.details || {};
     setJdJson(details);
@@ -233,6 +254,51 @@ const JDCVMatcher = ({ isPastAnalysesPage }) => {
     }
   };
 
+  const setCandidateQuestions = (candidateId, questions) => {
+    setFinalResults(prev => prev && {
+      ...prev,
+      results: prev.results.map(r => (r.candidate_id === candidateId ? { ...r, interview_questions: questions } : r)),
+    });
+  };
+
+  // Polls the interview questions job until it finishes, filling in each candidate's questions as they arrive
+  const pollInterviewQuestions = async (jobId) => {
+    questionsJobRef.current = jobId;
+    setQuestionsPending(true);
+    let offset = 0;
+    try {
+      while (questionsJobRef.current === jobId) {
+        const res = await api.get(`/jobs/${jobId}/results`, { params: { offset } });
+        if (questionsJobRef.current !== jobId) return;
+        res.data.results.forEach(r => setCandidateQuestions(r.candidate_id, r.interview_questions));
+        offset += res.data.results.length;
+        if (res.data.status === 'completed' || res.data.status === 'failed') break;
+        await new Promise(resolve => setTimeout(resolve, 2000));
+      }
+    } catch (err) {
+      console.error('Failed to fetch interview questions:', err);
+    } finally {
+      if (questionsJobRef.current === jobId) {
+        questionsJobRef.current = null;
+        setQuestionsPending(false);
+      }
+    }
+  };
+
+  const generateInterviewQuestions = async (candidateId) => {
+    const cv = cvExtractionResults?.find(c => c.cv_json?.UUID === candidateId);
+    if (!cv || !matchJdJson) return;
+    setLoadingQuestionsFor(candidateId);
+    try {
+      const res = await api.post('/interview_questions', { jd_json: matchJdJson, cv_json: cv.cv_json });
+      setCandidateQuestions(candidateId, res.data.interview_questions);
+    } catch (err) {
+      alert('Error generating interview questions: ' + (err.response?.data?.detail || err.message));
+    } finally {
+      setLoadingQuestionsFor(null);
+    }
+  };
+
   // --- Step 5: Match ---
   const matchResults = async () => {
     if (!editedJdJson || !cvExtractionResults) return;
@@ -252,8 +318,12 @@ const JDCVMatcher = ({ isPastAnalysesPage }) => {
         cvs: cvExtractionResults
       });
       setFinalResults(res.data);
+      setMatchJdJson(jdWithFlatSkills);
       setProcessing(false);
       setStep(user?.role === 'recruiter' ? 6 : 7);
+      if (res.data.interview_questions_job_id) {
+        pollInterviewQuestions(res.data.interview_questions_job_id);
+      }
     } catch (err) {
       setProcessing(false);
       alert('Error matching results: ' + (err.response?.data?.error || err.message));
@@ -269,6 +339,9 @@ const JDCVMatcher = ({ isPastAnalysesPage }) => {
     setSkillCategories(defaultSkillCategories());
     setCvExtractionResults(null);
     setFinalResults(null);
+    setMatchJdJson(null);
+    questionsJobRef.current = null;
+    setQuestionsPending(false);
     setProcessing(false);
     setView('main');
     setSelectedJd(null);
@@ -322,6 +395,9 @@ const JDCVMatcher = ({ isPastAnalysesPage }) => {
                         setExpandedIdx={setExpandedIdx}
                         skillCategories={skillCategories}
                         resetApp={resetApp}
+                        questionsPending={questionsPending}
+                        loadingQuestionsFor={loadingQuestionsFor}
+                        generateInterviewQuestions={generateInterviewQuestions}
                     />
                 );
             default:
@@ -383,6 +459,9 @@ const JDCVMatcher = ({ isPastAnalysesPage }) => {
             setExpandedIdx={setExpandedIdx}
             skillCategories={skillCategories}
             resetApp={resetApp}
+            questionsPending={questionsPending}
+            loadingQuestionsFor={loadingQuestionsFor}
+            generateInterviewQuestions={generateInterviewQuestions}
           />
         );
       default:
@@ -7,6 +7,7 @@ const PastAnalyses = () => {
     const [analyses, setAnalyses] = useState([]);
     const [loading, setLoading] = useState(true); // Start with true since we're loading data
     const [error, setError] = useState(null);
+    const [nextCursor, setNextCursor] = useState(null);
 
     useEffect(() => {
         const fetchAnalyses = async () => {
@@ -14,6 +15,7 @@ const PastAnalyses = () => {
             try {
                 const res = await api.get(`/analyses`);
                 setAnalyses(res.data);
+                setNextCursor(res.headers['x-next-cursor'] || null);
             } catch (err) {
                 setError('Failed to fetch past analyses.');
                 console.error('Error fetching analyses:', err); // Add error logging
@@ -28,6 +30,17 @@ const PastAnalyses = () => {
         }
     }, [user]);
 
+    const loadMore = async () => {
+        try {
+            const res = await api.get(`/analyses`, { params: { cursor: nextCursor } });
+            setAnalyses(prev => [...prev, ...res.data]);
+            setNextCursor(res.headers['x-next-cursor'] || null);
+        } catch (err) {
+            setError('Failed to fetch past analyses.');
+            console.error('Error fetching analyses:', err);
+        }
+    };
+
     if (loading) {
         return <div>Loading...</div>;
     }
@@ -95,6 +108,13 @@ const PastAnalyses = () => {
                             </tbody>
                         </table>
                     </div>
+                    {nextCursor && (
+                        <div className="text-center mt-6">
+                            <button onClick={loadMore} className="px-6 py-2 bg-red-500 text-white rounded-lg hover:bg-red-600">
+                                Load more
+                            </button>
+                        </div>
+                    )}
                 </div>
             ) : (
                 <p className="text-center text-gray-500">No past analyses found.</p>
@@ -2,7 +2,10 @@ import React from 'react';
 import { ChevronDown, ChevronUp } from 'lucide-react';
 import SkillBadge from '../../../components/ui/SkillBadge';
 
-const ResultsStep = ({ finalResults, expandedIdx, setExpandedIdx, skillCategories, resetApp }) => (
+const ResultsStep = ({
+  finalResults, expandedIdx, setExpandedIdx, skillCategories, resetApp,
+  questionsPending, loadingQuestionsFor, generateInterviewQuestions
+}) => (
   <div className="space-y-8">
     <div className="text-center mb-8">
       <h2 className="text-3xl font-bold text-gray-800 mb-4">Analysis Complete!</h2>
@@ -102,8 +105,19 @@ const ResultsStep = ({ finalResults, expandedIdx, setExpandedIdx, skillCategorie
                             <ul className="list-disc pl-6 space-y-1">
                               {candidate.interview_questions?.length > 0 ? candidate.interview_questions.map((q, i) => (
                                 <li key={i} className="text-gray-700">{q}</li>
-                              )) : <li className="text-gray-400">No questions generated.</li>}
+                              )) : questionsPending ? (
+                                <li className="text-gray-400">Generating questions...</li>
+                              ) : <li className="text-gray-400">No questions generated.</li>}
                             </ul>
+                            {!candidate.interview_questions?.length && !questionsPending && candidate.candidate_id && generateInterviewQuestions && (
+                              <button
+                                className="mt-3 px-3 py-1 text-sm bg-gradient-to-r from-red-500 to-red-600 text-white rounded-lg shadow hover:from-red-600 hover:to-red-700 disabled:opacity-50"
+                                onClick={() => generateInterviewQuestions(candidate.candidate_id)}
+                                disabled={loadingQuestionsFor === candidate.candidate_id}
+                              >
+                                {loadingQuestionsFor === candidate.candidate_id ? 'Generating...' : 'Generate Questions'}
+                              </button>
+                            )}
                           </div>
                           <div className="bg-white rounded-xl shadow p-6">
                             <h4 className="font-semibold text-gray-800 mb-2">Profile Insights</h4>
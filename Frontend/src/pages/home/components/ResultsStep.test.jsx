@@ -0,0 +1,49 @@
+import { render, screen, fireEvent } from '@testing-library/react';
+import { vi, describe, it, expect } from 'vitest';
+import ResultsStep from './ResultsStep';
+
+const candidate = (overrides) => ({
+  candidate_id: 'cv-1',
+  candidate_name: 'John Doe',
+  match_score: 80,
+  match_details: {},
+  critical_skill_status: 'All Present',
+  critical_present: [],
+  critical_absent: [],
+  filter_status: { passed: true },
+  interview_questions: [],
+  skill_presence: {},
+  ...overrides,
+});
+
+const renderResults = (results, props = {}) => render(
+  <ResultsStep
+    finalResults={{ results, matching_metadata: { top_match_score: 80, candidates_evaluated: results.length } }}
+    expandedIdx={0}
+    setExpandedIdx={vi.fn()}
+    skillCategories={{ critical: [], important: [], extra: [] }}
+    resetApp={vi.fn()}
+    {...props}
+  />
+);
+
+describe('ResultsStep', () => {
+  it('should show that questions are on their way while the background job runs', () => {
+    renderResults([candidate()], { questionsPending: true, generateInterviewQuestions: vi.fn() });
+    expect(screen.getByText('Generating questions...')).toBeInTheDocument();
+    expect(screen.queryByText('Generate Questions')).not.toBeInTheDocument();
+  });
+
+  it('should generate questions on demand for candidates without them', () => {
+    const generateInterviewQuestions = vi.fn();
+    renderResults([candidate()], { questionsPending: false, generateInterviewQuestions });
+    fireEvent.click(screen.getByText('Generate Questions'));
+    expect(generateInterviewQuestions).toHaveBeenCalledWith('cv-1');
+  });
+
+  it('should list questions once they have arrived', () => {
+    renderResults([candidate({ interview_questions: ['Why FastAPI?'] })], { generateInterviewQuestions: vi.fn() });
+    expect(screen.getByText('Why FastAPI?')).toBeInTheDocument();
+    expect(screen.queryByText('Generate Questions')).not.toBeInTheDocument();
+  });
+});